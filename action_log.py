@@ -0,0 +1,112 @@
+"""带缓冲的操作日志
+
+日志文件句柄保持打开，日志条目先写入内存缓冲，在条目数达到阈值、距首条未写入条目超过
+一定时间或程序退出时统一写入。日志文件按大小（或按日期）轮转，flush() 可供测试同步落盘。
+"""
+import atexit
+import datetime
+import os
+import threading
+import time
+
+import metrics
+
+FLUSH_ENTRIES = 50           # 缓冲条目达到该数量时立即写入
+FLUSH_INTERVAL = 2.0         # 缓冲中的条目最多等待的秒数
+MAX_BYTES = 1024 * 1024      # 日志文件超过该大小时轮转
+BACKUP_COUNT = 5             # 按大小轮转时保留的旧日志份数
+
+
+class ActionLogger:
+    """缓冲写入、自动轮转的操作日志"""
+
+    def __init__(self, path, flush_entries=FLUSH_ENTRIES, flush_interval=FLUSH_INTERVAL,
+                 max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, rotate_daily=False):
+        self.path = path
+        self.flush_entries = flush_entries
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_daily = rotate_daily
+        self._buffer = []
+        self._file = None
+        self._timer = None
+        self._lock = threading.RLock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def log(self, message):
+        """记录一条操作日志（先进入缓冲）"""
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._buffer.append(f"[{timestamp}] {message}\n")
+            if self._closed or len(self._buffer) >= self.flush_entries:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """立即把缓冲中的日志写入文件"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        entries = len(self._buffer)
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer.clear()
+        self._maybe_rotate()
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(data)
+        self._file.flush()
+        if metrics.ENABLED:
+            metrics.observe("log.write", time.perf_counter() - start)
+            metrics.count("log.entries", entries)
+            metrics.count("log.bytes", len(data))
+        if self._closed:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_rotate(self):
+        """按日期或大小轮转日志文件"""
+        if not os.path.exists(self.path):
+            return
+        stat = os.stat(self.path)
+
+        if self.rotate_daily:
+            day = datetime.date.fromtimestamp(stat.st_mtime)
+            if day != datetime.date.today():
+                root, ext = os.path.splitext(self.path)
+                self._close_file()
+                os.replace(self.path, f"{root}.{day.strftime('%Y%m%d')}{ext}")
+            return
+
+        if self.max_bytes and stat.st_size >= self.max_bytes:
+            self._close_file()
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            if self.backup_count > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+
+    def close(self):
+        """写入剩余日志并关闭文件"""
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            self._close_file()
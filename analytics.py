@@ -0,0 +1,147 @@
+"""基于列式数据的统计引擎
+
+把所有学生的上课记录和结算记录展开成一张 pandas 表：student（分类）、date（日期）、
+hours、kind（record / payment，分类）、subject（分类），按学生、月份、星期、科目的
+统计都用向量化的 groupby 完成，不再逐行循环。
+每个学生的列数据按姓名单独缓存，并以两个列表的 version（以及条数、合计）判断是否过期，
+不比较对象本身：惰性模式下未缓存的学生每次都会读出新的列表对象，内容不变时仍可复用。
+refresh() 只重建有变化的学生，再把各学生的数组拼接成整表。没有科目字段（或文本快照读回为
+“未指定”）的记录，若学生只有一个补习科目则计入该科目，否则计为“未指定”。
+命令行 ledger.py stats 使用该引擎输出按学生 / 月份 / 星期 / 科目的统计。
+numpy / pandas 只在第一次统计时才导入，避免拖慢程序启动。
+"""
+KINDS = ("record", "payment")
+UNSPECIFIED_SUBJECT = "未指定"
+WEEKDAYS = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+
+def _student_block(data):
+    """把一个学生的记录转换为列数组: (日期, 时长, 类型, 科目)"""
+    import numpy as np
+
+    subjects = data.get("subjects", [])
+    default_subject = subjects[0] if len(subjects) == 1 else UNSPECIFIED_SUBJECT
+    records = data["records"]
+    payments = data["payments"]
+
+    dates = [entry[0] for entry in records] + [entry[0] for entry in payments]
+    hours = [entry[1] for entry in records] + [entry[1] for entry in payments]
+    kinds = np.zeros(len(dates), dtype=np.int8)
+    kinds[len(records):] = 1
+    subject = [entry[2] if len(entry) > 2 and entry[2] != UNSPECIFIED_SUBJECT else default_subject
+               for entry in records]
+    subject += [None] * len(payments)
+    return (np.array(dates, dtype="datetime64[D]"), np.array(hours, dtype=np.float64),
+            kinds, np.array(subject, dtype=object))
+
+
+class RecordAnalytics:
+    """所有学生记录的列式视图及统计查询"""
+
+    def __init__(self):
+        self._blocks = {}  # 姓名 -> (科目, 版本键, 列数组)
+        self._order = []
+        self._frame = None
+
+    def refresh(self, students):
+        """按当前学生数据增量更新，只重建记录有变化的学生；返回重建的学生数"""
+        if hasattr(students, "items"):
+            students = students.items()
+        blocks = {}
+        order = []
+        rebuilt = 0
+        for name, data in students:
+            records, payments = data["records"], data["payments"]
+            subjects = list(data.get("subjects", []))
+            key = (records.version, payments.version, len(records), len(payments),
+                   records.total, payments.total)
+            cached = self._blocks.get(name)
+            if cached is None or cached[0] != subjects or cached[1] != key:
+                cached = (subjects, key, _student_block(data))
+                rebuilt += 1
+            blocks[name] = cached
+            order.append(name)
+        if rebuilt or order != self._order:
+            self._frame = None
+        self._blocks = blocks
+        self._order = order
+        return rebuilt
+
+    @property
+    def frame(self):
+        """整表 DataFrame，列为 student, date, hours, kind, subject"""
+        if self._frame is None:
+            self._frame = self._build_frame()
+        return self._frame
+
+    def _build_frame(self):
+        import numpy as np
+        import pandas as pd
+
+        columns = [self._blocks[name][2] for name in self._order]
+        lengths = np.array([len(block[0]) for block in columns], dtype=np.int64)
+
+        def concat(i, dtype):
+            return np.concatenate([block[i] for block in columns]) if columns else np.array([], dtype=dtype)
+
+        student_codes = np.repeat(np.arange(len(self._order)), lengths)
+        return pd.DataFrame({
+            "student": pd.Categorical.from_codes(student_codes, categories=pd.Index(self._order, dtype=object)),
+            "date": pd.to_datetime(concat(0, "datetime64[D]")),
+            "hours": concat(1, np.float64),
+            "kind": pd.Categorical.from_codes(concat(2, np.int8), categories=list(KINDS)),
+            "subject": pd.Categorical(concat(3, object)),
+        })
+
+    def _select(self, student=None, start=None, end=None):
+        """按学生和日期区间 [start, end] 过滤"""
+        frame = self.frame
+        mask = None
+        if student is not None:
+            mask = frame["student"] == student
+        if start is not None:
+            cond = frame["date"] >= start
+            mask = cond if mask is None else mask & cond
+        if end is not None:
+            cond = frame["date"] <= end
+            mask = cond if mask is None else mask & cond
+        return frame if mask is None else frame[mask]
+
+    @staticmethod
+    def _pivot(frame, key):
+        """按 key 分组汇总上课时长和结算时长，返回列为 taught, settled 的 DataFrame"""
+        table = (frame.groupby([key, "kind"], observed=True)["hours"].sum()
+                 .unstack("kind", fill_value=0.0)
+                 .reindex(columns=list(KINDS), fill_value=0.0))
+        table.columns = ["taught", "settled"]
+        table.columns.name = None
+        return table.round(9)
+
+    def by_student(self, start=None, end=None):
+        """各学生的上课、结算和剩余时长（包含没有记录的学生）"""
+        frame = self._select(start=start, end=end)
+        table = self._pivot(frame, "student").reindex(self._order, fill_value=0.0)
+        table.index.name = "student"
+        table["remaining"] = (table["taught"] - table["settled"]).round(9)
+        return table
+
+    def by_month(self, student=None, start=None, end=None):
+        """按月份（yyyy-MM）汇总上课和结算时长"""
+        frame = self._select(student, start, end)
+        frame = frame.assign(month=frame["date"].dt.strftime("%Y-%m"))
+        return self._pivot(frame, "month").sort_index()
+
+    def by_weekday(self, student=None, start=None, end=None):
+        """按星期汇总上课和结算时长，索引为 周一 ~ 周日"""
+        frame = self._select(student, start, end)
+        frame = frame.assign(weekday=frame["date"].dt.weekday)
+        table = self._pivot(frame, "weekday").reindex(range(7), fill_value=0.0)
+        table.index = WEEKDAYS
+        table.index.name = "weekday"
+        return table
+
+    def by_subject(self, student=None, start=None, end=None):
+        """按科目汇总上课时长（结算记录没有科目，不参与）"""
+        frame = self._select(student, start, end)
+        frame = frame[frame["kind"] == "record"]
+        return frame.groupby("subject", observed=True)["hours"].sum().round(9).rename("taught")
@@ -0,0 +1,76 @@
+"""后台写入线程
+
+持久化和导出都在这个线程中按提交顺序执行，GUI 线程只负责把任务放入队列。
+队列中连续的保存任务会合并成一次写入；任务完成或失败时通过回调通知
+（GUI 中回调为 Qt 信号的 emit，会被自动转到主线程处理）。
+"""
+import queue
+import threading
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """按顺序执行保存与导出任务的后台线程"""
+
+    def __init__(self, store, on_finished=None, on_failed=None):
+        self.store = store
+        self.on_finished = on_finished  # on_finished(任务类型, 结果)
+        self.on_failed = on_failed      # on_failed(任务类型, 异常)
+        self.saves_performed = 0  # 实际执行的写入次数（合并后）
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="BackgroundWriter", daemon=True)
+        self._thread.start()
+
+    def submit_save(self, ops):
+        """提交一批增量操作；ops 中的字典提交后不应再被修改"""
+        self._queue.put(("save", tuple(ops)))
+
+    def submit(self, kind, func, *args):
+        """提交任意任务，例如导出；func(*args) 的返回值作为结果回调"""
+        self._queue.put((kind, (func, args)))
+
+    def _run(self):
+        pending = None
+        while True:
+            item = pending if pending is not None else self._queue.get()
+            pending = None
+            if item is _STOP:
+                break
+
+            kind, payload = item
+            if kind == "save":
+                # 合并队列中紧随其后的保存任务，一次写入
+                ops = list(payload)
+                while True:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if nxt is not _STOP and nxt[0] == "save":
+                        ops.extend(nxt[1])
+                    else:
+                        pending = nxt
+                        break
+                if self._execute(kind, self.store.append, *ops, result=ops):
+                    self.saves_performed += 1
+            else:
+                func, args = payload
+                self._execute(kind, func, *args)
+
+    def _execute(self, kind, func, *args, result=None):
+        try:
+            value = func(*args)
+        except Exception as e:
+            if self.on_failed:
+                self.on_failed(kind, e)
+            return False
+        if self.on_finished:
+            self.on_finished(kind, value if result is None else result)
+        return True
+
+    def close(self):
+        """处理完队列中剩余的任务后结束线程"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
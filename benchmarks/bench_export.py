@@ -0,0 +1,76 @@
+"""Excel 导出基准测试：比较串行与并行准备各学生数据的耗时，以及只改动一个学生后的增量导出耗时
+
+用法: python benchmarks/bench_export.py [--sizes 10 100 1000] [--records 200] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_export import export_students  # noqa: E402
+from record_store import new_student  # noqa: E402
+
+
+def make_roster(students, records, seed=0):
+    """生成确定性的学生数据"""
+    rng = random.Random(seed)
+    roster = {}
+    for i in range(students):
+        data = new_student(["数学", "英语"])
+        for _ in range(records):
+            data["records"].add((f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                                 rng.choice([1.0, 1.5, 2.0])))
+        for _ in range(records // 10):
+            data["payments"].add((f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", 1.0))
+        roster[f"学生{i:04d}"] = data
+    return roster
+
+
+def time_export(roster, workers, executor):
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        export_students(roster, os.path.join(tmp, "bench.xlsx"), workers=workers, executor=executor, cache_dir="")
+        return time.perf_counter() - start
+
+
+def time_incremental(roster):
+    """先完整导出一次建立缓存，给第一个学生加一条记录后再导出，返回第二次导出的耗时"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        export_students(roster, os.path.join(tmp, "full.xlsx"), workers=1, cache_dir=cache_dir)
+        first = next(iter(roster.values()))
+        first["records"].add(("2025-01-01", 1.0))
+        start = time.perf_counter()
+        export_students(roster, os.path.join(tmp, "incremental.xlsx"), workers=1, cache_dir=cache_dir)
+        elapsed = time.perf_counter() - start
+        first["records"].pop(first["records"].index(("2025-01-01", 1.0)))
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel 导出串行/并行基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="学生人数")
+    parser.add_argument("--records", type=int, default=200, help="每个学生的上课记录数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行工作数")
+    args = parser.parse_args()
+
+    configs = [("串行", 1, "thread"), ("线程池", args.workers, "thread"), ("进程池", args.workers, "process")]
+    # 预热: 导入 openpyxl 并启动一次进程池，避免计入第一组结果
+    warmup = make_roster(2, 5)
+    for _, workers, executor in configs:
+        time_export(warmup, workers, executor)
+
+    print(f"{'学生数':>8}" + "".join(f"{name:>12}" for name, _, _ in configs) + f"{'增量':>12}")
+    for size in args.sizes:
+        roster = make_roster(size, args.records)
+        times = [time_export(roster, workers, executor) for _, workers, executor in configs]
+        times.append(time_incremental(roster))
+        print(f"{size:>8}" + "".join(f"{t:>11.2f}s" for t in times))
+
+
+if __name__ == "__main__":
+    main()
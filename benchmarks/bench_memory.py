@@ -0,0 +1,65 @@
+"""记录内存占用基准测试：比较 EntryList（元组列表）与 CompactEntryList 每条记录占用的字节数
+
+先生成确定性的文本快照，再分别用两种实现解析，用 tracemalloc 统计解析结果占用的内存。
+用法: python benchmarks/bench_memory.py [--students 1000] [--records 200]
+"""
+import argparse
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import record_store  # noqa: E402
+from journal_store import parse_snapshot  # noqa: E402
+
+
+def make_snapshot(students, records, seed=0):
+    """生成确定性的文本快照内容"""
+    rng = random.Random(seed)
+    lines = ["SEQ:0\n"]
+    for i in range(students):
+        lines.append(f"STUDENT:学生{i:05d}\n")
+        lines.append("SUBJECTS:数学,英语\n")
+        for _ in range(records):
+            date = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            lines.append(f"RECORD:{date},{rng.choice([1.0, 1.5, 2.0])},{rng.choice(['数学', '英语'])}\n")
+        for _ in range(records // 10):
+            lines.append(f"PAYMENT:2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},1.0\n")
+    return "".join(lines)
+
+
+def measure(text, compact):
+    """解析快照，返回 (占用字节数, 峰值字节数, 条目数, 耗时)"""
+    record_store.COMPACT_RECORDS = compact
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    students, _ = parse_snapshot(io.StringIO(text))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    entries = sum(len(d["records"]) + len(d["payments"]) for d in students.values())
+    del students
+    return current, peak, entries, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记录内存占用基准测试")
+    parser.add_argument("--students", type=int, default=1000, help="学生人数")
+    parser.add_argument("--records", type=int, default=200, help="每个学生的上课记录数")
+    args = parser.parse_args()
+
+    text = make_snapshot(args.students, args.records)
+    print(f"{'实现':<18}{'条目数':>10}{'字节/条':>10}{'峰值(MB)':>10}{'解析耗时':>10}")
+    for name, compact in (("EntryList", False), ("CompactEntryList", True)):
+        current, peak, entries, elapsed = measure(text, compact)
+        print(f"{name:<18}{entries:>10}{current / entries:>10.1f}{peak / 2**20:>10.1f}{elapsed:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""学生列表拖拽排序基准测试
+
+在无界面平台（offscreen）上打开主窗口，载入指定数量的学生，用列表模型的 moveRow 模拟拖拽，
+分别统计原先“遍历整个列表 + 重建学生字典 + 保存完整顺序”的做法与按顺序索引增量移动的做法
+每次移动在界面线程上的耗时和需要持久化的操作大小，最后确认两种做法在存储中得到的顺序一致。
+
+用法: python benchmarks/bench_reorder.py [--students 2000] [--moves 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt5.QtCore import QModelIndex  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from journal_store import JournalStore  # noqa: E402
+from record_store import new_student  # noqa: E402
+
+
+def legacy_reorder(window):
+    """原先的实现：遍历整个列表、重建学生字典并保存完整顺序"""
+    def handler(*args):
+        new_order = window.student_model.names()
+        window.students = {student: window.students[student] for student in new_order}
+        window.save_data({"op": "reorder", "order": new_order})
+    return handler
+
+
+def run(window, moves, seed):
+    """随机移动学生，返回 (每次移动耗时列表, 持久化的操作字节数列表)"""
+    rng = random.Random(seed)
+    model = window.student_list.model()
+    count = model.rowCount()
+    times, sizes = [], []
+    for _ in range(moves):
+        src = rng.randrange(count)
+        dst = rng.randrange(count + 1)
+        if dst in (src, src + 1):
+            continue
+        start = time.perf_counter()
+        model.moveRow(QModelIndex(), src, QModelIndex(), dst)
+        times.append(time.perf_counter() - start)
+        ops = window._pending_ops
+        sizes.append(sum(len(json.dumps(op, ensure_ascii=False).encode("utf-8")) for op in ops))
+        window.flush_saves()
+    window.writer.close()
+    return times, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学生列表拖拽排序基准测试")
+    parser.add_argument("--students", type=int, default=2000, help="学生人数")
+    parser.add_argument("--moves", type=int, default=200, help="移动次数")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    import importlib
+    app_module = importlib.import_module("补课时间")
+
+    orders = {}
+    print(f"{'实现':<8}{'中位数(ms)':>12}{'最大(ms)':>12}{'每次写入(字节)':>16}")
+    for name in ("原实现", "顺序索引"):
+        with tempfile.TemporaryDirectory() as workdir:
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                store = JournalStore("tutoring_data.txt", "tutoring_data.journal")
+                store.save_snapshot({f"学生{i:05d}": new_student(["数学"]) for i in range(args.students)})
+                store.close()
+
+                window = app_module.TutoringRecorder()
+                if name == "原实现":
+                    window.student_list.model().rowsMoved.disconnect(window.on_students_reordered)
+                    window.student_list.model().rowsMoved.connect(legacy_reorder(window))
+                times, sizes = run(window, args.moves, seed=0)
+                window.store.close()
+                window.logger.close()
+                orders[name] = list(JournalStore("tutoring_data.txt", "tutoring_data.journal").load())
+            finally:
+                os.chdir(cwd)
+        print(f"{name:<8}{statistics.median(times) * 1000:>12.3f}{max(times) * 1000:>12.3f}"
+              f"{statistics.mean(sizes):>16.0f}")
+
+    print("两种实现保存的顺序一致" if orders["原实现"] == orders["顺序索引"] else "警告: 两种实现保存的顺序不一致")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""学生搜索基准测试：逐字输入时每次过滤的耗时
+
+生成确定性的中文姓名名单，模拟逐字输入姓名前缀、姓名子串和拼音首字母，统计
+StudentSearchIndex 每次搜索的耗时（首次搜索包含建索引），并与逐个学生比对的朴素过滤对比。
+用法: python benchmarks/bench_search.py [--students 10000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roster import make_names  # noqa: E402
+from student_search import StudentSearchIndex, search_key  # noqa: E402
+
+QUERIES = ["张", "张伟", "zw", "zwe", "伟", "思雨", "l", "lj", "ljg"]
+
+
+def naive_search(names, keys, query):
+    return [row for row, name in enumerate(names) if query in keys[name]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学生搜索基准测试")
+    parser.add_argument("--students", type=int, default=10000, help="学生人数")
+    parser.add_argument("--repeat", type=int, default=20, help="每组输入的重复次数")
+    args = parser.parse_args()
+
+    names = make_names(args.students)
+    index = StudentSearchIndex()
+    start = time.perf_counter()
+    index.search(names, "")
+    build = time.perf_counter() - start
+    keys = {name: search_key(name) for name in names}
+    print(f"{args.students} 名学生，建索引 {build * 1000:.1f} ms")
+
+    print(f"{'输入':<8}{'命中':>8}{'索引(ms)':>12}{'朴素(ms)':>12}")
+    for query in QUERIES:
+        indexed, naive = [], []
+        for _ in range(args.repeat):
+            # 逐字输入：前面的字符先搜索一遍，只计最后一次的耗时
+            index.search(names, "")
+            for i in range(1, len(query)):
+                index.search(names, query[:i])
+            start = time.perf_counter()
+            rows = index.search(names, query)
+            indexed.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            expected = naive_search(names, keys, query.lower())
+            naive.append(time.perf_counter() - start)
+            assert rows == expected, query
+        print(f"{query:<8}{len(rows):>8}{statistics.median(indexed) * 1000:>12.3f}"
+              f"{statistics.median(naive) * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""冷启动耗时基准测试
+
+每次都启动一个新进程运行主程序（无界面平台 offscreen），读取其输出的各阶段耗时，
+取中位数；总耗时超过预算时以非零状态退出，可用于回归检查。
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--budget 2.0] [--data tutoring_data.txt]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "补课时间.py")
+
+
+def run_once(workdir, timeout):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, APP, "--exit-after-startup"], cwd=workdir, env=env,
+                          capture_output=True, text=True, encoding="utf-8", timeout=timeout)
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP_PROFILE "):
+            return json.loads(line[len("STARTUP_PROFILE "):])
+    raise RuntimeError(f"未读取到启动耗时输出 (退出码 {proc.returncode}):\n{proc.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动耗时基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="启动次数")
+    parser.add_argument("--budget", type=float, default=2.0, help="总耗时预算（秒），超过则失败")
+    parser.add_argument("--data", help="启动时使用的 tutoring_data.txt")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次启动超时（秒）")
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            if args.data:
+                shutil.copy(args.data, os.path.join(workdir, "tutoring_data.txt"))
+            results.append(run_once(workdir, args.timeout))
+
+    phases = ["imports", "init_ui", "load_data", "first_paint", "total"]
+    print(f"{'阶段':<12}{'中位数(ms)':>12}{'最大(ms)':>12}")
+    for phase in phases:
+        values = [r[phase] for r in results if phase in r]
+        if values:
+            print(f"{phase:<12}{statistics.median(values) * 1000:>12.1f}{max(values) * 1000:>12.1f}")
+
+    total = statistics.median(r["total"] for r in results)
+    if total > args.budget:
+        print(f"失败: 启动总耗时中位数 {total:.3f}s 超过预算 {args.budget:.3f}s")
+        return 1
+    print(f"通过: 启动总耗时中位数 {total:.3f}s，预算 {args.budget:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""主窗口热点操作基准测试套件
+
+对每个名单规模（默认 10、100、1000 名学生，最多 10000），用 roster.py 生成确定性的数据，在无界面平台
+（offscreen）上打开主窗口，分别计时:
+    load_data              重新加载全部数据并刷新学生列表
+    save_data              提交一条修改并等待后台线程写入完成
+    add_attendance         添加一条上课记录（不含防抖后的写入）
+    add_payment            添加一条结算记录
+    update_records_table   切换到另一个学生的上课记录表格
+    delete_record          在表格中选中 5 行后一次删除
+    export_to_excel        导出 Excel 并等待后台导出完成（不使用增量导出缓存）
+报告每项操作的吞吐量（次/秒）、延迟百分位（p50 / p90 / p99 / 最大）和峰值内存（tracemalloc，
+单独一轮测量，避免影响计时）。结果可保存为 JSON 基线，之后的运行用 --baseline 与之对比，
+p50 或峰值内存变差超过阈值（且超过计时噪声）时标记为回归并以非零状态退出。
+
+用法:
+    python benchmarks/bench_suite.py [--sizes 10 100 1000] [--repeat 50] [--save benchmarks/baseline.json]
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json [--threshold 0.2]
+
+仓库中的 benchmarks/baseline.json 由下面的命令生成（默认规模，约 4 分钟），其中 machine 字段记录了
+生成时的 Python 版本和平台。计时只在同一台机器上可比，换机器后先用同样的命令重新生成；
+有意改变性能的修改合入时，也用这条命令更新基线并一起提交:
+    python benchmarks/bench_suite.py --sizes 10 100 1000 --save benchmarks/baseline.json
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt5.QtCore import QDate, QItemSelectionModel  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+import excel_export  # noqa: E402
+from journal_store import apply_op  # noqa: E402
+from ledger import open_store  # noqa: E402
+from roster import generate_roster  # noqa: E402
+
+OPERATIONS = ["load_data", "save_data", "add_attendance", "add_payment",
+              "update_records_table", "delete_record", "export_to_excel"]
+SLOW_OPERATIONS = {"load_data", "export_to_excel"}  # 每次耗时较长，按 --slow-repeat 次数运行
+DELETE_ROWS = 5
+MEMORY_REPEAT = 3
+
+
+def silence_dialogs():
+    """基准测试中不弹出对话框；确认删除一律选“是”"""
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.warning = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.critical = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.Yes)
+
+
+def drain(window):
+    """等待后台线程处理完此前提交的保存和导出任务"""
+    done = threading.Event()
+    window.writer.submit("sync", done.set)
+    done.wait()
+    # 处理后台线程发回的完成信号
+    QApplication.processEvents()
+
+
+def percentile(values, p):
+    """最近秩法百分位，values 已排序"""
+    rank = math.ceil(p / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+class Scenario:
+    """一个名单规模下的各项操作；prepare_xxx(i) 做不计时的准备，返回需要计时的函数"""
+
+    def __init__(self, window):
+        self.window = window
+        self.names = list(window.students)
+        self.day = datetime.date(2025, 1, 1)
+
+    def _student(self, i, min_records=0):
+        """按序号轮流选择学生，跳过记录太少的学生"""
+        for k in range(len(self.names)):
+            name = self.names[(i + k) % len(self.names)]
+            if len(self.window.students[name]["records"]) >= min_records:
+                return name
+        return None
+
+    def _select(self, name):
+        self.window.on_student_selected(name)
+
+    def _next_date(self):
+        self.day += datetime.timedelta(days=1)
+        return self.day
+
+    def prepare_load_data(self, i):
+        return self.window.load_data
+
+    def prepare_save_data(self, i):
+        window = self.window
+        name = self._student(i)
+        op = {"op": "add_record", "student": name, "date": self._next_date().isoformat(), "duration": 1.0}
+
+        def run():
+            apply_op(window.students, op)
+            window.save_data(op)
+            window.flush_saves()
+            drain(window)
+        return run
+
+    def prepare_add_attendance(self, i):
+        self._select(self._student(i))
+        date = self._next_date()
+        self.window.date_input.setDate(QDate(date.year, date.month, date.day))
+        self.window.duration_input.setValue(1.5)
+        return self.window.add_attendance
+
+    def prepare_add_payment(self, i):
+        self._select(self._student(i))
+        date = self._next_date()
+        self.window.payment_date_input.setDate(QDate(date.year, date.month, date.day))
+        self.window.payment_hours_input.setValue(0.5)
+        return self.window.add_payment
+
+    def prepare_update_records_table(self, i):
+        window = self.window
+        name = self._student(i)
+        # 先切到另一个学生，计时的刷新才会重新绑定表格模型
+        window.update_records_table(self._student(i + 1))
+        return lambda: window.update_records_table(name)
+
+    def prepare_delete_record(self, i):
+        window = self.window
+        name = self._student(i, min_records=DELETE_ROWS)
+        self._select(name)
+        selection = window.records_table.selectionModel()
+        selection.clearSelection()
+        count = len(window.students[name]["records"])
+        for k in range(DELETE_ROWS):
+            selection.select(window.records_model.index(k * count // DELETE_ROWS, 0),
+                             QItemSelectionModel.Select | QItemSelectionModel.Rows)
+        return window.delete_record
+
+    def prepare_export_to_excel(self, i):
+        window = self.window
+
+        def run():
+            window.export_to_excel()
+            drain(window)
+        return run
+
+
+def measure(scenario, operation, repeat, memory_repeat):
+    """运行一项操作，返回统计结果字典"""
+    prepare = getattr(scenario, f"prepare_{operation}")
+    window = scenario.window
+    times = []
+    for i in range(repeat):
+        run = prepare(i)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    # 未写入的修改不计入下一项操作
+    window.flush_saves()
+    drain(window)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for i in range(memory_repeat):
+            run = prepare(repeat + i)
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    window.flush_saves()
+    drain(window)
+
+    times.sort()
+    return {
+        "count": len(times),
+        "throughput": len(times) / sum(times) if sum(times) else 0.0,
+        "p50_ms": percentile(times, 50) * 1000,
+        "p90_ms": percentile(times, 90) * 1000,
+        "p99_ms": percentile(times, 99) * 1000,
+        "max_ms": times[-1] * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run_size(app_module, students, weeks, repeat, slow_repeat):
+    """生成指定规模的数据并测量所有操作，返回 (数据规模说明, {操作: 结果})"""
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            roster = generate_roster(students, weeks)
+            records = sum(len(data["records"]) for data in roster.values())
+            store = open_store()
+            store.save_snapshot(roster)
+            store.close()
+            del roster
+
+            window = app_module.TutoringRecorder()
+            scenario = Scenario(window)
+            results = {}
+            for operation in OPERATIONS:
+                count = slow_repeat if operation in SLOW_OPERATIONS else repeat
+                results[operation] = measure(scenario, operation, count, min(count, MEMORY_REPEAT))
+            window.close()
+            window.store.close()
+            window.logger.close()
+            return {"students": students, "records": records}, results
+        finally:
+            os.chdir(cwd)
+
+
+# 绝对变化小于该值时不算回归（微秒级操作的计时噪声）: p50 毫秒数、峰值 KB
+NOISE_FLOOR = {"p50_ms": 0.05, "peak_kb": 16.0}
+
+
+def print_results(size, info, results, baseline=None, threshold=0.2):
+    """打印一个规模的结果；有基线时附上 p50 和峰值内存的变化，返回回归项列表"""
+    print(f"\n== {size} 名学生，{info['records']} 条上课记录 ==")
+    header = f"{'操作':<22}{'次数':>6}{'次/秒':>10}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}{'峰值(KB)':>11}"
+    print(header + ("  与基线比较" if baseline else ""))
+    regressions = []
+    for operation, r in results.items():
+        line = (f"{operation:<22}{r['count']:>6}{r['throughput']:>10.1f}{r['p50_ms']:>10.3f}{r['p90_ms']:>10.3f}"
+                f"{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}{r['peak_kb']:>11.1f}")
+        base = (baseline or {}).get(operation)
+        if base:
+            notes = []
+            for key, label in (("p50_ms", "p50"), ("peak_kb", "内存")):
+                if base[key] > 0:
+                    change = r[key] / base[key] - 1
+                    notes.append(f"{label} {change:+.0%}")
+                    if change > threshold and r[key] - base[key] > NOISE_FLOOR[key]:
+                        regressions.append(f"{size} 名学生 {operation} {label} 变差 {change:.0%}")
+            line += "  " + ", ".join(notes)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主窗口热点操作基准测试套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="学生人数（10~10000）")
+    parser.add_argument("--weeks", type=int, default=52, help="上课记录最长跨越的周数")
+    parser.add_argument("--repeat", type=int, default=50, help="快速操作的重复次数")
+    parser.add_argument("--slow-repeat", type=int, default=3, help="加载和导出的重复次数")
+    parser.add_argument("--save", help="把结果保存为 JSON 基线")
+    parser.add_argument("--baseline", help="与之前保存的 JSON 基线比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定为回归的变差比例")
+    args = parser.parse_args()
+    for size in args.sizes:
+        if not 10 <= size <= 10000:
+            parser.error(f"学生人数应在 10~10000 之间: {size}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    app = QApplication(sys.argv[:1])
+    silence_dialogs()
+    excel_export.EXPORT_CACHE = ""  # 每次都完整导出，结果才可比较
+    import importlib
+    app_module = importlib.import_module("补课时间")
+
+    report = {"machine": {"python": platform.python_version(), "platform": platform.platform()},
+              "weeks": args.weeks, "results": {}}
+    regressions = []
+    for size in args.sizes:
+        info, results = run_size(app_module, size, args.weeks, args.repeat, args.slow_repeat)
+        report["results"][str(size)] = dict(info, **results)
+        regressions += print_results(size, info, results, (baseline or {}).get(str(size)), args.threshold)
+    app.quit()
+
+    if args.save:
+        # 保留三位小数并排序键，基线文件的差异即结果的变化
+        rounded = json.loads(json.dumps(report), parse_float=lambda v: round(float(v), 3))
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(rounded, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n结果已保存到 {args.save}")
+    if regressions:
+        print("\n发现回归:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""确定性的学生名单生成器，供各基准测试使用
+
+每个学生有 1~3 个补习科目，在一段时间内每周固定 1~3 天上课（偶有缺课），每次课时长固定为
+1、1.5 或 2 小时；未结算课时累计到学生各自的结算额度（8、12 或 16 小时）时，在之后几天内结算一次，
+最后一段课时可能尚未结算。给定学生人数和随机种子时，生成的数据完全相同。
+
+命令行用法（写入当前目录的数据文件，后端和格式同主程序的环境变量）:
+    python benchmarks/roster.py --students 1000 [--weeks 52] [--seed 0]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_store import new_student  # noqa: E402
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢"
+GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍红鹏辉建国志宇浩然思雨欣怡子涵梓轩"
+SUBJECTS = ["数学", "英语", "物理", "化学", "语文", "生物"]
+START_DATE = datetime.date(2023, 9, 1)
+
+
+def make_names(count, seed=0):
+    """生成不重复的中文姓名"""
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.randint(1, 2)))
+        if name in seen:
+            name += str(len(names))
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def make_history(rng, weeks):
+    """生成一个学生的 (上课记录, 结算记录)，均按日期有序"""
+    first = START_DATE + datetime.timedelta(days=rng.randrange(7 * max(1, weeks // 4)))
+    length = rng.randint(max(1, weeks // 4), weeks)
+    weekdays = sorted(rng.sample(range(7), rng.choice([1, 1, 2, 2, 3])))
+    duration = rng.choice([1.0, 1.5, 2.0])
+    block = rng.choice([8.0, 12.0, 16.0])
+
+    records, payments = [], []
+    unsettled = 0.0
+    monday = first - datetime.timedelta(days=first.weekday())
+    for week in range(length):
+        for weekday in weekdays:
+            day = monday + datetime.timedelta(weeks=week, days=weekday)
+            if day < first or rng.random() < 0.08:
+                continue
+            date = day.isoformat()
+            records.append((date, duration))
+            unsettled += duration
+            if unsettled >= block:
+                paid = (day + datetime.timedelta(days=rng.randint(0, 3))).isoformat()
+                payments.append((paid, block))
+                unsettled -= block
+    payments.sort(key=lambda entry: entry[0])
+    return records, payments
+
+
+def generate_roster(students, weeks=52, seed=0):
+    """生成 {姓名: 学生数据} 的名单，学生顺序即生成顺序"""
+    rng = random.Random(seed)
+    roster = {}
+    for name in make_names(students, seed):
+        subjects = rng.sample(SUBJECTS, rng.randint(1, 3))
+        records, payments = make_history(rng, weeks)
+        roster[name] = new_student(subjects, records, payments)
+    return roster
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成确定性的学生数据")
+    parser.add_argument("--students", type=int, default=1000, help="学生人数")
+    parser.add_argument("--weeks", type=int, default=52, help="上课记录最长跨越的周数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    from ledger import open_store
+
+    roster = generate_roster(args.students, args.weeks, args.seed)
+    store = open_store()
+    try:
+        store.save_snapshot(roster)
+    finally:
+        store.close()
+    records = sum(len(data["records"]) for data in roster.values())
+    payments = sum(len(data["payments"]) for data in roster.values())
+    print(f"已生成 {len(roster)} 名学生、{records} 条上课记录、{payments} 条结算记录")
+
+
+if __name__ == "__main__":
+    main()
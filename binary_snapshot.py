@@ -0,0 +1,319 @@
+"""二进制快照格式：文件头 + 学生目录 + 定长记录块，通过 mmap 按需读取
+
+文件布局（小端序）:
+    文件头   magic(8) 版本(u16) 标志(u16) 学生数(u32) 日志序号(u64) 目录偏移(u64) 科目表偏移(u64)
+    科目表   条目数(u32)，每项 长度(u32) + UTF-8 字节
+    记录块   每个学生: 上课记录的日期 int32[n]、时长[n]、科目编号 int16[n]（补齐到 4 字节），
+             结算记录的日期 int32[m]、时长[m]
+    目录     每个学生一项定长条目: 姓名偏移/长度、补习科目偏移/长度、上课记录偏移/条数、
+             结算记录偏移/条数，其后是姓名和科目的 UTF-8 字节
+    校验     b"CRC\0" + 之前全部字节的 CRC32(u32)（版本 2 起）
+日期为序数日，科目编号 -1 表示没有科目字段。时长默认为 float64（版本 3 起，标志位 FLOAT_HOURS），
+与文本快照一样不损失精度；TUTORING_COMPACT_RECORDS=1 时为 0.01 小时的定点 int32（与 CompactEntryList
+相同），但只要有一个时长不是 0.01 小时的整数倍，整个文件就改写为 float64，不做舍入。
+打开时只读取文件头和目录；某个学生的记录在访问时才从映射的内存中解码。解码不是零拷贝：
+每列都用 array.frombytes 从映射复制到独立的数组（之后可以关闭映射），使用 CompactEntryList 时
+这一次复制得到的数组直接作为列存储，不再逐条组装元组；float64 时长列都是 0.01 小时的整数倍时
+还会再转换一次为定点列。
+命令行用法（与文本快照互相转换）: python binary_snapshot.py tutoring_data.txt tutoring_data.bin
+"""
+import datetime
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import record_store
+from record_store import CompactEntryList, EntryList, HOURS_SCALE, NO_SUBJECT
+
+MAGIC = b"TUTRBIN\0"
+FORMAT_VERSION = 3
+SUPPORTED_VERSIONS = (1, 2, 3)  # 版本 1 没有末尾校验，版本 3 起有标志位
+FLOAT_HOURS = 1  # 标志位: 时长为 float64 而不是定点 int32
+HEADER = struct.Struct("<8sHHIQQQ")
+DIRECTORY_ENTRY = struct.Struct("<QIQIQIQI")
+TRAILER = struct.Struct("<4sI")
+TRAILER_MAGIC = b"CRC\0"
+
+
+def _ordinals(dates):
+    cache = {}
+    result = array("i")
+    for date in dates:
+        ordinal = cache.get(date)
+        if ordinal is None:
+            ordinal = cache[date] = datetime.date.fromisoformat(date).toordinal()
+        result.append(ordinal)
+    return result
+
+
+def _le_bytes(values):
+    """数组的小端字节"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _InexactHours(ValueError):
+    """时长不是 0.01 小时的整数倍，不能写成定点列"""
+
+
+def _fixed_hours(entries):
+    """定点时长列；有不是 0.01 小时整数倍的时长时抛出 _InexactHours，避免静默舍入"""
+    if isinstance(entries, CompactEntryList) and entries.exact:
+        return entries._hours
+    values = array("i")
+    for entry in entries:
+        fixed = round(entry[1] * HOURS_SCALE)
+        if abs(fixed - entry[1] * HOURS_SCALE) > 1e-6:
+            raise _InexactHours(entry[1])
+        values.append(fixed)
+    return values
+
+
+def write_binary_snapshot(f, students, seq=0):
+    """把学生数据写成二进制快照；f 为以可读写二进制模式（"w+b"）打开、位于开头的文件"""
+    if record_store.COMPACT_RECORDS:
+        try:
+            _write(f, students, seq, float_hours=False)
+            return
+        except _InexactHours:
+            # 有不能用定点表示的时长：整个文件改用 float64 时长重写
+            f.seek(0)
+            f.truncate()
+    _write(f, students, seq, float_hours=True)
+
+
+def _write(f, students, seq, float_hours):
+    flags = FLOAT_HOURS if float_hours else 0
+
+    def hours_column(entries):
+        if float_hours:
+            return array("d", (entry[1] for entry in entries))
+        return _fixed_hours(entries)
+
+    subjects = []
+    subject_ids = {}
+    directory = []
+    f.write(b"\0" * HEADER.size)
+    pos = HEADER.size
+
+    for name, data in students.items():
+        records = data["records"]
+        payments = data["payments"]
+        record_subjects = array("h")
+        for record in records:
+            if len(record) > 2:
+                sid = subject_ids.get(record[2])
+                if sid is None:
+                    sid = subject_ids[record[2]] = len(subjects)
+                    subjects.append(record[2])
+                record_subjects.append(sid)
+            else:
+                record_subjects.append(NO_SUBJECT)
+
+        record_offset = pos
+        block = [_le_bytes(_ordinals(entry[0] for entry in records)),
+                 _le_bytes(hours_column(records)),
+                 _le_bytes(record_subjects)]
+        if len(records) % 2:
+            block.append(b"\0\0")
+        payment_offset = record_offset + sum(len(b) for b in block)
+        block += [_le_bytes(_ordinals(entry[0] for entry in payments)),
+                  _le_bytes(hours_column(payments))]
+        data_bytes = b"".join(block)
+        f.write(data_bytes)
+        pos += len(data_bytes)
+        directory.append((name, ",".join(data.get("subjects", ["未设置"])),
+                          record_offset, len(records), payment_offset, len(payments)))
+
+    subjects_offset = pos
+    table = [struct.pack("<I", len(subjects))]
+    for subject in subjects:
+        raw = subject.encode("utf-8")
+        table.append(struct.pack("<I", len(raw)) + raw)
+    table = b"".join(table)
+    f.write(table)
+    pos += len(table)
+
+    # 目录: 定长条目在前，姓名和科目字符串在后
+    directory_offset = pos
+    strings_pos = directory_offset + DIRECTORY_ENTRY.size * len(directory)
+    entries, strings = [], []
+    for name, subjects_text, record_offset, record_count, payment_offset, payment_count in directory:
+        raw_name = name.encode("utf-8")
+        raw_subjects = subjects_text.encode("utf-8")
+        entries.append(DIRECTORY_ENTRY.pack(strings_pos, len(raw_name), strings_pos + len(raw_name),
+                                            len(raw_subjects), record_offset, record_count,
+                                            payment_offset, payment_count))
+        strings += [raw_name, raw_subjects]
+        strings_pos += len(raw_name) + len(raw_subjects)
+    f.write(b"".join(entries))
+    f.write(b"".join(strings))
+
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(directory), seq, directory_offset, subjects_offset))
+    f.flush()
+
+    # 末尾校验: 重新读取已写入的内容计算 CRC32
+    f.seek(0)
+    crc = 0
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+        crc = zlib.crc32(chunk, crc)
+    f.seek(0, os.SEEK_END)
+    f.write(TRAILER.pack(TRAILER_MAGIC, crc))
+
+
+def verify_binary_snapshot(path):
+    """校验二进制快照：通过返回 True，损坏返回 False，没有校验和的旧版本返回 None"""
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+                    return False
+                version = HEADER.unpack_from(data, 0)[1]
+                if version == 1:
+                    return None
+                if version not in SUPPORTED_VERSIONS or len(data) < HEADER.size + TRAILER.size:
+                    return False
+                magic, crc = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+                with memoryview(data)[:len(data) - TRAILER.size] as body:
+                    return magic == TRAILER_MAGIC and zlib.crc32(body) == crc
+        except ValueError:
+            # 空文件无法映射
+            return False
+
+
+class BinarySnapshot:
+    """以 mmap 打开的二进制快照：打开时只读取目录，学生记录按需复制出来解码"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"{path} 不是有效的二进制快照")
+        magic, version, flags, count, self.seq, directory_offset, subjects_offset = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} 不是有效的二进制快照")
+        if version not in SUPPORTED_VERSIONS:
+            self.close()
+            raise ValueError(f"不支持的二进制快照版本: {version}")
+        self.float_hours = version >= 3 and bool(flags & FLOAT_HOURS)
+
+        self.subjects = []
+        (subject_count,) = struct.unpack_from("<I", self._map, subjects_offset)
+        pos = subjects_offset + 4
+        for _ in range(subject_count):
+            (length,) = struct.unpack_from("<I", self._map, pos)
+            self.subjects.append(self._map[pos + 4:pos + 4 + length].decode("utf-8"))
+            pos += 4 + length
+
+        self.directory = {}  # 姓名 -> 目录条目，顺序即学生顺序
+        for entry in DIRECTORY_ENTRY.iter_unpack(
+                self._map[directory_offset:directory_offset + DIRECTORY_ENTRY.size * count]):
+            name = self._map[entry[0]:entry[0] + entry[1]].decode("utf-8")
+            self.directory.setdefault(name, entry)
+
+    def names(self):
+        return list(self.directory)
+
+    def _column(self, typecode, offset, count):
+        """把映射中的一列定长数值复制到新的数组（array.frombytes 复制一次，不引用映射）"""
+        values = array(typecode)
+        with memoryview(self._map)[offset:offset + values.itemsize * count] as view:
+            values.frombytes(view)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    def _entries(self, offset, count, with_subjects):
+        dates = self._column("i", offset, count)
+        hours = self._column("d" if self.float_hours else "i", offset + 4 * count, count)
+        subjects_offset = offset + (4 + hours.itemsize) * count
+        subjects = self._column("h", subjects_offset, count) if with_subjects else None
+        if record_store.COMPACT_RECORDS:
+            return CompactEntryList.from_columns(dates, hours, subjects, self.subjects)
+        to_date = {ordinal: datetime.date.fromordinal(ordinal).isoformat() for ordinal in set(dates)}
+        columns = [[to_date[ordinal] for ordinal in dates],
+                   hours.tolist() if self.float_hours else [h / HOURS_SCALE for h in hours]]
+        if subjects is None or NO_SUBJECT not in subjects:
+            if subjects is not None:
+                columns.append([self.subjects[sid] for sid in subjects])
+            return EntryList(zip(*columns))
+        return EntryList((date, hours) if sid == NO_SUBJECT else (date, hours, self.subjects[sid])
+                         for date, hours, sid in zip(*columns, subjects))
+
+    def load_student(self, name):
+        """解码单个学生的数据，不存在时返回 None"""
+        entry = self.directory.get(name)
+        if entry is None:
+            return None
+        _, _, subjects_offset, subjects_len, record_offset, record_count, payment_offset, payment_count = entry
+        subjects_text = self._map[subjects_offset:subjects_offset + subjects_len].decode("utf-8")
+        return {
+            "records": self._entries(record_offset, record_count, True),
+            "payments": self._entries(payment_offset, payment_count, False),
+            "subjects": [s.strip() for s in subjects_text.split(",") if s.strip()] or ["未设置"],
+        }
+
+    def load(self):
+        """解码全部学生，返回学生字典"""
+        return {name: self.load_student(name) for name in self.directory}
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def read_binary_snapshot(path):
+    """读取完整的二进制快照，返回 (学生字典, 日志序号)；文件不存在时返回空数据"""
+    if not os.path.exists(path):
+        return {}, 0
+    snapshot = BinarySnapshot(path)
+    try:
+        return snapshot.load(), snapshot.seq
+    finally:
+        snapshot.close()
+
+
+def convert(src, dst):
+    """在文本快照与二进制快照之间转换（按扩展名 .bin 判断），返回学生数
+
+    先写入临时文件并落盘，再原子地重命名为目标文件。
+    """
+    from journal_store import parse_snapshot, write_snapshot
+
+    tmp_path = dst + ".tmp"
+    if src.endswith(".bin"):
+        students, seq = read_binary_snapshot(src)
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            write_snapshot(f, students, seq)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with open(src, "r", encoding="utf-8") as f:
+            students, seq = parse_snapshot(f)
+        with open(tmp_path, "w+b") as f:
+            write_binary_snapshot(f, students, seq)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, dst)
+    return len(students)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "tutoring_data.txt"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "tutoring_data.bin"
+    count = convert(src, dst)
+    print(f"已转换 {count} 名学生: {src} -> {dst}")
@@ -0,0 +1,160 @@
+"""长表格式的批量导出 / 导入：CSV 与 Parquet
+
+每条上课记录或结算记录一行，列为 student, date, hours, kind（kind 为 record 或 payment），
+便于计费、统计等外部程序直接读取。导出 CSV 时逐行流式写入；Parquet 需要 pandas 和
+pyarrow（或 fastparquet）。导入时用 pandas 一次性读入并校验整列，按学生分组后
+生成每个学生一条 import_entries 操作，由存储在一次写入中应用；与现有数据相同的条目跳过，
+导入后结算课时不能超过总上课时长（与 ledger.check_payment 相同的规则）。
+命令行导入 / 导出见 ledger.py import / export。
+pandas 只在第一次导入或导出 Parquet 时才导入，避免拖慢程序启动。
+"""
+import collections
+import csv
+import math
+import os
+
+from ledger import LedgerError, check_payment
+
+LONG_COLUMNS = ["student", "date", "hours", "kind"]
+KINDS = ("record", "payment")
+
+
+def long_format(filename):
+    """按扩展名判断格式: "csv" 或 "parquet" """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"不支持的文件格式: {ext or filename}（应为 .csv 或 .parquet）")
+
+
+def iter_long_rows(students):
+    """逐行产出 (student, date, hours, kind)；students 为 (姓名, 数据) 的可迭代对象或学生字典"""
+    if hasattr(students, "items"):
+        students = students.items()
+    for student, data in students:
+        # 处理不同格式的记录，忽略科目字段
+        for record in data["records"]:
+            yield student, record[0], record[1], "record"
+        for date, hours in data["payments"]:
+            yield student, date, hours, "payment"
+
+
+def export_long(students, filename):
+    """把学生数据导出为长表格式的 CSV 或 Parquet 文件，返回导出的行数"""
+    fmt = long_format(filename)
+    rows = iter_long_rows(students)
+
+    if fmt == "csv":
+        count = 0
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(LONG_COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    import pandas as pd
+
+    columns = list(zip(*rows)) or [(), (), (), ()]
+    frame = pd.DataFrame({
+        "student": pd.Categorical(columns[0]),
+        "date": pd.Series(columns[1], dtype="string"),
+        "hours": pd.Series(columns[2], dtype="float64"),
+        "kind": pd.Categorical(columns[3], categories=KINDS),
+    })
+    frame.to_parquet(filename, index=False)
+    return len(frame)
+
+
+def read_long(filename):
+    """读取长表文件并整列校验、规范化，返回 DataFrame；数据不合法时抛出 ValueError"""
+    import pandas as pd
+
+    if long_format(filename) == "csv":
+        frame = pd.read_csv(filename, dtype={"student": str, "date": str, "kind": str})
+    else:
+        frame = pd.read_parquet(filename)
+
+    missing = [c for c in LONG_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"缺少列: {', '.join(missing)}")
+    frame = frame[LONG_COLUMNS].copy()
+
+    frame["student"] = frame["student"].astype("string").str.strip()
+    frame["kind"] = frame["kind"].astype("string").str.strip().str.lower()
+    # 整数列也统一为浮点数，与界面录入的时长类型一致
+    frame["hours"] = pd.to_numeric(frame["hours"], errors="coerce").astype(float)
+    # 日期统一为 yyyy-MM-dd，与界面录入的格式一致
+    frame["date"] = pd.to_datetime(frame["date"].astype("string"), errors="coerce", format="mixed")
+
+    bad = (frame["student"].isna() | (frame["student"] == "") | frame["date"].isna()
+           | frame["hours"].isna() | (frame["hours"] <= 0) | ~frame["kind"].isin(KINDS))
+    if bad.any():
+        rows = ", ".join(str(i + 2) for i in frame.index[bad][:5])
+        raise ValueError(f"有 {int(bad.sum())} 行数据不合法（第 {rows} 行等）")
+
+    frame["date"] = frame["date"].dt.strftime("%Y-%m-%d")
+    return frame
+
+
+def _new_entries(existing, entries):
+    """去掉与现有条目（日期、时长）相同的条目，按出现次数计：重复导入同一文件不会产生重复记录"""
+    if not existing:
+        return entries
+    counts = collections.Counter((entry[0], entry[1]) for entry in existing)
+    result = []
+    for entry in entries:
+        key = (entry[0], entry[1])
+        if counts[key]:
+            counts[key] -= 1
+        else:
+            result.append(entry)
+    return result
+
+
+def import_ops(frame, students=None):
+    """把规范化后的长表按学生分组，返回 import_entries 操作列表（学生按首次出现的顺序）
+
+    给出现有学生数据时跳过已存在的相同条目，没有新条目的学生不生成操作；
+    导入后某个学生的结算课时超过总上课时长时抛出 LedgerError。
+    """
+    order = frame["student"].drop_duplicates().tolist()
+    # 先按日期稳定排序，分组后每个学生的条目已经有序
+    frame = frame.sort_values("date", kind="stable")
+    ops = {}
+    for (student, kind), group in frame.groupby(["student", "kind"], sort=False):
+        op = ops.setdefault(student, {"op": "import_entries", "student": student, "records": [], "payments": []})
+        entries = [list(entry) for entry in zip(group["date"].tolist(), group["hours"].tolist())]
+        op["records" if kind == "record" else "payments"] = entries
+
+    result = []
+    for student in order:
+        op = ops[student]
+        data = students.get(student) if students is not None else None
+        if data is not None:
+            op["records"] = _new_entries(data["records"], op["records"])
+            op["payments"] = _new_entries(data["payments"], op["payments"])
+            if not op["records"] and not op["payments"]:
+                continue
+        else:
+            data = {"records": _Totals(), "payments": _Totals()}
+        try:
+            check_payment(data, math.fsum(hours for _, hours in op["payments"]),
+                          math.fsum(hours for _, hours in op["records"]))
+        except LedgerError as e:
+            raise LedgerError(f"{student}: {e}") from None
+        result.append(op)
+    return result
+
+
+def imported_rows(ops):
+    """操作中实际导入的条目数"""
+    return sum(len(op["records"]) + len(op["payments"]) for op in ops)
+
+
+class _Totals:
+    """新学生的空条目列表（只用于结算检查）"""
+    total = 0.0
@@ -0,0 +1,264 @@
+"""Excel 导出：总览表 + 每个学生的上课记录表和结算记录表
+
+使用 openpyxl 的只写模式，逐个学生从存储中读取记录并直接流式写入工作表，
+写完一个学生的工作表就将其关闭，内存占用与数据总量无关。
+工作线程数大于 1 时，各学生的行数据和合计先在线程池（或进程池）中并行准备，
+再按原有学生顺序写入工作簿；同时在途的学生数有上限，内存占用仍然有界。
+启用导出缓存时，每个学生工作表的内容摘要和生成的工作表 XML 会保存在缓存目录中，
+下次导出时内容未变化的工作表直接复用缓存，只重新生成有变化的学生和总览表。
+openpyxl 只在第一次导出时才导入，避免拖慢程序启动。
+"""
+import datetime
+import hashlib
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+from record_store import student_totals
+
+# 并行准备各学生数据的工作数，1 表示串行；EXPORT_EXECUTOR 为 "thread" 或 "process"
+EXPORT_WORKERS = int(os.environ.get("TUTORING_EXPORT_WORKERS", "1"))
+EXPORT_EXECUTOR = os.environ.get("TUTORING_EXPORT_EXECUTOR", "thread")
+# 增量导出的缓存目录，设为空字符串则每次都完整生成
+EXPORT_CACHE = os.environ.get("TUTORING_EXPORT_CACHE", "tutoring_export_cache")
+# 缓存格式版本：表头或工作表写法变化时加一，旧缓存随之失效
+CACHE_FORMAT = 1
+
+OVERVIEW_HEADERS = ["学生姓名", "补习科目", "总上课时长(小时)", "已结算时长(小时)", "剩余时长(小时)"]
+RECORDS_HEADERS = ["日期", "时长(小时)", "累计时长(小时)"]
+PAYMENTS_HEADERS = ["日期", "结算时长(小时)", "累计结算(小时)"]
+
+
+def default_filename():
+    """按当天日期生成导出文件名"""
+    return f"补课时间记录{datetime.date.today().strftime('%Y%m%d')}.xlsx"
+
+
+def _header_row(ws, headers):
+    """表头样式与 pandas 导出时一致：加粗、细边框、居中"""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    side = Side(style="thin")
+    row = []
+    for text in headers:
+        cell = WriteOnlyCell(ws, value=text)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=side, right=side, top=side, bottom=side)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        row.append(cell)
+    return row
+
+
+def sheet_digest(kind, entries):
+    """工作表内容摘要：只取导出用到的日期和时长，科目字段的变化不影响导出结果"""
+    content = repr([(entry[0], entry[1]) for entry in entries])
+    return hashlib.sha1(f"{kind}\n{content}".encode("utf-8")).hexdigest()
+
+
+def prepare_student(student, data, skip_records=False, skip_payments=False):
+    """准备一个学生的总览行、上课记录行和结算记录行（可在工作线程/进程中执行）
+
+    skip_records / skip_payments 为真时对应工作表可复用缓存，返回 None 而不生成行。
+    """
+    total_duration, total_paid, remaining = student_totals(data)
+    subjects = data.get("subjects", ["未设置"])
+    overview_row = [student, ", ".join(subjects), total_duration, total_paid, remaining]
+
+    record_rows = payment_rows = None
+    if not skip_records:
+        records = data["records"]
+        # 处理不同格式的记录，忽略科目字段
+        record_rows = [[record[0], record[1], records.cumulative(row)] for row, record in enumerate(records)]
+    if not skip_payments:
+        payments = data["payments"]
+        payment_rows = [[date, hours, payments.cumulative(row)] for row, (date, hours) in enumerate(payments)]
+    return student, overview_row, record_rows, payment_rows
+
+
+def _prepared_students(students, workers, executor, cache):
+    """按原有顺序产出 (准备好的数据, 上课记录摘要, 结算记录摘要)；workers > 1 时并行准备"""
+    def tasks():
+        for student, data in students:
+            digests = None
+            skip = (False, False)
+            if cache is not None:
+                digests = (sheet_digest("records", data["records"]), sheet_digest("payments", data["payments"]))
+                skip = (cache.has(digests[0]), cache.has(digests[1]))
+            yield (student, data) + skip, digests
+
+    if workers <= 1:
+        for args, digests in tasks():
+            yield prepare_student(*args), digests
+        return
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        window = deque()
+        for args, digests in tasks():
+            window.append((pool.submit(prepare_student, *args), digests))
+            # 限制在途学生数，保证内存占用有界
+            if len(window) >= workers * 2:
+                future, digests = window.popleft()
+                yield future.result(), digests
+        while window:
+            future, digests = window.popleft()
+            yield future.result(), digests
+
+
+class ExportCache:
+    """增量导出缓存：按内容摘要保存已生成的工作表 XML
+
+    缓存目录中每个工作表一个 <摘要>.xml 文件，manifest.json 记录格式版本、openpyxl 版本
+    和上次导出用到的摘要。只有 manifest 中登记过的摘要才会被复用，版本不一致时整个缓存作废。
+    """
+
+    def __init__(self, directory):
+        import openpyxl
+
+        self.directory = directory
+        self.version = {"format": CACHE_FORMAT, "openpyxl": openpyxl.__version__}
+        self.known = set()
+        self.used = set()
+        self.reused = 0
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("version") == self.version:
+            self.known = {d for d in manifest.get("sheets", []) if os.path.exists(self._path(d))}
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.xml")
+
+    def has(self, digest):
+        return digest in self.known
+
+    def read(self, digest):
+        """读取缓存的工作表 XML"""
+        with open(self._path(digest), "rb") as f:
+            data = f.read()
+        self.reused += 1
+        return data
+
+    def store(self, digest, data):
+        """保存新生成的工作表 XML"""
+        if digest not in self.known:
+            with open(self._path(digest), "wb") as f:
+                f.write(data)
+            self.known.add(digest)
+
+    def commit(self):
+        """写入 manifest，并删除本次导出不再用到的缓存文件"""
+        manifest_path = self._manifest_path()
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "sheets": sorted(self.used)}, f)
+        os.replace(tmp_path, manifest_path)
+        for name in os.listdir(self.directory):
+            digest, ext = os.path.splitext(name)
+            if ext == ".xml" and digest not in self.used:
+                os.remove(os.path.join(self.directory, name))
+
+
+def _merge_cached_sheets(filename, cache, sheets):
+    """把 openpyxl 写出的工作簿中的占位工作表替换为缓存的 XML，并把新生成的工作表存入缓存
+
+    sheets 为 {工作表序号: (摘要, 是否复用缓存)}；openpyxl 按工作表顺序把第 n 个工作表
+    写为 xl/worksheets/sheet<n>.xml。
+    """
+    parts = {f"xl/worksheets/sheet{position}.xml": entry for position, entry in sheets.items()}
+    reused = any(cached for _, cached in parts.values())
+    merged = filename + ".merge"
+    with zipfile.ZipFile(filename) as source:
+        for name, (digest, cached) in parts.items():
+            if not cached:
+                cache.store(digest, source.read(name))
+        if reused:
+            with zipfile.ZipFile(merged, "w", zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    digest, cached = parts.get(info.filename, (None, False))
+                    data = cache.read(digest) if cached else source.read(info)
+                    target.writestr(info, data)
+    if reused:
+        os.replace(merged, filename)
+
+
+def export_students(students, filename, progress=None, workers=None, executor=None, cache_dir=None):
+    """把学生数据流式写入 Excel 文件，返回文件名
+
+    students 为 (姓名, 数据) 的可迭代对象（如 store.iter_students()）或学生字典；
+    progress(工作表名, 已完成工作表数) 在每个工作表写完后调用；
+    workers / executor / cache_dir 默认取 EXPORT_WORKERS / EXPORT_EXECUTOR / EXPORT_CACHE。
+    """
+    from openpyxl import Workbook
+
+    started = time.perf_counter()
+    if hasattr(students, "items"):
+        students = students.items()
+    if workers is None:
+        workers = EXPORT_WORKERS
+    if executor is None:
+        executor = EXPORT_EXECUTOR
+    if cache_dir is None:
+        cache_dir = EXPORT_CACHE
+    cache = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache = ExportCache(cache_dir)
+
+    wb = Workbook(write_only=True)
+    done = 0
+    sheets = {}  # 工作表序号 -> (摘要, 是否复用缓存)
+
+    # 总览表在遍历学生的同时逐行追加，最后补上导出时间
+    overview = wb.create_sheet("总览")
+    overview.append(_header_row(overview, OVERVIEW_HEADERS))
+    position = 1
+
+    for prepared, digests in _prepared_students(students, workers, executor, cache):
+        student, overview_row, record_rows, payment_rows = prepared
+        overview.append(overview_row)
+
+        for index, (title, headers, rows) in enumerate(((f"{student}_上课记录", RECORDS_HEADERS, record_rows),
+                                                        (f"{student}_结算记录", PAYMENTS_HEADERS, payment_rows))):
+            with metrics.timer("export.sheet"):
+                ws = wb.create_sheet(title)
+                position += 1
+                # rows 为 None 表示内容未变化，先写一个空的占位工作表，保存后替换为缓存
+                if rows is not None:
+                    ws.append(_header_row(ws, headers))
+                    for row in rows:
+                        ws.append(row)
+                if cache is not None:
+                    sheets[position] = (digests[index], rows is None)
+                    cache.used.add(digests[index])
+                # 写完即关闭，释放该工作表占用的临时文件
+                ws.close()
+            metrics.count("export.cached_sheets" if rows is None else "export.sheets")
+            done += 1
+            if progress:
+                progress(title, done)
+
+    # 添加导出时间信息
+    export_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    overview.append(["记录时间", "", export_time])
+    done += 1
+    if progress:
+        progress("总览", done)
+
+    with metrics.timer("export.save"):
+        wb.save(filename)
+        if cache is not None:
+            _merge_cached_sheets(filename, cache, sheets)
+            cache.commit()
+    metrics.observe("export.total", time.perf_counter() - started)
+    return filename
@@ -0,0 +1,689 @@
+"""追加式日志存储引擎：快照文件 + 增量日志
+
+每次修改只向日志追加一条增量记录，日志过长时在后台线程中合并成新的快照。
+加载时先读取快照，再按序号重放快照之后的日志条目。
+快照文件扩展名为 .bin 时使用二进制快照格式（见 binary_snapshot.py），否则为文本格式。
+
+快照先写入临时文件并 fsync，再原子地重命名覆盖原文件，文件末尾带有 CRC32 校验和。
+被替换的旧快照保留为 .1、.2 等历史版本；加载时若当前快照校验失败，就退回最近一个
+校验通过的历史版本。合并快照后日志只删除最旧的历史版本也已包含的条目，退回历史版本时
+仍能重放到最新状态。日志末尾写到一半的残缺条目会在加载时截掉，避免之后追加的条目接在残缺行后面；
+日志中间无法解析的行不会截断其后的条目，重放时跳过并记录在 journal_errors 中，
+合并快照删除日志条目时移到 .corrupt 文件保留。
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+
+import metrics
+from binary_snapshot import (BinarySnapshot, convert, read_binary_snapshot, verify_binary_snapshot,
+                             write_binary_snapshot)
+from record_store import make_entries, new_student
+from student_order import StudentOrder
+
+SNAPSHOT_FILE = "tutoring_data.txt"
+JOURNAL_FILE = "tutoring_data.journal"
+COMPACT_THRESHOLD = 1000  # 日志条目超过该数量时触发后台压缩
+SNAPSHOT_GENERATIONS = 2  # 保留的历史快照份数
+TEXT_FORMAT_VERSION = 2   # 版本 2 起文本快照以 VERSION 行开头、CHECKSUM 行结尾
+
+
+class SnapshotCorruptError(ValueError):
+    """快照及其所有历史版本都校验失败"""
+
+
+def parse_snapshot(lines):
+    """解析文本快照，返回 (学生字典, 快照包含的日志序号)"""
+    students = {}
+    seq = 0
+    current_student = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        parts = line.split(":", 1)
+        if len(parts) != 2:
+            continue
+
+        type_, content = parts
+
+        if type_ == "SEQ":
+            try:
+                seq = int(content)
+            except ValueError:
+                pass
+        elif type_ == "STUDENT":
+            current_student = content
+            if current_student not in students:
+                students[current_student] = {"records": make_entries(), "payments": make_entries()}
+        elif type_ == "SUBJECTS" and current_student:
+            # 加载学生补习科目
+            subjects = [s.strip() for s in content.split(",") if s.strip()]
+            if subjects:
+                students[current_student]["subjects"] = subjects
+        elif type_ == "RECORD" and current_student:
+            record_parts = content.split(",")
+            if len(record_parts) == 2:
+                # 旧格式的记录 (date, duration)
+                date, duration = record_parts
+                try:
+                    # 转换为新格式并添加默认科目
+                    students[current_student]["records"].append((date, float(duration), "未指定"))
+                except ValueError:
+                    pass
+            elif len(record_parts) >= 3:
+                # 新格式的记录 (date, duration, subject)
+                date, duration, subject = record_parts[:3]
+                try:
+                    students[current_student]["records"].append((date, float(duration), subject.strip()))
+                except ValueError:
+                    pass
+        elif type_ == "PAYMENT" and current_student:
+            payment_parts = content.split(",")
+            if len(payment_parts) == 2:
+                date, hours = payment_parts
+                try:
+                    students[current_student]["payments"].append((date, float(hours)))
+                except ValueError:
+                    pass
+
+    # 确保所有学生都有subjects字段
+    for data in students.values():
+        if "subjects" not in data:
+            data["subjects"] = ["未设置"]
+
+        # 对记录进行排序
+        data["records"].sort(key=lambda x: x[0])
+        data["payments"].sort(key=lambda x: x[0])
+
+    return students, seq
+
+
+def write_snapshot(f, students, seq=0):
+    """将学生数据以文本格式写入快照，末尾附加 CHECKSUM 行
+
+    f 应以 newline="\n" 打开，保证校验和对应的字节与文件内容一致。
+    """
+    crc = 0
+
+    def write(text):
+        nonlocal crc
+        crc = zlib.crc32(text.encode("utf-8"), crc)
+        f.write(text)
+
+    write(f"VERSION:{TEXT_FORMAT_VERSION}\nSEQ:{seq}\n")
+    for student, data in students.items():
+        lines = [f"STUDENT:{student}\n"]
+
+        # 保存补习科目
+        if "subjects" in data:
+            lines.append(f"SUBJECTS:{','.join(data['subjects'])}\n")
+
+        # 保存上课记录
+        for record in data["records"]:
+            # 处理不同格式的记录
+            if len(record) == 2:
+                date, duration = record
+                lines.append(f"RECORD:{date},{duration}\n")
+            else:
+                date, duration, subject = record
+                lines.append(f"RECORD:{date},{duration},{subject}\n")
+
+        # 保存结算记录
+        for date, hours in data["payments"]:
+            lines.append(f"PAYMENT:{date},{hours}\n")
+        write("".join(lines))
+
+    f.write(f"CHECKSUM:{crc:08x}\n")
+
+
+def verify_text_snapshot(path):
+    """校验文本快照：通过返回 True，损坏返回 False，没有校验和的旧版本返回 None"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(b"VERSION:"):
+        return None
+    start = data.rfind(b"\nCHECKSUM:")
+    if start < 0 or not data.endswith(b"\n"):
+        return False
+    try:
+        expected = int(data[start + 10:].strip(), 16)
+    except ValueError:
+        return False
+    return zlib.crc32(data[:start + 1]) == expected
+
+
+def _find_entry(entries, index, date, value):
+    """按位置提示查找条目，位置对不上时退回按值查找"""
+    if index is not None and 0 <= index < len(entries):
+        entry = entries[index]
+        if entry[0] == date and entry[1] == value:
+            return index
+    for i, entry in enumerate(entries):
+        if entry[0] == date and entry[1] == value:
+            return i
+    return -1
+
+
+def apply_op(students, op):
+    """将一条增量操作应用到学生字典上"""
+    kind = op["op"]
+
+    if kind == "reorder":
+        order = [name for name in op["order"] if name in students]
+        seen = set(order)
+        order += [name for name in students if name not in seen]
+        reordered = {name: students[name] for name in order}
+        students.clear()
+        students.update(reordered)
+        return
+
+    if kind == "move_student":
+        # 字典只能整体重建才能调整顺序；只在重放日志和合并快照时执行，界面上的移动不经过这里
+        name, before = op["student"], op.get("before")
+        if name not in students or name == before:
+            return
+        data = students.pop(name)
+        if before not in students:
+            students[name] = data
+            return
+        reordered = {}
+        for key, value in students.items():
+            if key == before:
+                reordered[name] = data
+            reordered[key] = value
+        students.clear()
+        students.update(reordered)
+        return
+
+    name = op["student"]
+    if kind == "add_student":
+        students[name] = new_student(op["subjects"])
+        return
+    if kind == "import_entries" and name not in students:
+        # 批量导入时学生不存在则自动创建
+        students[name] = new_student()
+
+    data = students.get(name)
+    if data is None:
+        return
+
+    if kind == "set_subjects":
+        data["subjects"] = op["subjects"]
+    elif kind == "add_record":
+        data["records"].add((op["date"], op["duration"]))
+    elif kind == "modify_record":
+        records = data["records"]
+        i = _find_entry(records, op.get("index"), op["old_date"], op["old_duration"])
+        if i >= 0:
+            records.replace(i, (op["date"], op["duration"]))
+    elif kind == "delete_record":
+        records = data["records"]
+        i = _find_entry(records, op.get("index"), op["date"], op["duration"])
+        if i >= 0:
+            records.pop(i)
+    elif kind == "add_payment":
+        data["payments"].add((op["date"], op["hours"]))
+    elif kind == "import_entries":
+        data["records"].merge(tuple(r) for r in op["records"])
+        data["payments"].merge(tuple(p) for p in op["payments"])
+
+
+def _parse_journal_line(line):
+    """解析一行日志；不是带整数序号的操作对象时与无法解析的行一样抛出 ValueError"""
+    op = json.loads(line)
+    if not isinstance(op, dict) or type(op.get("seq")) is not int or "op" not in op:
+        raise ValueError(f"不是有效的日志条目: {line[:80]!r}")
+    return op
+
+
+def _fsync_directory(path):
+    """让重命名落盘；不支持打开目录的平台（Windows）上跳过"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JournalStore:
+    """快照 + 追加日志的存储引擎"""
+
+    def __init__(self, snapshot_path=SNAPSHOT_FILE, journal_path=JOURNAL_FILE,
+                 compact_threshold=COMPACT_THRESHOLD):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        self._seq = 0             # 最近一次写入日志的序号
+        self._journal_entries = 0  # 日志中尚未合并进快照的条目数
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._offsets = None      # 惰性模式: 各学生在快照中的字节偏移
+        self._pending = {}        # 惰性模式: 各学生尚未并入快照的日志条目
+        self._readers = 0         # 正在逐个读取学生的遍历数，期间不做压缩
+        self.binary = snapshot_path.endswith(".bin")
+        self._reader = None       # 二进制快照: 惰性读取学生时使用的 mmap
+        self._source = None       # 实际读取的快照文件: 当前快照或校验通过的历史版本
+        self.recovered_from = None  # 当前快照损坏时，加载所用的历史版本路径
+        self.journal_errors = []    # 加载时日志中跳过的损坏行的行号
+        self.compact_error = None   # 最近一次后台合并快照失败的异常，成功后清空
+        self._compact_retry_at = 0  # 合并失败后，待合并条目数达到该值才再次尝试
+
+    def _generation(self, n):
+        return self.snapshot_path if n == 0 else f"{self.snapshot_path}.{n}"
+
+    def _verify(self, path):
+        return verify_binary_snapshot(path) if self.binary else verify_text_snapshot(path)
+
+    def _select_snapshot(self):
+        """选出校验通过的最新快照；都不存在时仍返回当前快照路径"""
+        self.recovered_from = None
+        candidates = [self._generation(n) for n in range(SNAPSHOT_GENERATIONS + 1)]
+        existing = [path for path in candidates if os.path.exists(path)]
+        for path in existing:
+            if self._verify(path) is not False:
+                if path != self.snapshot_path:
+                    self.recovered_from = path
+                self._source = path
+                return path
+        if existing:
+            raise SnapshotCorruptError(f"快照 {self.snapshot_path} 及其历史版本都校验失败")
+        self._source = self.snapshot_path
+        return self._source
+
+    def _snapshot_source(self):
+        return self._source or self._select_snapshot()
+
+    def _snapshot_seq(self, path):
+        """快照包含的日志序号（只读取文件头）；读取失败时返回 None"""
+        try:
+            if self.binary:
+                snapshot = BinarySnapshot(path)
+                try:
+                    return snapshot.seq
+                finally:
+                    snapshot.close()
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("SEQ:"):
+                        return int(line[4:])
+                    if line.startswith("STUDENT:"):
+                        break
+            return 0
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _retained_seq(self, seq):
+        """日志需要保留序号大于该值的条目: 当前快照与校验通过的历史版本中最小的序号"""
+        for n in range(1, SNAPSHOT_GENERATIONS + 1):
+            path = self._generation(n)
+            if os.path.exists(path) and self._verify(path) is not False:
+                older = self._snapshot_seq(path)
+                if older is not None:
+                    seq = min(seq, older)
+        return seq
+
+    def _repair_journal(self):
+        """截掉日志最后一行写到一半的残缺条目；中间的损坏行只记录行号，重放时跳过"""
+        self.journal_errors = []
+        if not os.path.exists(self.journal_path):
+            return
+        pos = tail = last = 0
+        bad = []
+        with open(self.journal_path, "rb") as f:
+            for last, line in enumerate(f, 1):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    _parse_journal_line(line)
+                except ValueError:
+                    bad.append(last)
+                tail = pos
+                pos += len(line)
+        if bad and bad[-1] == last:
+            bad.pop()
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(tail)
+                f.flush()
+                os.fsync(f.fileno())
+        self.journal_errors = bad
+
+    def _journal_ops(self):
+        """按顺序读取日志条目，跳过无法解析的损坏行"""
+        if not os.path.exists(self.journal_path):
+            return
+        # 按字节读取，与 _repair_journal 的判断一致: 不是合法 UTF-8 的行同样视为损坏
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    op = _parse_journal_line(line)
+                except ValueError:
+                    continue
+                yield op
+
+    def _read_state(self, upto_seq=None):
+        """读取快照并重放日志，返回 (学生字典, 最后序号, 重放条目数)"""
+        students, seq = {}, 0
+        source = self._snapshot_source()
+        with metrics.timer("load.parse"):
+            if self.binary:
+                students, seq = read_binary_snapshot(source)
+            elif os.path.exists(source):
+                with open(source, "r", encoding="utf-8") as f:
+                    students, seq = parse_snapshot(f)
+
+        with metrics.timer("load.replay"):
+            seq, replayed = self._replay(students, seq, upto_seq)
+        metrics.count("load.replayed_ops", replayed)
+        return students, seq, replayed
+
+    def _replay(self, students, seq, upto_seq):
+        """把快照之后的日志条目应用到 students 上，返回 (最后序号, 重放条目数)"""
+        replayed = 0
+        for op in self._journal_ops():
+            if upto_seq is not None and op["seq"] > upto_seq:
+                break
+            if op["seq"] <= seq:
+                continue
+            apply_op(students, op)
+            seq = op["seq"]
+            replayed += 1
+        return seq, replayed
+
+    def load(self):
+        """加载快照并重放日志，返回学生字典"""
+        self.wait()
+        with self._lock:
+            self._select_snapshot()
+            self._repair_journal()
+        students, seq, replayed = self._read_state()
+        with self._lock:
+            self._seq = seq
+            self._journal_entries = replayed
+        self._maybe_compact()
+        return students
+
+    def snapshot(self):
+        """读取当前完整数据（不改变存储状态），供导出等只读任务使用"""
+        with self._lock:
+            return self._read_state()[0]
+
+    def _scan_offsets(self, path):
+        """只扫描快照中的 STUDENT 行（二进制快照只读取目录），返回 ({姓名: 偏移}, 快照序号)"""
+        offsets, seq = {}, 0
+        if not os.path.exists(path):
+            return offsets, seq
+        if self.binary:
+            snapshot = BinarySnapshot(path)
+            try:
+                return dict(snapshot.directory), snapshot.seq
+            finally:
+                snapshot.close()
+        pos = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if line.startswith(b"STUDENT:"):
+                    name = line[8:].decode("utf-8").strip()
+                    offsets.setdefault(name, pos)
+                elif line.startswith(b"SEQ:"):
+                    try:
+                        seq = int(line[4:])
+                    except ValueError:
+                        pass
+                pos += len(line)
+        return offsets, seq
+
+    def _build_index(self):
+        """扫描快照偏移并按学生分组日志，返回 (偏移, 姓名顺序, 各学生日志, 序号, 条目数)"""
+        offsets, seq = self._scan_offsets(self._snapshot_source())
+        names = StudentOrder(offsets)
+        pending = {}
+        replayed = 0
+        for op in self._journal_ops():
+            if op["seq"] <= seq:
+                continue
+            if op["op"] == "reorder":
+                names.reorder(op["order"])
+            elif op["op"] == "move_student":
+                names.move(op["student"], op.get("before"))
+            else:
+                if op["op"] in ("add_student", "import_entries"):
+                    names.append(op["student"])
+                pending.setdefault(op["student"], []).append(op)
+            seq = op["seq"]
+            replayed += 1
+        return offsets, list(names), pending, seq, replayed
+
+    def _read_student(self, offsets, pending, name):
+        """从快照偏移处读取单个学生并重放其增量日志"""
+        lines = []
+        offset = offsets.get(name)
+        if offset is not None and self.binary:
+            if self._reader is None:
+                self._reader = BinarySnapshot(self._snapshot_source())
+            students = {name: self._reader.load_student(name)}
+            for op in pending.get(name, ()):
+                apply_op(students, op)
+            return students.get(name)
+        if offset is not None:
+            with open(self._snapshot_source(), "rb") as f:
+                f.seek(offset)
+                lines.append(f.readline().decode("utf-8"))
+                for raw in f:
+                    if raw.startswith(b"STUDENT:"):
+                        break
+                    lines.append(raw.decode("utf-8"))
+        students, _ = parse_snapshot(lines)
+        for op in pending.get(name, ()):
+            apply_op(students, op)
+        return students.get(name)
+
+    def student_index(self):
+        """惰性模式: 只读取学生名单和偏移，返回按顺序排列的姓名列表"""
+        self.wait()
+        with self._lock:
+            self._select_snapshot()
+            self._repair_journal()
+            offsets, names, pending, seq, replayed = self._build_index()
+            self._offsets = offsets
+            self._pending = pending
+            self._seq = seq
+            self._journal_entries = replayed
+        self._maybe_compact()
+        return names
+
+    def load_student(self, name):
+        """惰性模式: 从快照偏移处读取单个学生并重放其增量日志"""
+        with self._lock:
+            return self._read_student(self._offsets, self._pending, name)
+
+    def iter_students(self):
+        """按顺序逐个读取学生数据，内存占用只取决于单个学生的记录数"""
+        self.wait()
+        with self._lock:
+            offsets, names, pending, _, _ = self._build_index()
+            # 遍历期间暂停后台压缩，保证快照文件与偏移一致
+            self._readers += 1
+        try:
+            for name in names:
+                data = self._read_student(offsets, pending, name)
+                if data is not None:
+                    yield name, data
+        finally:
+            with self._lock:
+                self._readers -= 1
+
+    def append(self, *ops):
+        """向日志追加一条或多条增量操作"""
+        if not ops:
+            return
+        with self._lock:
+            lines = []
+            for op in ops:
+                self._seq += 1
+                op = dict(op, seq=self._seq)
+                lines.append(json.dumps(op, ensure_ascii=False) + "\n")
+                if self._offsets is not None and "student" in op and op["op"] != "move_student":
+                    self._pending.setdefault(op["student"], []).append(op)
+            data = "".join(lines)
+            with metrics.timer("save.write"):
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._journal_entries += len(ops)
+        if metrics.ENABLED:
+            metrics.count("save.ops", len(ops))
+            metrics.count("save.bytes", len(data.encode("utf-8")))
+        self._maybe_compact()
+
+    def save_snapshot(self, students):
+        """立即把完整数据写成快照并清空日志"""
+        self.wait()
+        with self._lock:
+            self._write_snapshot_file(students, self._seq)
+            self._truncate_journal(self._seq, self._retained_seq(self._seq))
+            if self._offsets is not None:
+                self._offsets, _ = self._scan_offsets(self._snapshot_source())
+                self._pending = {}
+
+    def _write_file(self, path, students, seq):
+        """按快照格式写入文件并落盘"""
+        if self.binary:
+            with open(path, "w+b") as f:
+                write_binary_snapshot(f, students, seq)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                write_snapshot(f, students, seq)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _replace_snapshot(self, tmp_path):
+        """用已落盘的新文件替换快照；原快照依次移为历史版本，损坏的快照改名为 .corrupt"""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if os.path.exists(self.snapshot_path):
+            if self.recovered_from is not None:
+                os.replace(self.snapshot_path, self.snapshot_path + ".corrupt")
+            elif SNAPSHOT_GENERATIONS > 0:
+                for n in range(SNAPSHOT_GENERATIONS - 1, 0, -1):
+                    if os.path.exists(self._generation(n)):
+                        os.replace(self._generation(n), self._generation(n + 1))
+                os.replace(self.snapshot_path, self._generation(1))
+        os.replace(tmp_path, self.snapshot_path)
+        _fsync_directory(self.snapshot_path)
+        self._source = self.snapshot_path
+        self.recovered_from = None
+
+    def _write_snapshot_file(self, students, seq):
+        tmp_path = self.snapshot_path + ".tmp"
+        with metrics.timer("save.snapshot"):
+            self._write_file(tmp_path, students, seq)
+            self._replace_snapshot(tmp_path)
+
+    def _truncate_journal(self, upto_seq, keep_after=None):
+        """删除日志中序号不超过 keep_after（默认 upto_seq）的条目；upto_seq 为已并入当前快照的序号
+
+        保留的条目中只有序号大于 upto_seq 的计入待合并条目数。
+        """
+        if keep_after is None:
+            keep_after = upto_seq
+        if not os.path.exists(self.journal_path):
+            self._journal_entries = 0
+            return
+        kept, corrupt = [], []
+        pending = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    op = _parse_journal_line(line)
+                except ValueError:
+                    corrupt.append(line)
+                    continue
+                if op["seq"] > keep_after:
+                    kept.append(line)
+                    if op["seq"] > upto_seq:
+                        pending += 1
+        if corrupt:
+            # 损坏行不再重放，但保留下来以便人工检查
+            with open(self.journal_path + ".corrupt", "ab") as f:
+                f.write(b"".join(line if line.endswith(b"\n") else line + b"\n" for line in corrupt))
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(kept))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        _fsync_directory(self.journal_path)
+        self._journal_entries = pending
+
+    def _maybe_compact(self):
+        if self._journal_entries < max(self.compact_threshold, self._compact_retry_at) or self._readers:
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_in_background, args=(self._seq,), daemon=True)
+        self._compactor.start()
+
+    def _compact_in_background(self, upto_seq):
+        """后台合并；失败时记录异常，日志再增加一个阈值的条目后才重试（数据仍完整保存在日志中）"""
+        try:
+            self.compact(upto_seq)
+        except Exception as e:
+            with self._lock:
+                self.compact_error = e
+                self._compact_retry_at = self._journal_entries + self.compact_threshold
+            metrics.count("save.compact_errors")
+        else:
+            with self._lock:
+                self.compact_error = None
+                self._compact_retry_at = 0
+
+    def compact(self, upto_seq):
+        """把序号不超过 upto_seq 的日志合并进快照（在后台线程中运行）"""
+        students, seq, _ = self._read_state(upto_seq)
+        tmp_path = self.snapshot_path + ".compact"
+        with metrics.timer("save.compact"):
+            self._write_file(tmp_path, students, seq)
+        offsets = self._scan_offsets(tmp_path)[0] if self._offsets is not None else None
+        with self._lock:
+            # 快照中记录了序号，即使在替换日志前崩溃，重放时也会跳过已合并的条目
+            self._replace_snapshot(tmp_path)
+            self._truncate_journal(seq, self._retained_seq(seq))
+            if offsets is not None:
+                self._offsets = offsets
+                self._pending = {name: [op for op in ops if op["seq"] > seq]
+                                 for name, ops in self._pending.items()}
+
+    def wait(self):
+        """等待后台压缩结束"""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self):
+        self.wait()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+def open_journal_store(snapshot_path=SNAPSHOT_FILE, journal_path=JOURNAL_FILE, text_path=SNAPSHOT_FILE):
+    """打开日志存储；二进制快照不存在而文本快照存在时，先把文本快照转换为二进制格式"""
+    if snapshot_path.endswith(".bin") and not os.path.exists(snapshot_path) and os.path.exists(text_path):
+        convert(text_path, snapshot_path)
+    return JournalStore(snapshot_path, journal_path)
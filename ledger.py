@@ -0,0 +1,371 @@
+"""无界面的账本核心：学生、上课记录、结算记录的校验、修改与统计
+
+与主窗口相同的业务规则：姓名不能为空或重复、结算课时不能超过总上课时长、记录按日期有序。
+每次修改生成一条增量操作，应用到内存中的学生字典后写入存储。本模块不导入 PyQt5，
+openpyxl / pandas 也只在导出、导入时才导入，可供定时任务、测试和命令行直接使用。
+
+命令行用法:
+    python ledger.py balance [--csv]                          各学生的上课、结算、剩余时长
+    python ledger.py check                                    完整性检查，发现问题时退出码为 1
+    python ledger.py import 文件.csv|文件.parquet               批量导入（一次写入）
+    python ledger.py export 文件.xlsx|文件.csv|文件.parquet     导出
+    python ledger.py schedule 姓名,... 起始日期 结束日期 星期 时长或时间段 [--holidays ...]
+                                                              按周期批量添加上课记录
+    python ledger.py sessions 文件.txt                          按“姓名,日期,时长”列表批量添加
+    python ledger.py stats [--by student|month|weekday|subject] [--student 姓名] [--from 日期] [--to 日期] [--csv]
+                                                              上课 / 结算时长统计（analytics.py）
+公共选项 --dir 指定数据目录，--backend / --format 覆盖 TUTORING_BACKEND / TUTORING_SNAPSHOT_FORMAT。
+"""
+import argparse
+import datetime
+import math
+import os
+import sys
+
+from journal_store import apply_op, open_journal_store
+from record_store import student_totals
+
+# 存储后端: "journal"（文本快照 + 增量日志，默认）或 "sqlite"
+STORAGE_BACKEND = os.environ.get("TUTORING_BACKEND", "journal")
+# 快照格式: "text"（tutoring_data.txt，默认）或 "binary"（tutoring_data.bin，首次使用时由文本快照转换）
+SNAPSHOT_FORMAT = os.environ.get("TUTORING_SNAPSHOT_FORMAT", "text")
+
+BALANCE_HEADERS = ["学生姓名", "补习科目", "总上课时长(小时)", "已结算时长(小时)", "剩余时长(小时)"]
+
+
+class LedgerError(ValueError):
+    """违反业务规则的修改，消息可直接显示给用户"""
+
+
+def open_store(backend=None, snapshot_format=None):
+    """按配置打开存储后端（数据文件位于当前目录）"""
+    backend = backend or STORAGE_BACKEND
+    if backend == "sqlite":
+        # 只有使用 SQLite 后端时才导入 sqlite3
+        from sqlite_store import open_sqlite_store
+        return open_sqlite_store("tutoring_data.db")
+    snapshot_format = snapshot_format or SNAPSHOT_FORMAT
+    snapshot = "tutoring_data.bin" if snapshot_format == "binary" else "tutoring_data.txt"
+    return open_journal_store(snapshot, "tutoring_data.journal")
+
+
+def parse_subjects(text):
+    """把逗号分隔的科目文本转换为科目列表，为空时为 ["未设置"]"""
+    subjects = [s.strip() for s in text.split(",") if s.strip()]
+    return subjects or ["未设置"]
+
+
+def normalize_date(date):
+    """把 date / datetime 或 yyyy-MM-dd 文本统一为 yyyy-MM-dd"""
+    if isinstance(date, datetime.date):
+        return date.strftime("%Y-%m-%d")
+    try:
+        return datetime.date.fromisoformat(str(date).strip()).strftime("%Y-%m-%d")
+    except ValueError:
+        raise LedgerError(f"日期格式不正确: {date}（应为 yyyy-MM-dd）") from None
+
+
+def check_hours(hours):
+    """时长必须是正数"""
+    try:
+        hours = float(hours)
+    except (TypeError, ValueError):
+        raise LedgerError(f"时长不是数字: {hours}") from None
+    if not math.isfinite(hours) or hours <= 0:
+        raise LedgerError(f"时长必须大于 0: {hours}")
+    return hours
+
+
+def check_new_student(students, name):
+    """校验新学生姓名，返回去掉首尾空白的姓名"""
+    name = name.strip()
+    if not name:
+        raise LedgerError("请输入学生姓名")
+    if name in students:
+        raise LedgerError("该学生已存在")
+    return name
+
+
+def check_payment(data, hours, taught=0.0):
+    """结算课时不能超过总上课时长；taught 为同一批修改中新增的上课时长"""
+    total_duration, total_paid, _ = student_totals(data)
+    if round(total_paid + hours, 9) > round(total_duration + taught, 9):
+        raise LedgerError("结算课时不能超过总上课时长")
+
+
+def student_problems(name, data):
+    """检查单个学生的数据，返回问题描述列表"""
+    problems = []
+    for kind, entries in (("上课记录", data["records"]), ("结算记录", data["payments"])):
+        previous = ""
+        for i, entry in enumerate(entries):
+            try:
+                date = normalize_date(entry[0])
+                check_hours(entry[1])
+            except LedgerError as e:
+                problems.append(f"{name}: {kind}第 {i + 1} 条 {e}")
+                continue
+            if date < previous:
+                problems.append(f"{name}: {kind}第 {i + 1} 条日期 {date} 早于上一条 {previous}，未按日期排序")
+            previous = date
+        try:
+            entries.verify()
+        except AssertionError as e:
+            problems.append(f"{name}: {kind}{e}")
+    taught, settled, _ = student_totals(data)
+    if settled > taught + 1e-9:
+        problems.append(f"{name}: 已结算 {settled:g} 小时，超过总上课时长 {taught:g} 小时")
+    return problems
+
+
+class Ledger:
+    """不依赖界面的账本：校验修改、应用到学生字典并写入存储"""
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else open_store()
+        self.students = self.store.load()
+        self._analytics = None
+
+    @property
+    def recovered_from(self):
+        """当前快照校验失败时，加载所用的历史版本路径"""
+        return getattr(self.store, "recovered_from", None)
+
+    def close(self):
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _student(self, name):
+        data = self.students.get(name)
+        if data is None:
+            raise LedgerError(f"学生不存在: {name}")
+        return data
+
+    def commit(self, *ops):
+        """应用并写入一批增量操作（一次写入）"""
+        for op in ops:
+            apply_op(self.students, op)
+        self.store.append(*ops)
+        return ops
+
+    def add_student(self, name, subjects=None):
+        name = check_new_student(self.students, name)
+        if isinstance(subjects, str):
+            subjects = parse_subjects(subjects)
+        self.commit({"op": "add_student", "student": name, "subjects": list(subjects or ["未设置"])})
+        return name
+
+    def set_subjects(self, name, subjects):
+        self._student(name)
+        if isinstance(subjects, str):
+            subjects = parse_subjects(subjects)
+        self.commit({"op": "set_subjects", "student": name, "subjects": list(subjects or ["未设置"])})
+
+    def add_record(self, name, date, duration):
+        self._student(name)
+        self.commit({"op": "add_record", "student": name, "date": normalize_date(date),
+                     "duration": check_hours(duration)})
+
+    def modify_record(self, name, index, date, duration):
+        records = self._student(name)["records"]
+        if not 0 <= index < len(records):
+            raise LedgerError(f"{name} 没有第 {index + 1} 条上课记录")
+        old_date, old_duration = records[index][:2]
+        self.commit({"op": "modify_record", "student": name, "index": index,
+                     "old_date": old_date, "old_duration": old_duration,
+                     "date": normalize_date(date), "duration": check_hours(duration)})
+
+    def delete_records(self, name, rows):
+        """删除多条上课记录（按行号），作为一次写入"""
+        records = self._student(name)["records"]
+        ops = []
+        for row in sorted(set(rows), reverse=True):
+            if not 0 <= row < len(records):
+                raise LedgerError(f"{name} 没有第 {row + 1} 条上课记录")
+            date, duration = records[row][:2]
+            ops.append({"op": "delete_record", "student": name, "index": row, "date": date, "duration": duration})
+        self.commit(*ops)
+
+    def add_payment(self, name, date, hours):
+        data = self._student(name)
+        hours = check_hours(hours)
+        check_payment(data, hours)
+        self.commit({"op": "add_payment", "student": name, "date": normalize_date(date), "hours": hours})
+
+    def add_sessions(self, sessions):
+        """批量添加上课记录 (姓名, 日期, 时长)：每个学生一次合并，整批一次写入，返回 (学生数, 课次数)"""
+        from session_entry import session_ops
+
+        sessions = list(sessions)
+        ops = session_ops(self.students, sessions)
+        self.commit(*ops)
+        return len(ops), len(sessions)
+
+    def move_student(self, name, before=None):
+        self._student(name)
+        self.commit({"op": "move_student", "student": name, "before": before})
+
+    def totals(self, name):
+        """(总上课时长, 已结算时长, 剩余时长)"""
+        return student_totals(self._student(name))
+
+    def balances(self):
+        """按学生顺序返回 (姓名, 科目, 总上课时长, 已结算时长, 剩余时长)"""
+        return [(name, data.get("subjects", ["未设置"])) + student_totals(data)
+                for name, data in self.students.items()]
+
+    def stats(self, by="student", student=None, start=None, end=None):
+        """按学生 / 月份 / 星期 / 科目汇总上课和结算时长（pandas DataFrame / Series），可限定学生和日期区间"""
+        from analytics import RecordAnalytics
+
+        queries = {"student": "by_student", "month": "by_month", "weekday": "by_weekday", "subject": "by_subject"}
+        if by not in queries:
+            raise LedgerError(f"不支持的统计方式: {by}")
+        if student is not None:
+            self._student(student)
+            if by == "student":
+                raise LedgerError("按学生统计时不能再指定学生")
+        start = normalize_date(start) if start else None
+        end = normalize_date(end) if end else None
+        if start and end and start > end:
+            raise LedgerError(f"开始日期 {start} 晚于结束日期 {end}")
+        if self._analytics is None:
+            self._analytics = RecordAnalytics()
+        # 只重建修改过的学生
+        self._analytics.refresh(self.students)
+        query = getattr(self._analytics, queries[by])
+        return query(start=start, end=end) if by == "student" else query(student, start, end)
+
+    def check(self):
+        """完整性检查，返回问题描述列表（为空表示通过）"""
+        problems = []
+        if self.recovered_from:
+            problems.append(f"数据文件校验失败，已从历史版本 {self.recovered_from} 恢复")
+        for number in getattr(self.store, "journal_errors", ()):
+            problems.append(f"增量日志第 {number} 行已损坏，加载时已跳过")
+        for name, data in self.students.items():
+            problems += student_problems(name, data)
+        return problems
+
+    def import_file(self, filename):
+        """从长表格式的 CSV / Parquet 文件批量导入，返回 (学生数, 导入行数, 跳过的已存在行数)"""
+        from bulk_io import import_ops, imported_rows, read_long
+
+        frame = read_long(filename)
+        ops = import_ops(frame, self.students)
+        self.commit(*ops)
+        rows = imported_rows(ops)
+        return len(ops), rows, len(frame) - rows
+
+    def export(self, filename, progress=None):
+        """按扩展名导出为 Excel（.xlsx）或长表格式（.csv / .parquet），数据从存储中流式读取"""
+        if filename.lower().endswith(".xlsx"):
+            from excel_export import export_students
+            export_students(self.store.iter_students(), filename, progress)
+        else:
+            from bulk_io import export_long
+            export_long(self.store.iter_students(), filename)
+        return filename
+
+
+def _print_balances(ledger, as_csv):
+    rows = ledger.balances()
+    if as_csv:
+        import csv
+        writer = csv.writer(sys.stdout)
+        writer.writerow(BALANCE_HEADERS)
+        for name, subjects, taught, settled, remaining in rows:
+            writer.writerow([name, ",".join(subjects), taught, settled, remaining])
+        return
+    for name, subjects, taught, settled, remaining in rows:
+        print(f"{name}\t{','.join(subjects)}\t上课 {taught:g}\t结算 {settled:g}\t剩余 {remaining:g}")
+    print(f"共 {len(rows)} 名学生，剩余未结算 {sum(row[4] for row in rows):g} 小时")
+
+
+def _print_stats(table, as_csv):
+    if as_csv:
+        table.to_csv(sys.stdout)
+    elif table.empty:
+        print("没有符合条件的记录")
+    else:
+        print(table.to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ledger.py", description="补课时间账本命令行工具")
+    parser.add_argument("--dir", help="数据目录（默认当前目录）")
+    parser.add_argument("--backend", choices=("journal", "sqlite"), help="存储后端")
+    parser.add_argument("--format", choices=("text", "binary"), dest="snapshot_format", help="快照格式")
+    commands = parser.add_subparsers(dest="command", required=True)
+    balance = commands.add_parser("balance", help="各学生的上课、结算、剩余时长")
+    balance.add_argument("--csv", action="store_true", help="以 CSV 格式输出")
+    commands.add_parser("check", help="完整性检查")
+    commands.add_parser("import", help="从 CSV / Parquet 批量导入").add_argument("file")
+    commands.add_parser("export", help="导出 Excel / CSV / Parquet").add_argument("file")
+    schedule = commands.add_parser("schedule", help="按周期批量添加上课记录")
+    schedule.add_argument("students", help="逗号分隔的学生姓名")
+    schedule.add_argument("start", help="开始日期 yyyy-MM-dd")
+    schedule.add_argument("end", help="结束日期 yyyy-MM-dd（包含）")
+    schedule.add_argument("weekdays", help="星期，如 1,3 或 周一,周三")
+    schedule.add_argument("duration", help="时长（小时）或时间段，如 18:00-20:00")
+    schedule.add_argument("--holidays", default="", help="跳过的日期，逗号分隔，起~止 表示区间")
+    commands.add_parser("sessions", help="按“姓名,日期,时长”列表批量添加上课记录").add_argument("file")
+    stats = commands.add_parser("stats", help="上课 / 结算时长统计")
+    stats.add_argument("--by", choices=("student", "month", "weekday", "subject"), default="student",
+                       help="统计方式（默认按学生）")
+    stats.add_argument("--student", help="只统计该学生")
+    stats.add_argument("--from", dest="start", help="开始日期 yyyy-MM-dd")
+    stats.add_argument("--to", dest="end", help="结束日期 yyyy-MM-dd（包含）")
+    stats.add_argument("--csv", action="store_true", help="以 CSV 格式输出")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        os.chdir(args.dir)
+    try:
+        ledger = Ledger(open_store(args.backend, args.snapshot_format))
+    except Exception as e:
+        print(f"加载数据失败: {e}", file=sys.stderr)
+        return 1
+    with ledger:
+        try:
+            if args.command == "balance":
+                _print_balances(ledger, args.csv)
+            elif args.command == "check":
+                problems = ledger.check()
+                for problem in problems:
+                    print(problem)
+                print(f"检查了 {len(ledger.students)} 名学生，发现 {len(problems)} 个问题")
+                return 1 if problems else 0
+            elif args.command == "import":
+                count, rows, skipped = ledger.import_file(args.file)
+                print(f"已从 {args.file} 导入 {count} 名学生的 {rows} 行记录"
+                      + (f"，跳过 {skipped} 行已存在的记录" if skipped else ""))
+            elif args.command == "export":
+                print(f"已导出到 {ledger.export(args.file)}")
+            elif args.command == "stats":
+                _print_stats(ledger.stats(args.by, args.student, args.start, args.end), args.csv)
+            else:
+                import session_entry
+                if args.command == "schedule":
+                    sessions = session_entry.recurring_sessions(
+                        parse_subjects(args.students), args.start, args.end,
+                        session_entry.parse_weekdays(args.weekdays), args.duration,
+                        session_entry.parse_holidays(args.holidays))
+                else:
+                    with open(args.file, "r", encoding="utf-8-sig") as f:
+                        sessions = session_entry.parse_session_lines(f.read())
+                count, added = ledger.add_sessions(sessions)
+                print(f"已为 {count} 名学生添加 {added} 条上课记录")
+        except (LedgerError, OSError, ValueError) as e:
+            print(f"失败: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""热点操作的计时与计数
+
+通过 TUTORING_METRICS=1 开启（诊断面板中也可以临时开启）。关闭时 timer() 返回共享的空上下文，
+count() / observe() 只检查一次开关，调用处用 metrics.ENABLED 判断后才去计算字节数等额外信息，
+开销可以忽略。计时器保存次数、合计、最大值和最近若干次样本（用于求 p50 / p95）。
+snapshot() 返回当前统计的字典；设置 TUTORING_METRICS_FILE 时（同时开启统计）后台线程每隔
+TUTORING_METRICS_INTERVAL 秒（默认 60）向该文件追加一行 JSON，程序退出时再写一次。
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+DUMP_FILE = os.environ.get("TUTORING_METRICS_FILE", "")
+DUMP_INTERVAL = float(os.environ.get("TUTORING_METRICS_INTERVAL", "60"))
+ENABLED = os.environ.get("TUTORING_METRICS") == "1" or bool(DUMP_FILE)
+SAMPLES = 256  # 每个计时器保留的最近样本数
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}
+_started = time.time()
+_NULL = contextlib.nullcontext()
+
+
+class _TimerStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def summary(self):
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000 if samples else 0.0
+
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(percentile(50), 3),
+            "p95_ms": round(percentile(95), 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+def enable(flag=True):
+    """运行时开启或关闭统计（已插入的计时点立即生效）"""
+    global ENABLED
+    ENABLED = flag
+
+
+def count(name, value=1):
+    """计数器加 value"""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, seconds):
+    """记录一次耗时（秒）"""
+    if not ENABLED:
+        return
+    with _lock:
+        stats = _timers.get(name)
+        if stats is None:
+            stats = _timers[name] = _TimerStats()
+        stats.add(seconds)
+
+
+class _Timing:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+def timer(name):
+    """计时上下文: with metrics.timer("save.write"): ...；关闭时为空操作"""
+    return _Timing(name) if ENABLED else _NULL
+
+
+def snapshot():
+    """当前统计: {"enabled", "time", "uptime_s", "counters", "timers": {名称: 摘要}}"""
+    with _lock:
+        counters = dict(_counters)
+        timers = {name: stats.summary() for name, stats in _timers.items()}
+    return {
+        "enabled": ENABLED,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "uptime_s": round(time.time() - _started, 1),
+        "counters": dict(sorted(counters.items())),
+        "timers": dict(sorted(timers.items())),
+    }
+
+
+def reset():
+    """清空所有统计"""
+    global _started
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+        _started = time.time()
+
+
+class MetricsDumper:
+    """定期把统计快照追加到 JSON Lines 文件的后台线程"""
+
+    def __init__(self, path, interval=DUMP_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="MetricsDumper", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def dump(self):
+        line = json.dumps(snapshot(), ensure_ascii=False) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        """停止线程并写入最后一次快照"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.dump()
+
+
+def start_dump(path=None, interval=None):
+    """开始定期写出统计；没有指定文件时返回 None"""
+    path = path or DUMP_FILE
+    if not path:
+        return None
+    return MetricsDumper(path, interval or DUMP_INTERVAL)
+
+
+def format_report(snap=None):
+    """把统计快照整理成便于阅读的文本"""
+    snap = snap or snapshot()
+    lines = [f"统计{'已开启' if snap['enabled'] else '未开启（设置 TUTORING_METRICS=1 或在此处开启）'}，"
+             f"时间 {snap['time']}，已运行 {snap['uptime_s']} 秒", ""]
+    if snap["timers"]:
+        lines.append(f"{'计时':<20}{'次数':>8}{'合计(ms)':>12}{'平均':>10}{'p50':>10}{'p95':>10}{'最大':>10}")
+        for name, t in snap["timers"].items():
+            lines.append(f"{name:<20}{t['count']:>8}{t['total_ms']:>12.1f}{t['mean_ms']:>10.3f}"
+                         f"{t['p50_ms']:>10.3f}{t['p95_ms']:>10.3f}{t['max_ms']:>10.3f}")
+        lines.append("")
+    if snap["counters"]:
+        lines.append(f"{'计数':<20}{'数值':>12}")
+        for name, value in snap["counters"].items():
+            lines.append(f"{name:<20}{value:>12}")
+    return "\n".join(lines)
@@ -0,0 +1,516 @@
+"""学生上课记录 / 结算记录的容器
+
+EntryList 始终按日期有序：新增条目用二分查找插入到位，修改日期时移动到新位置，
+不再需要每次追加后对整个列表重新排序。同时增量维护条目时长（第二个字段）的合计
+和逐行累计时长（前缀和），余额检查、“累计时长”列和日期区间统计都无需再遍历整个历史。
+每次修改都会递增 version，统计引擎据此判断某个学生的列式数据是否需要重建。
+设置环境变量 TUTORING_CHECK_TOTALS=1 时，每次读取合计都会与完整重算结果比对。
+
+CompactEntryList 是接口相同的紧凑实现：日期存为 int32 序数日、时长存为以 0.01 小时为单位的
+定点整数、科目存为驻留表中的小整数编号，每条记录约 10 字节，读取时再组装成元组。
+出现不是 0.01 小时整数倍的时长（如 20 分钟）时，该列表的时长列改为 float64，不做舍入。
+设置 TUTORING_COMPACT_RECORDS=1 时新建的学生数据使用紧凑实现。
+"""
+import bisect
+import datetime
+import math
+import os
+from array import array
+from collections.abc import MutableSequence
+
+CHECK_TOTALS = os.environ.get("TUTORING_CHECK_TOTALS") == "1"
+COMPACT_RECORDS = os.environ.get("TUTORING_COMPACT_RECORDS") == "1"
+
+
+class EntryList(list):
+    """按日期有序并增量维护时长合计的记录列表，条目格式为 (date, hours, ...)"""
+
+    __slots__ = ("_total", "_prefix", "_valid", "_version")
+
+    def __init__(self, entries=()):
+        super().__init__(entries)
+        self._total = math.fsum(e[1] for e in self)
+        self._prefix = []  # _prefix[i] 为第 0..i 行的累计时长
+        self._valid = 0    # _prefix 中前 _valid 项有效
+        self._version = 0  # 每次修改递增
+
+    @property
+    def version(self):
+        """修改计数，内容变化时必定不同"""
+        return self._version
+
+    @property
+    def total(self):
+        """条目时长合计，O(1)"""
+        if CHECK_TOTALS:
+            self.verify()
+        # 消除反复加减带来的浮点误差
+        return round(self._total, 9)
+
+    def verify(self):
+        """与完整重算的合计比对，不一致时抛出 AssertionError"""
+        expected = math.fsum(e[1] for e in self)
+        if abs(expected - self._total) > 1e-6:
+            raise AssertionError(f"合计不一致: 缓存 {self._total}，重算 {expected}")
+        if self._valid:
+            cumulative = 0.0
+            for i in range(self._valid):
+                cumulative += self[i][1]
+                if abs(cumulative - self._prefix[i]) > 1e-6:
+                    raise AssertionError(f"第 {i} 行累计时长不一致: 缓存 {self._prefix[i]}，重算 {cumulative}")
+
+    def cumulative(self, row):
+        """截至第 row 行（含）的累计时长；前缀和失效部分在首次读取时补算"""
+        if row < 0:
+            row += len(self)
+        if row >= self._valid:
+            prefix = self._prefix
+            del prefix[self._valid:]
+            acc = prefix[-1] if prefix else 0.0
+            for i in range(self._valid, len(self)):
+                acc += self[i][1]
+                prefix.append(acc)
+            self._valid = len(self)
+        return self._prefix[row]
+
+    def hours_between(self, start_date, end_date):
+        """日期在 [start_date, end_date] 之间的条目时长合计，O(log n)"""
+        lo = self._bisect(start_date, right=False)
+        hi = self._bisect(end_date)
+        if hi <= lo:
+            return 0.0
+        before = self.cumulative(lo - 1) if lo else 0.0
+        return round(self.cumulative(hi - 1) - before, 9)
+
+    def __reduce__(self):
+        # 默认的序列化会在恢复槽位之前逐条追加条目，这里改为按完整列表重建
+        return (EntryList, (list(self),))
+
+    def _invalidate(self, index):
+        """第 index 行及之后的前缀和需要重算"""
+        self._version += 1
+        if index < self._valid:
+            self._valid = max(index, 0)
+
+    def _bisect(self, date, right=True):
+        """二分查找日期位置；right 为真时返回日期相同的条目之后的位置"""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if date < self[mid][0] or (not right and date == self[mid][0]):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def position_for(self, date):
+        """该日期的新条目应插入的行号：插在日期相同的条目之后，与追加后稳定排序的结果一致"""
+        return self._bisect(date)
+
+    def add(self, entry):
+        """按日期插入条目，返回其所在行号，O(log n) 查找"""
+        index = self.position_for(entry[0])
+        self.insert(index, entry)
+        return index
+
+    def merge(self, entries):
+        """批量并入条目后整体按日期稳定排序；日期相同时原有条目在前，与逐条 add 的结果一致"""
+        self.extend(entries)
+        self.sort(key=lambda e: e[0])
+
+    def replace(self, index, entry):
+        """修改指定行的条目，日期变化时移动到新位置，返回新的行号"""
+        if entry[0] == self[index][0]:
+            self[index] = entry
+            return index
+        self.pop(index)
+        return self.add(entry)
+
+    def _recompute(self):
+        self._total = math.fsum(e[1] for e in self)
+        self._valid = 0
+        self._version += 1
+
+    def append(self, entry):
+        super().append(entry)
+        self._total += entry[1]
+        self._version += 1
+
+    def extend(self, entries):
+        entries = list(entries)
+        super().extend(entries)
+        self._total += math.fsum(e[1] for e in entries)
+        self._version += 1
+
+    def __iadd__(self, entries):
+        self.extend(entries)
+        return self
+
+    def insert(self, index, entry):
+        if index < 0:
+            index = max(index + len(self), 0)
+        self._invalidate(index)
+        super().insert(index, entry)
+        self._total += entry[1]
+
+    def pop(self, index=-1):
+        entry = super().pop(index)
+        self._invalidate(index if index >= 0 else index + len(self) + 1)
+        self._total -= entry[1]
+        return entry
+
+    def remove(self, entry):
+        self.pop(self.index(entry))
+
+    def clear(self):
+        super().clear()
+        self._recompute()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate(0)
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate(0)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, value)
+            self._recompute()
+        else:
+            old = self[index]
+            super().__setitem__(index, value)
+            self._invalidate(index if index >= 0 else index + len(self))
+            self._total += value[1] - old[1]
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self._recompute()
+        else:
+            self.pop(index)
+
+
+# 驻留表：相同的日期字符串和科目在所有学生之间只保存一份
+_DATE_ORDINALS = {}
+_ORDINAL_DATES = {}
+_SUBJECT_IDS = {}
+_SUBJECTS = []
+
+NO_SUBJECT = -1   # 没有科目字段的条目（二元组）
+HOURS_SCALE = 100  # 时长定点数的单位: 0.01 小时
+
+
+def _date_ordinal(date):
+    """'yyyy-MM-dd' -> 序数日；日期不合法时抛出 ValueError"""
+    ordinal = _DATE_ORDINALS.get(date)
+    if ordinal is None:
+        ordinal = datetime.date.fromisoformat(date).toordinal()
+        _DATE_ORDINALS[date] = ordinal
+        _ORDINAL_DATES.setdefault(ordinal, date)
+    return ordinal
+
+
+def _ordinal_date(ordinal):
+    date = _ORDINAL_DATES.get(ordinal)
+    if date is None:
+        date = _ORDINAL_DATES[ordinal] = datetime.date.fromordinal(ordinal).isoformat()
+    return date
+
+
+def _exact(hours, fixed):
+    """fixed 是否就是 hours 的 0.01 小时定点值（没有舍入）"""
+    return abs(fixed - hours * HOURS_SCALE) < 1e-6
+
+
+def _subject_id(subject):
+    sid = _SUBJECT_IDS.get(subject)
+    if sid is None:
+        sid = _SUBJECT_IDS[subject] = len(_SUBJECTS)
+        _SUBJECTS.append(subject)
+    return sid
+
+
+class CompactEntryList(MutableSequence):
+    """列式存储的 EntryList：日期序数、定点时长、科目编号三个数组，接口与 EntryList 相同
+
+    时长都是 0.01 小时的整数倍时保存为定点整数，合计与累计时长都是整数运算，没有浮点误差累积；
+    否则整列改为 array('d') 保存原始小时数（合计与 EntryList 一样保留 9 位小数）。
+    """
+
+    __slots__ = ("_dates", "_hours", "_subjects", "_total", "_prefix", "_valid", "_version")
+
+    def __init__(self, entries=()):
+        self._dates = array("i")
+        self._hours = array("i")
+        self._subjects = array("h")
+        self._total = 0
+        self._prefix = array("q")  # _prefix[i] 为第 0..i 行的累计时长（定点）
+        self._valid = 0
+        self._version = 0
+        for entry in entries:
+            self._put(len(self._dates), entry)
+
+    @classmethod
+    def from_columns(cls, dates, hours, subjects=None, subject_table=()):
+        """直接由列数组构建（不逐条组装元组）
+
+        dates 为序数日 array('i')，hours 为定点时长 array('i') 或小时数 array('d')，subjects 为
+        subject_table 中的编号 array('h')，为 None 时所有条目都没有科目字段。
+        """
+        entries = cls()
+        entries._dates = dates
+        if hours.typecode == "d":
+            fixed = array("i", (round(h * HOURS_SCALE) for h in hours))
+            if all(_exact(h, f) for h, f in zip(hours, fixed)):
+                hours = fixed
+            else:
+                entries._prefix = array("d")
+        entries._hours = hours
+        if subjects is None:
+            entries._subjects = array("h", [NO_SUBJECT]) * len(dates)
+        else:
+            remap = [_subject_id(subject) for subject in subject_table]
+            if remap != list(range(len(remap))):
+                subjects = array("h", (sid if sid == NO_SUBJECT else remap[sid] for sid in subjects))
+            entries._subjects = subjects
+        entries._total = math.fsum(hours) if hours.typecode == "d" else sum(hours)
+        return entries
+
+    @property
+    def exact(self):
+        """时长是否都以 0.01 小时的定点整数保存"""
+        return self._hours.typecode == "i"
+
+    def _scale(self):
+        return HOURS_SCALE if self._hours.typecode == "i" else 1
+
+    def _to_float(self):
+        """改为 float64 时长列（遇到不是 0.01 小时整数倍的时长时）"""
+        self._hours = array("d", (h / HOURS_SCALE for h in self._hours))
+        self._total = math.fsum(self._hours)
+        self._prefix = array("d")
+        self._valid = 0
+
+    def _encode(self, entry):
+        subject = _subject_id(entry[2]) if len(entry) > 2 else NO_SUBJECT
+        hours = entry[1]
+        if self._hours.typecode == "i":
+            fixed = round(hours * HOURS_SCALE)
+            if _exact(hours, fixed):
+                return _date_ordinal(entry[0]), fixed, subject
+            self._to_float()
+        return _date_ordinal(entry[0]), float(hours), subject
+
+    def _entry(self, i):
+        date = _ordinal_date(self._dates[i])
+        hours = self._hours[i] / HOURS_SCALE if self._hours.typecode == "i" else self._hours[i]
+        sid = self._subjects[i]
+        return (date, hours) if sid == NO_SUBJECT else (date, hours, _SUBJECTS[sid])
+
+    def _put(self, index, entry):
+        ordinal, hours, subject = self._encode(entry)
+        self._dates.insert(index, ordinal)
+        self._hours.insert(index, hours)
+        self._subjects.insert(index, subject)
+        self._total += hours
+
+    def _invalidate(self, index):
+        self._version += 1
+        if index < self._valid:
+            self._valid = max(index, 0)
+
+    @property
+    def version(self):
+        """修改计数，内容变化时必定不同"""
+        return self._version
+
+    @property
+    def total(self):
+        """条目时长合计，O(1)"""
+        if CHECK_TOTALS:
+            self.verify()
+        if self._hours.typecode == "i":
+            return self._total / HOURS_SCALE
+        return round(self._total, 9)
+
+    def verify(self):
+        """与完整重算的合计比对，不一致时抛出 AssertionError"""
+        if self._hours.typecode == "d":
+            expected = math.fsum(self._hours)
+            if abs(expected - self._total) > 1e-6:
+                raise AssertionError(f"合计不一致: 缓存 {self._total}，重算 {expected}")
+            return
+        expected = sum(self._hours)
+        if expected != self._total:
+            raise AssertionError(f"合计不一致: 缓存 {self._total}，重算 {expected}")
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self._entry(index)
+
+    def __iter__(self):
+        for i in range(len(self._dates)):
+            yield self._entry(i)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            entries = list(self)
+            entries[index] = value
+            self._reset(entries)
+            return
+        if index < 0:
+            index += len(self)
+        ordinal, hours, subject = self._encode(value)
+        self._total += hours - self._hours[index]
+        self._dates[index] = ordinal
+        self._hours[index] = hours
+        self._subjects[index] = subject
+        self._invalidate(index)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            entries = list(self)
+            del entries[index]
+            self._reset(entries)
+        else:
+            self.pop(index)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, CompactEntryList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompactEntryList({list(self)!r})"
+
+    def __reduce__(self):
+        return (CompactEntryList, (list(self),))
+
+    def _reset(self, entries):
+        self._dates = array("i")
+        self._hours = array("i")
+        self._subjects = array("h")
+        self._total = 0
+        self._prefix = array("q")
+        for entry in entries:
+            self._put(len(self._dates), entry)
+        self._invalidate(0)
+
+    def insert(self, index, entry):
+        if index < 0:
+            index = max(index + len(self), 0)
+        index = min(index, len(self))
+        self._put(index, entry)
+        self._invalidate(index)
+
+    def append(self, entry):
+        self._put(len(self._dates), entry)
+        self._version += 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self._put(len(self._dates), entry)
+        self._version += 1
+
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        entry = self[index]
+        self._total -= self._hours.pop(index)
+        self._dates.pop(index)
+        self._subjects.pop(index)
+        self._invalidate(index)
+        return entry
+
+    def clear(self):
+        self._reset(())
+
+    def sort(self, key=None, reverse=False):
+        self._reset(sorted(self, key=key, reverse=reverse))
+
+    def reverse(self):
+        self._dates.reverse()
+        self._hours.reverse()
+        self._subjects.reverse()
+        self._invalidate(0)
+
+    def cumulative(self, row):
+        """截至第 row 行（含）的累计时长；前缀和失效部分在首次读取时补算"""
+        if row < 0:
+            row += len(self)
+        if row >= self._valid:
+            prefix = self._prefix
+            del prefix[self._valid:]
+            acc = prefix[-1] if prefix else 0
+            for i in range(self._valid, len(self)):
+                acc += self._hours[i]
+                prefix.append(acc)
+            self._valid = len(self)
+        return self._prefix[row] / self._scale()
+
+    def hours_between(self, start_date, end_date):
+        """日期在 [start_date, end_date] 之间的条目时长合计，O(log n)"""
+        lo = bisect.bisect_left(self._dates, _date_ordinal(start_date))
+        hi = bisect.bisect_right(self._dates, _date_ordinal(end_date))
+        if hi <= lo:
+            return 0.0
+        before = self.cumulative(lo - 1) if lo else 0.0
+        return round(self.cumulative(hi - 1) - before, 9)
+
+    def position_for(self, date):
+        """该日期的新条目应插入的行号：插在日期相同的条目之后"""
+        return bisect.bisect_right(self._dates, _date_ordinal(date))
+
+    def add(self, entry):
+        """按日期插入条目，返回其所在行号，O(log n) 查找"""
+        index = self.position_for(entry[0])
+        self.insert(index, entry)
+        return index
+
+    def replace(self, index, entry):
+        """修改指定行的条目，日期变化时移动到新位置，返回新的行号"""
+        if entry[0] == self[index][0]:
+            self[index] = entry
+            return index
+        self.pop(index)
+        return self.add(entry)
+
+    def merge(self, entries):
+        """批量并入条目后整体按日期稳定排序；日期相同时原有条目在前"""
+        self.extend(entries)
+        order = sorted(range(len(self)), key=self._dates.__getitem__)
+        self._dates = array("i", (self._dates[i] for i in order))
+        self._hours = array(self._hours.typecode, (self._hours[i] for i in order))
+        self._subjects = array("h", (self._subjects[i] for i in order))
+        self._invalidate(0)
+
+
+def make_entries(entries=()):
+    """按配置创建条目列表：EntryList，或 TUTORING_COMPACT_RECORDS=1 时的 CompactEntryList"""
+    return CompactEntryList(entries) if COMPACT_RECORDS else EntryList(entries)
+
+
+def new_student(subjects=None, records=(), payments=()):
+    """创建一个学生的数据字典"""
+    return {
+        "records": make_entries(records),    # 格式: [(date, duration, subject), ...]
+        "payments": make_entries(payments),  # 格式: [(date, hours), ...]
+        "subjects": subjects if subjects is not None else ["未设置"],
+    }
+
+
+def student_totals(data):
+    """返回 (总上课时长, 已结算时长, 剩余时长)，均为 O(1)"""
+    taught = data["records"].total
+    settled = data["payments"].total
+    return taught, settled, round(taught - settled, 9)
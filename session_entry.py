@@ -0,0 +1,129 @@
+"""批量录入上课记录：按周期排课，或粘贴 / 读取多名学生的记录列表
+
+按周期排课: 在日期区间内按选定的星期生成日期，跳过节假日，时长由上课时间段（如 18:00-20:00）
+计算。粘贴列表: 每行一条“姓名,日期,时长”，分隔符可以是逗号、制表符或空格，时长也可以写成时间段。
+生成的课次按学生分组，每个学生一条 import_entries 操作：记录先排好序，再一次合并进该学生的
+有序记录列表，整批作为一次写入保存。
+"""
+import datetime
+import re
+
+from ledger import LedgerError, check_hours, normalize_date
+
+WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+_WEEKDAY_CHARS = {"一": 0, "二": 1, "三": 2, "四": 3, "五": 4, "六": 5, "日": 6, "天": 6}
+_SPAN = re.compile(r"^(\d{1,2}):(\d{2})\s*[-~]\s*(\d{1,2}):(\d{2})$")
+
+
+def span_hours(text):
+    """把 "18:00-20:00" 形式的时间段换算为小时数"""
+    match = _SPAN.match(text.strip())
+    if not match:
+        raise LedgerError(f"时间段格式不正确: {text}（应为 HH:MM-HH:MM）")
+    h1, m1, h2, m2 = (int(g) for g in match.groups())
+    if h1 > 23 or m1 > 59 or m2 > 59 or h2 * 60 + m2 > 24 * 60:
+        raise LedgerError(f"时间段格式不正确: {text}（应为 HH:MM-HH:MM）")
+    minutes = (h2 * 60 + m2) - (h1 * 60 + m1)
+    if minutes <= 0:
+        raise LedgerError(f"时间段的结束时间应晚于开始时间: {text}")
+    return round(minutes / 60, 9)
+
+
+def parse_duration(text):
+    """时长可以是小时数，也可以是时间段"""
+    text = str(text).strip()
+    return span_hours(text) if ":" in text else check_hours(text)
+
+
+def parse_weekdays(text):
+    """解析星期: "1,3,5"（1 为周一）、"周一,周三" 或 "一三五"，返回 0（周一）~ 6 的有序列表"""
+    weekdays = set()
+    for part in re.split(r"[,，、\s]+", text.strip()):
+        if not part:
+            continue
+        if part.isdigit():
+            if not 1 <= int(part) <= 7:
+                raise LedgerError(f"星期应为 1~7: {part}")
+            weekdays.add(int(part) - 1)
+            continue
+        chars = part.replace("星期", "").replace("周", "")
+        if not chars or any(c not in _WEEKDAY_CHARS for c in chars):
+            raise LedgerError(f"无法识别的星期: {part}")
+        weekdays.update(_WEEKDAY_CHARS[c] for c in chars)
+    if not weekdays:
+        raise LedgerError("请至少选择一个星期")
+    return sorted(weekdays)
+
+
+def parse_holidays(text):
+    """解析节假日: 逗号或换行分隔的日期，"起~止" 表示包含两端的日期区间，返回日期集合"""
+    holidays = set()
+    for part in re.split(r"[,，\s]+", text.strip()):
+        if not part:
+            continue
+        if "~" in part:
+            first, last = (datetime.date.fromisoformat(normalize_date(d)) for d in part.split("~", 1))
+            if last < first:
+                raise LedgerError(f"节假日区间的结束日期早于开始日期: {part}")
+            while first <= last:
+                holidays.add(first.isoformat())
+                first += datetime.timedelta(days=1)
+        else:
+            holidays.add(normalize_date(part))
+    return holidays
+
+
+def recurring_dates(start, end, weekdays, holidays=()):
+    """日期区间 [start, end] 内落在指定星期且不是节假日的日期（yyyy-MM-dd）"""
+    first = datetime.date.fromisoformat(normalize_date(start))
+    last = datetime.date.fromisoformat(normalize_date(end))
+    if last < first:
+        raise LedgerError("结束日期不能早于开始日期")
+    weekdays = set(weekdays)
+    dates = []
+    day = first
+    while day <= last:
+        if day.weekday() in weekdays:
+            date = day.isoformat()
+            if date not in holidays:
+                dates.append(date)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def recurring_sessions(students, start, end, weekdays, duration, holidays=()):
+    """按周期为每名学生生成课次 (姓名, 日期, 时长)"""
+    duration = parse_duration(duration)
+    dates = recurring_dates(start, end, weekdays, holidays)
+    return [(student, date, duration) for student in students for date in dates]
+
+
+def parse_session_lines(text):
+    """解析粘贴的列表，每行“姓名,日期,时长”；空行和 # 开头的行忽略，返回课次列表"""
+    sessions = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [f.strip() for f in re.split(r"[,，\t]|\s+", line) if f.strip()]
+        if len(fields) != 3:
+            raise LedgerError(f"第 {number} 行应为“姓名,日期,时长”: {line}")
+        try:
+            sessions.append((fields[0], normalize_date(fields[1]), parse_duration(fields[2])))
+        except LedgerError as e:
+            raise LedgerError(f"第 {number} 行: {e}") from None
+    return sessions
+
+
+def session_ops(students, sessions):
+    """校验课次并按学生分组，返回每个学生一条 import_entries 操作（按学生首次出现的顺序）"""
+    grouped = {}
+    for student, date, duration in sessions:
+        if student not in students:
+            raise LedgerError(f"学生不存在: {student}")
+        grouped.setdefault(student, []).append([normalize_date(date), check_hours(duration)])
+    ops = []
+    for student, records in grouped.items():
+        records.sort(key=lambda record: record[0])
+        ops.append({"op": "import_entries", "student": student, "records": records, "payments": []})
+    return ops
@@ -0,0 +1,294 @@
+"""SQLite 存储后端：学生、上课记录、结算记录分表保存，按 (学生, 日期) 建索引
+
+与 JournalStore 提供相同的 load / append / close 接口，可直接替换。
+命令行用法（一次性迁移）: python sqlite_store.py [tutoring_data.txt] [tutoring_data.db]
+"""
+import functools
+import os
+import sqlite3
+import sys
+import threading
+
+import metrics
+from journal_store import JournalStore
+from record_store import new_student
+
+DB_FILE = "tutoring_data.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    subjects TEXT NOT NULL DEFAULT '未设置'
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    date TEXT NOT NULL,
+    duration REAL NOT NULL,
+    subject TEXT
+);
+CREATE TABLE IF NOT EXISTS payments (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    date TEXT NOT NULL,
+    hours REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_student_date ON records(student_id, date);
+CREATE INDEX IF NOT EXISTS idx_payments_student_date ON payments(student_id, date);
+CREATE INDEX IF NOT EXISTS idx_students_position ON students(position);
+"""
+MIN_POSITION_GAP = 1e-9  # 相邻学生的位置间隔小于该值时重新编号
+
+
+def _subjects_text(subjects):
+    return ",".join(subjects)
+
+
+def _subjects_list(text):
+    return [s.strip() for s in text.split(",") if s.strip()] or ["未设置"]
+
+
+def _locked(method):
+    """串行化对数据库连接的访问：GUI 线程读取与后台线程写入可能同时发生"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SQLiteStore:
+    """基于 SQLite 的存储后端"""
+
+    def __init__(self, db_path=DB_FILE):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _student_id(self, name):
+        row = self.conn.execute("SELECT id FROM students WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    @_locked
+    def student_names(self):
+        """按显示顺序返回 [(姓名, 科目列表), ...]，不读取任何记录"""
+        rows = self.conn.execute("SELECT name, subjects FROM students ORDER BY position, id")
+        return [(name, _subjects_list(subjects)) for name, subjects in rows]
+
+    @_locked
+    def student_index(self):
+        """按显示顺序返回学生姓名列表（供惰性加载使用）"""
+        return [name for (name,) in self.conn.execute("SELECT name FROM students ORDER BY position, id")]
+
+    @_locked
+    def fetch_records(self, name, start_date=None, end_date=None):
+        """按索引查询某个学生在日期区间内的上课记录"""
+        sql = "SELECT r.date, r.duration, r.subject FROM records r JOIN students s ON s.id = r.student_id WHERE s.name = ?"
+        params = [name]
+        if start_date is not None:
+            sql += " AND r.date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            sql += " AND r.date <= ?"
+            params.append(end_date)
+        sql += " ORDER BY r.date, r.id"
+        return [(date, duration) if subject is None else (date, duration, subject)
+                for date, duration, subject in self.conn.execute(sql, params)]
+
+    @_locked
+    def fetch_payments(self, name, start_date=None, end_date=None):
+        """按索引查询某个学生在日期区间内的结算记录"""
+        sql = "SELECT p.date, p.hours FROM payments p JOIN students s ON s.id = p.student_id WHERE s.name = ?"
+        params = [name]
+        if start_date is not None:
+            sql += " AND p.date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            sql += " AND p.date <= ?"
+            params.append(end_date)
+        sql += " ORDER BY p.date, p.id"
+        return [tuple(row) for row in self.conn.execute(sql, params)]
+
+    @_locked
+    def load_student(self, name):
+        """读取单个学生的完整数据"""
+        row = self.conn.execute("SELECT subjects FROM students WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return new_student(_subjects_list(row[0]), self.fetch_records(name), self.fetch_payments(name))
+
+    @_locked
+    def load(self):
+        """读取全部学生数据，返回与 JournalStore.load 相同结构的字典"""
+        with metrics.timer("load.parse"):
+            students = {}
+            ids = {}
+            for sid, name, subjects in self.conn.execute(
+                    "SELECT id, name, subjects FROM students ORDER BY position, id"):
+                students[name] = new_student(_subjects_list(subjects))
+                ids[sid] = students[name]
+            for sid, date, duration, subject in self.conn.execute(
+                    "SELECT student_id, date, duration, subject FROM records ORDER BY student_id, date, id"):
+                ids[sid]["records"].append((date, duration) if subject is None else (date, duration, subject))
+            for sid, date, hours in self.conn.execute(
+                    "SELECT student_id, date, hours FROM payments ORDER BY student_id, date, id"):
+                ids[sid]["payments"].append((date, hours))
+        return students
+
+    def iter_students(self):
+        """按顺序逐个读取学生数据，内存占用只取决于单个学生的记录数"""
+        for name in self.student_index():
+            data = self.load_student(name)
+            if data is not None:
+                yield name, data
+
+    def snapshot(self):
+        """读取当前完整数据，供导出等只读任务使用"""
+        return self.load()
+
+    @_locked
+    def append(self, *ops):
+        """在一个事务中应用一条或多条增量操作"""
+        with metrics.timer("save.write"):
+            with self.conn:
+                for op in ops:
+                    self._apply(op)
+        metrics.count("save.ops", len(ops))
+
+    def _apply(self, op):
+        kind = op["op"]
+        cur = self.conn
+
+        if kind == "reorder":
+            cur.executemany("UPDATE students SET position = ? WHERE name = ?",
+                            [(pos, name) for pos, name in enumerate(op["order"])])
+            return
+
+        if kind == "move_student":
+            self._move_student(op["student"], op.get("before"))
+            return
+
+        if kind == "add_student":
+            (position,) = cur.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM students").fetchone()
+            cur.execute("INSERT INTO students (name, position, subjects) VALUES (?, ?, ?)",
+                        (op["student"], position, _subjects_text(op["subjects"])))
+            return
+
+        sid = self._student_id(op["student"])
+        if sid is None and kind == "import_entries":
+            # 批量导入时学生不存在则自动创建
+            (position,) = cur.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM students").fetchone()
+            sid = cur.execute("INSERT INTO students (name, position) VALUES (?, ?)",
+                              (op["student"], position)).lastrowid
+        if sid is None:
+            return
+
+        if kind == "set_subjects":
+            cur.execute("UPDATE students SET subjects = ? WHERE id = ?", (_subjects_text(op["subjects"]), sid))
+        elif kind == "add_record":
+            cur.execute("INSERT INTO records (student_id, date, duration) VALUES (?, ?, ?)",
+                        (sid, op["date"], op["duration"]))
+        elif kind == "modify_record":
+            row = cur.execute("SELECT id FROM records WHERE student_id = ? AND date = ? AND duration = ? "
+                              "ORDER BY id LIMIT 1", (sid, op["old_date"], op["old_duration"])).fetchone()
+            if row:
+                cur.execute("UPDATE records SET date = ?, duration = ?, subject = NULL WHERE id = ?",
+                            (op["date"], op["duration"], row[0]))
+        elif kind == "delete_record":
+            row = cur.execute("SELECT id FROM records WHERE student_id = ? AND date = ? AND duration = ? "
+                              "ORDER BY id LIMIT 1", (sid, op["date"], op["duration"])).fetchone()
+            if row:
+                cur.execute("DELETE FROM records WHERE id = ?", (row[0],))
+        elif kind == "add_payment":
+            cur.execute("INSERT INTO payments (student_id, date, hours) VALUES (?, ?, ?)",
+                        (sid, op["date"], op["hours"]))
+        elif kind == "import_entries":
+            cur.executemany("INSERT INTO records (student_id, date, duration) VALUES (?, ?, ?)",
+                            [(sid, date, duration) for date, duration in op["records"]])
+            cur.executemany("INSERT INTO payments (student_id, date, hours) VALUES (?, ?, ?)",
+                            [(sid, date, hours) for date, hours in op["payments"]])
+
+    def _move_student(self, name, before):
+        """把学生的位置改为 before 与其前一个学生位置的中间值（position 列可以存小数），只更新一行"""
+        cur = self.conn
+        if name == before:
+            return
+        row = cur.execute("SELECT position FROM students WHERE name = ?", (before,)).fetchone() \
+            if before is not None else None
+        if row is None:
+            cur.execute("UPDATE students SET position = (SELECT COALESCE(MAX(position) + 1, 0) FROM students) "
+                        "WHERE name = ?", (name,))
+            return
+        upper = row[0]
+        (lower,) = cur.execute("SELECT MAX(position) FROM students WHERE position < ? AND name != ?",
+                               (upper, name)).fetchone()
+        if lower is None:
+            lower = upper - 2
+        if upper - lower < MIN_POSITION_GAP:
+            # 间隔用尽时按当前顺序重新编号
+            names = [n for (n,) in cur.execute("SELECT name FROM students ORDER BY position, id")]
+            cur.executemany("UPDATE students SET position = ? WHERE name = ?",
+                            [(pos, n) for pos, n in enumerate(names)])
+            return self._move_student(name, before)
+        cur.execute("UPDATE students SET position = ? WHERE name = ?", ((lower + upper) / 2, name))
+
+    @_locked
+    def save_snapshot(self, students):
+        """用给定的学生字典整体替换数据库内容"""
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self.conn.execute("DELETE FROM payments")
+            self.conn.execute("DELETE FROM students")
+            for position, (name, data) in enumerate(students.items()):
+                sid = self.conn.execute(
+                    "INSERT INTO students (name, position, subjects) VALUES (?, ?, ?)",
+                    (name, position, _subjects_text(data.get("subjects", ["未设置"])))).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO records (student_id, date, duration, subject) VALUES (?, ?, ?, ?)",
+                    [(sid, r[0], r[1], r[2] if len(r) > 2 else None) for r in data["records"]])
+                self.conn.executemany(
+                    "INSERT INTO payments (student_id, date, hours) VALUES (?, ?, ?)",
+                    [(sid, date, hours) for date, hours in data["payments"]])
+
+    @_locked
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM students LIMIT 1").fetchone() is None
+
+    @_locked
+    def close(self):
+        self.conn.close()
+
+
+def migrate_from_text(text_path="tutoring_data.txt", db_path=DB_FILE, journal_path="tutoring_data.journal"):
+    """把文本快照（及其增量日志）一次性迁移到 SQLite 数据库，返回迁移的学生数"""
+    source = JournalStore(text_path, journal_path)
+    students = source.load()
+    source.close()
+    store = SQLiteStore(db_path)
+    try:
+        store.save_snapshot(students)
+    finally:
+        store.close()
+    return len(students)
+
+
+def open_sqlite_store(db_path=DB_FILE, text_path="tutoring_data.txt", journal_path="tutoring_data.journal"):
+    """打开 SQLite 后端；数据库为空而文本快照或增量日志存在时先自动迁移（快照加上日志重放）"""
+    store = SQLiteStore(db_path)
+    if store.is_empty() and (os.path.exists(text_path) or os.path.exists(journal_path)):
+        source = JournalStore(text_path, journal_path)
+        store.save_snapshot(source.load())
+        source.close()
+    return store
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "tutoring_data.txt"
+    dst = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+    count = migrate_from_text(src, dst)
+    print(f"已迁移 {count} 名学生: {src} -> {dst}")
@@ -0,0 +1,111 @@
+"""学生数据的惰性加载映射
+
+启动时只读取学生名单，某个学生的上课和结算记录在第一次访问时才从存储中读取，
+并放入容量有限的 LRU 缓存。尚未保存的（脏）学生会被钉在缓存中，直到持久化完成。
+"""
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from record_store import new_student
+from student_order import StudentOrder
+
+CACHE_CAPACITY = 64  # 默认最多缓存的学生数
+
+
+class LazyStudents(MutableMapping):
+    """按需从存储加载学生数据的字典，接口与 {name: data} 字典一致"""
+
+    def __init__(self, store, capacity=CACHE_CAPACITY):
+        self.store = store
+        self.capacity = capacity
+        self._order = StudentOrder(store.student_index())  # 学生的显示顺序
+        self._cache = OrderedDict()
+        self._dirty = {}  # 姓名 -> 尚未持久化的修改批数
+        self._active = None  # 当前界面正在显示的学生，同样不会被淘汰
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __contains__(self, name):
+        return name in self._order
+
+    def __getitem__(self, name):
+        if name not in self._order:
+            raise KeyError(name)
+        data = self._cache.get(name)
+        if data is None:
+            data = self.store.load_student(name)
+            if data is None:
+                data = new_student()
+            self._cache[name] = data
+            self._evict()
+        else:
+            self._cache.move_to_end(name)
+        return data
+
+    def __setitem__(self, name, data):
+        self._order.append(name)
+        self._cache[name] = data
+        self._cache.move_to_end(name)
+        self._evict()
+
+    def __delitem__(self, name):
+        if name not in self._order:
+            raise KeyError(name)
+        self._order.remove(name)
+        self._cache.pop(name, None)
+        self._dirty.pop(name, None)
+
+    def items(self):
+        """遍历所有学生；未缓存的学生直接从存储读取，不占用缓存"""
+        for name in self._order:
+            data = self._cache.get(name)
+            if data is None:
+                data = self.store.load_student(name)
+            yield name, data
+
+    def values(self):
+        for _, data in self.items():
+            yield data
+
+    def reorder(self, order):
+        """按给定姓名顺序重排学生"""
+        self._order.reorder(order)
+
+    def move(self, name, before=None):
+        """把学生移动到 before 之前（None 表示末尾），O(log n)"""
+        self._order.move(name, before)
+
+    def mark_dirty(self, name):
+        """标记学生有未保存的修改，在保存前不会被淘汰；可以在批量导入创建该学生之前调用"""
+        self._dirty[name] = self._dirty.get(name, 0) + 1
+
+    def mark_clean(self, name):
+        """一批修改已持久化；所有修改都保存后取消钉住"""
+        count = self._dirty.get(name, 0) - 1
+        if count > 0:
+            self._dirty[name] = count
+        else:
+            self._dirty.pop(name, None)
+        self._evict()
+
+    def set_active(self, name):
+        """设置当前显示的学生；界面持有其记录列表的引用，不能被淘汰"""
+        self._active = name
+        self._evict()
+
+    def cached_names(self):
+        return list(self._cache)
+
+    def _evict(self):
+        """超过容量时淘汰最久未使用且没有未保存修改的学生"""
+        if len(self._cache) <= self.capacity:
+            return
+        for name in list(self._cache):
+            if len(self._cache) <= self.capacity:
+                break
+            if name not in self._dirty and name != self._active:
+                del self._cache[name]
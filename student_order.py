@@ -0,0 +1,87 @@
+"""学生顺序索引：每个学生一个分数排序键
+
+移动一个学生只需为它分配前后两个邻居排序键的中间值，查找邻居和更新有序键列表都是二分查找，
+不必重建整个学生列表。相邻键之间的间隔过小时才整体重新编号（很少发生）。
+"""
+import bisect
+
+KEY_STEP = 1.0
+MIN_GAP = 1e-9  # 相邻键的间隔小于该值时重新编号
+
+
+class StudentOrder:
+    """按排序键维护的学生顺序"""
+
+    def __init__(self, names=()):
+        self._keys = {}   # 姓名 -> 排序键
+        self._sorted = []  # 有序的 (排序键, 姓名)
+        for name in names:
+            self.append(name)
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def __iter__(self):
+        return iter([name for _, name in self._sorted])
+
+    def __contains__(self, name):
+        return name in self._keys
+
+    def key(self, name):
+        return self._keys[name]
+
+    def index(self, name):
+        """学生当前的位置，O(log n)"""
+        return bisect.bisect_left(self._sorted, (self._keys[name], name))
+
+    def append(self, name):
+        """把学生加到末尾"""
+        if name in self._keys:
+            return
+        key = self._sorted[-1][0] + KEY_STEP if self._sorted else 0.0
+        self._keys[name] = key
+        self._sorted.append((key, name))
+
+    def remove(self, name):
+        key = self._keys.pop(name)
+        del self._sorted[bisect.bisect_left(self._sorted, (key, name))]
+
+    def move(self, name, before=None):
+        """把学生移动到 before 之前（before 为 None 时移到末尾），返回新的排序键"""
+        if name not in self._keys or name == before:
+            return self._keys.get(name)
+        self.remove(name)
+        if before not in self._keys:
+            self.append(name)
+            return self._keys[name]
+
+        key = self._key_before(before)
+        if key is None:
+            self.renumber()
+            key = self._key_before(before)
+        self._keys[name] = key
+        bisect.insort(self._sorted, (key, name))
+        return key
+
+    def _key_before(self, before):
+        """before 与其前一个学生之间的中间键；间隔过小时返回 None"""
+        pos = self.index(before)
+        upper = self._sorted[pos][0]
+        lower = self._sorted[pos - 1][0] if pos > 0 else upper - 2 * KEY_STEP
+        if upper - lower < MIN_GAP:
+            return None
+        return (lower + upper) / 2
+
+    def reorder(self, order):
+        """按给定的完整顺序重新编号；order 中没有的学生保持原有相对顺序排在后面"""
+        names = [name for name in order if name in self._keys]
+        seen = set(names)
+        names += [name for _, name in self._sorted if name not in seen]
+        self._keys = {}
+        self._sorted = []
+        for name in names:
+            self.append(name)
+
+    def renumber(self):
+        """按当前顺序重新分配等间距的排序键"""
+        self.reorder([name for _, name in self._sorted])
@@ -0,0 +1,120 @@
+"""学生姓名的增量搜索索引：前缀 / 子串 / 拼音首字母
+
+每个学生生成一个检索键：小写姓名、拼音首字母（张三 -> zs），装有 pypinyin 时再加上全拼。
+索引为每个字符记录含有它的行号：单个字符的查询直接取倒排表，多个字符时先对各字符的行号
+集合求交得到候选行，再逐个确认子串；继续输入（新查询以上次查询开头）时也可以只在上次的结果中过滤。
+没有 pypinyin 时用 GB2312 编码区间求拼音首字母：一级汉字（0xB0A1~0xD7F9）按拼音排序，
+每个声母的第一个汉字的编码即为区间边界；二级汉字和其他字符保持原样。
+索引在学生增删或顺序变化后标记为过期，下一次搜索时才重建。
+"""
+import bisect
+import functools
+
+# GB2312 一级汉字中各拼音首字母的起始编码（没有以 i、u、v 开头的拼音）
+_GB2312_BOUNDARIES = [
+    (0xB0A1, "a"), (0xB0C5, "b"), (0xB2C1, "c"), (0xB4EE, "d"), (0xB6EA, "e"), (0xB7A2, "f"),
+    (0xB8C1, "g"), (0xB9FE, "h"), (0xBBF7, "j"), (0xBFA6, "k"), (0xC0AC, "l"), (0xC2E8, "m"),
+    (0xC4C3, "n"), (0xC5B6, "o"), (0xC5BE, "p"), (0xC6DA, "q"), (0xC8BB, "r"), (0xC8F6, "s"),
+    (0xCBFA, "t"), (0xCDDA, "w"), (0xCEF4, "x"), (0xD1B9, "y"), (0xD4D1, "z"),
+]
+_GB2312_CODES = [code for code, _ in _GB2312_BOUNDARIES]
+_GB2312_LAST = 0xD7F9
+
+_pinyin = None  # pypinyin 模块；False 表示未安装
+
+
+def _load_pinyin():
+    global _pinyin
+    if _pinyin is None:
+        try:
+            import pypinyin
+            _pinyin = pypinyin
+        except ImportError:
+            _pinyin = False
+    return _pinyin
+
+
+@functools.lru_cache(maxsize=None)
+def gb2312_initial(char):
+    """单个汉字的拼音首字母（GB2312 一级汉字），其他字符原样小写返回"""
+    try:
+        raw = char.encode("gb2312")
+    except UnicodeEncodeError:
+        return char.lower()
+    if len(raw) != 2:
+        return char.lower()
+    code = raw[0] << 8 | raw[1]
+    if code < _GB2312_CODES[0] or code > _GB2312_LAST:
+        return char.lower()
+    return _GB2312_BOUNDARIES[bisect.bisect_right(_GB2312_CODES, code) - 1][1]
+
+
+def search_key(name):
+    """学生的检索键: 小写姓名、拼音首字母，以及（装有 pypinyin 时）全拼"""
+    pinyin = _load_pinyin()
+    if pinyin:
+        initials = "".join(pinyin.lazy_pinyin(name, style=pinyin.Style.FIRST_LETTER)).lower()
+        full = "".join(pinyin.lazy_pinyin(name)).lower()
+        return f"{name.lower()}\t{initials}\t{full}"
+    return f"{name.lower()}\t{''.join(gb2312_initial(c) for c in name)}"
+
+
+class StudentSearchIndex:
+    """按学生顺序排列的检索键及字符倒排表，search 返回命中的行号（升序）"""
+
+    def __init__(self):
+        self._cache = {}  # 姓名 -> 检索键，顺序变化时不必重新计算
+        self._names = None
+        self._keys = []   # 按行排列的检索键
+        self._rows = {}   # 字符 -> 检索键中含有该字符的行号（升序）
+        self._last = None  # 上一次的 (查询, 结果)
+
+    def invalidate(self):
+        """学生增删或顺序变化后调用，下次搜索时重建"""
+        self._names = None
+        self._last = None
+
+    def _build(self, names):
+        self._keys = []
+        self._rows = {}
+        for row, name in enumerate(names):
+            key = self._cache.get(name)
+            if key is None:
+                key = self._cache[name] = search_key(name)
+            self._keys.append(key)
+            for char in set(key):
+                rows = self._rows.get(char)
+                if rows is None:
+                    self._rows[char] = [row]
+                else:
+                    rows.append(row)
+        self._names = names
+
+    def search(self, names, query):
+        """在 names（学生顺序）中查找检索键包含 query 的学生，返回行号列表"""
+        query = query.strip().lower()
+        if self._names is not names:
+            self.invalidate()
+            self._build(names)
+        if not query:
+            return list(range(len(names)))
+
+        # 候选行: 含有查询中每个字符的行（集合求交在 C 层完成），从最少的字符开始
+        lists = sorted((self._rows.get(char, ()) for char in set(query)), key=len)
+        if len(query) == 1:
+            rows = list(lists[0])
+        else:
+            last = self._last
+            if last is not None and query.startswith(last[0]) and len(last[1]) < len(lists[0]):
+                # 继续输入：结果只会在上次的结果中
+                candidates = set(last[1])
+            else:
+                candidates = set(lists[0])
+            for other in lists[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(other)
+            keys = self._keys
+            rows = [row for row in sorted(candidates) if query in keys[row]]
+        self._last = (query, rows)
+        return rows
@@ -0,0 +1,194 @@
+"""记录表格的 Qt 模型
+
+EntryTableModel 直接以学生的 EntryList 为数据源，视图只为可见行请求单元格内容；
+增删改通过模型完成，并发出精确到行的插入 / 删除 / 修改信号，而不是重建整张表格。
+StudentListModel 是左侧学生列表的模型，支持按搜索索引过滤和拖拽排序。
+"""
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+
+from record_store import EntryList
+from student_search import StudentSearchIndex
+
+
+class EntryTableModel(QAbstractTableModel):
+    """以 EntryList 为数据源的表格模型：日期、时长，以及可选的累计时长列"""
+
+    def __init__(self, headers, cumulative=False, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.show_cumulative = cumulative
+        self.entries = EntryList()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role != Qt.DisplayRole:
+            return None
+
+        row, column = index.row(), index.column()
+        if column == 0:
+            return self.entries[row][0]
+        if column == 1:
+            return str(self.entries[row][1])
+        return f"{self.entries.cumulative(row):.1f}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def set_entries(self, entries):
+        """切换到另一个学生的记录"""
+        self.beginResetModel()
+        self.entries = entries
+        self.endResetModel()
+
+    def add_entry(self, entry):
+        """按日期插入条目，返回所在行号"""
+        row = self.entries.position_for(entry[0])
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entries.insert(row, entry)
+        self.endInsertRows()
+        self._rows_changed(row + 1, 2)
+        return row
+
+    def remove_entry(self, row):
+        """删除指定行，返回被删除的条目"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        entry = self.entries.pop(row)
+        self.endRemoveRows()
+        self._rows_changed(row, 2)
+        return entry
+
+    def replace_entry(self, row, entry):
+        """修改指定行，日期变化时移动到新位置，返回新的行号"""
+        if entry[0] != self.entries[row][0]:
+            self.remove_entry(row)
+            return self.add_entry(entry)
+        self.entries.replace(row, entry)
+        self._rows_changed(row, 1)
+        return row
+
+    def _rows_changed(self, first, first_column):
+        """从第 first 行起数值可能变化（累计时长），通知视图刷新"""
+        last_column = self.columnCount() - 1
+        if not self.show_cumulative:
+            if first_column > last_column:
+                return
+            last = first
+        else:
+            last = len(self.entries) - 1
+        if first > last or first >= len(self.entries):
+            return
+        self.dataChanged.emit(self.index(first, first_column), self.index(last, last_column))
+
+
+class StudentListModel(QAbstractListModel):
+    """学生名单模型：视图只为可见行请求数据；设置过滤条件时只显示命中搜索索引的学生
+
+    未过滤时可以拖拽排序：QListView 的内部移动调用 moveRows，模型发出 rowsMoved 信号，
+    参数与 QListWidget 相同。过滤状态下行号与名单位置不一致，不允许拖拽。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []     # 完整名单，按显示顺序
+        self._rows = None    # 过滤后可见的名单位置；None 表示不过滤
+        self._query = ""
+        self.search_index = StudentSearchIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._names) if self._rows is None else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.name(index.row())
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            # 只允许放在行与行之间，不能放到某个学生“上面”
+            return Qt.ItemIsDropEnabled if self._rows is None else Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return flags | Qt.ItemIsDragEnabled if self._rows is None else flags
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def name(self, row):
+        """可见行对应的学生姓名，越界时返回 None"""
+        if self._rows is not None:
+            if not 0 <= row < len(self._rows):
+                return None
+            row = self._rows[row]
+        return self._names[row] if 0 <= row < len(self._names) else None
+
+    def names(self):
+        """完整名单（显示顺序）"""
+        return list(self._names)
+
+    def row_of(self, name):
+        """学生所在的可见行，不可见时返回 -1"""
+        rows = range(len(self._names)) if self._rows is None else self._rows
+        for row, position in enumerate(rows):
+            if self._names[position] == name:
+                return row
+        return -1
+
+    def set_students(self, names):
+        """整体替换名单（加载数据时）"""
+        self.beginResetModel()
+        self._names = list(names)
+        self.search_index.invalidate()
+        self._rows = self._search(self._query)
+        self.endResetModel()
+
+    def append_student(self, name):
+        """在名单末尾添加学生；设置了过滤条件时重新过滤"""
+        self.search_index.invalidate()
+        if self._rows is None:
+            row = len(self._names)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._names.append(name)
+            self.endInsertRows()
+            return
+        self._names.append(name)
+        self.set_filter(self._query)
+
+    def set_filter(self, query):
+        """按姓名前缀 / 子串 / 拼音首字母过滤，空字符串显示全部"""
+        self.beginResetModel()
+        self._query = query
+        self._rows = self._search(query)
+        self.endResetModel()
+
+    def _search(self, query):
+        if not query.strip():
+            return None
+        return self.search_index.search(self._names, query)
+
+    def moveRows(self, source_parent, source_row, count, dest_parent, dest_child):
+        """拖拽排序：把 [source_row, source_row + count) 移到 dest_child 之前"""
+        if self._rows is not None or source_parent.isValid() or dest_parent.isValid():
+            return False
+        if source_row <= dest_child <= source_row + count:
+            return False
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row + count - 1, QModelIndex(), dest_child):
+            return False
+        moved = self._names[source_row:source_row + count]
+        del self._names[source_row:source_row + count]
+        target = dest_child if dest_child < source_row else dest_child - count
+        self._names[target:target] = moved
+        self.search_index.invalidate()
+        self.endMoveRows()
+        return True
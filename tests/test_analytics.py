@@ -0,0 +1,99 @@
+"""RecordAnalytics 的统计结果、增量刷新，以及 ledger.py stats"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import RecordAnalytics  # noqa: E402
+from journal_store import JournalStore  # noqa: E402
+from ledger import Ledger, LedgerError, main  # noqa: E402
+from record_store import new_student  # noqa: E402
+from student_cache import LazyStudents  # noqa: E402
+
+
+def sample_students():
+    return {
+        "张三": new_student(["数学"], [("2025-01-06", 2.0), ("2025-01-08", 1.5), ("2025-02-03", 1.0)],
+                           [("2025-01-31", 3.0)]),
+        "李四": new_student(["数学", "英语"], [("2025-01-07", 1.0, "英语"), ("2025-01-09", 2.0)]),
+        "王五": new_student(["物理"]),
+    }
+
+
+def saved_store(tmp_path):
+    store = JournalStore(str(tmp_path / "data.txt"), str(tmp_path / "data.journal"))
+    store.load()
+    store.save_snapshot(sample_students())
+    return store
+
+
+def test_queries():
+    analytics = RecordAnalytics()
+    analytics.refresh(sample_students())
+    table = analytics.by_student()
+    assert list(table.index) == ["张三", "李四", "王五"]
+    assert table.loc["张三"].tolist() == [4.5, 3.0, 1.5]
+    assert table.loc["王五"].tolist() == [0.0, 0.0, 0.0]
+    assert analytics.by_month(student="张三").to_dict("index") == {
+        "2025-01": {"taught": 3.5, "settled": 3.0}, "2025-02": {"taught": 1.0, "settled": 0.0}}
+    assert analytics.by_weekday(start="2025-01-06", end="2025-01-07")["taught"].tolist()[:2] == [2.0, 1.0]
+    assert analytics.by_subject().to_dict() == {"数学": 4.5, "英语": 1.0, "未指定": 2.0}
+
+
+def test_subject_survives_snapshot_round_trip(tmp_path):
+    # 文本快照把没有科目的记录读回为“未指定”，只有一个科目的学生仍计入该科目
+    store = saved_store(tmp_path)
+    students = store.load()
+    store.close()
+    analytics = RecordAnalytics()
+    analytics.refresh(students)
+    assert analytics.by_subject().to_dict() == {"数学": 4.5, "英语": 1.0, "未指定": 2.0}
+
+
+def test_refresh_rebuilds_only_changed_students():
+    students = sample_students()
+    analytics = RecordAnalytics()
+    assert analytics.refresh(students) == 3
+    assert analytics.refresh(students) == 0
+    students["李四"]["records"].add(("2025-01-10", 1.0))
+    assert analytics.refresh(students) == 1
+    assert analytics.by_student().loc["李四", "taught"] == 4.0
+    students["王五"]["subjects"] = ["化学"]
+    assert analytics.refresh(students) == 1
+
+
+def test_refresh_reuses_blocks_for_lazy_students(tmp_path):
+    store = saved_store(tmp_path)
+    students = LazyStudents(store, capacity=1)
+    analytics = RecordAnalytics()
+    assert analytics.refresh(students) == 3
+    # 未缓存的学生每次读出新的列表对象，内容未变时不重建
+    assert analytics.refresh(students) == 0
+    students["张三"]["records"].add(("2025-03-01", 1.0))
+    assert analytics.refresh(students) == 1
+    store.close()
+
+
+def test_ledger_stats(tmp_path):
+    with Ledger(saved_store(tmp_path)) as ledger:
+        assert ledger.stats("month", "李四").to_dict("index") == {"2025-01": {"taught": 3.0, "settled": 0.0}}
+        ledger.add_record("李四", "2025-02-01", 1.0)
+        assert ledger.stats(start="2025-02-01")["taught"].tolist() == [1.0, 1.0, 0.0]
+        for args in [("year",), ("student", "张三"), ("month", "赵六"), ("month", None, "2025-02-01", "2025-01-01"),
+                     ("month", None, "2025/13/01")]:
+            with pytest.raises(LedgerError):
+                ledger.stats(*args)
+
+
+def test_stats_command(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    store = JournalStore("tutoring_data.txt", "tutoring_data.journal")
+    store.load()
+    store.save_snapshot(sample_students())
+    store.close()
+    assert main(["stats", "--by", "subject", "--csv"]) == 0
+    assert capsys.readouterr().out.splitlines() == ["subject,taught", "数学,4.5", "未指定,2.0", "英语,1.0"]
+    assert main(["stats", "--student", "赵六"]) == 1
+    assert "学生不存在" in capsys.readouterr().err
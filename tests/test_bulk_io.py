@@ -0,0 +1,58 @@
+"""长表格式的导入校验：时长类型、重复导入与结算检查"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_io import export_long, import_ops, imported_rows, read_long  # noqa: E402
+from journal_store import JournalStore, apply_op  # noqa: E402
+from ledger import Ledger, LedgerError  # noqa: E402
+from record_store import new_student  # noqa: E402
+
+
+def write_csv(path, rows):
+    path.write_text("student,date,hours,kind\n" + "".join(row + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_integer_hours_are_read_as_float(tmp_path):
+    frame = read_long(write_csv(tmp_path / "in.csv", ["张三,2025-01-01,2,record", "张三,2025/1/3,1,payment"]))
+    ops = import_ops(frame)
+    assert ops[0]["records"] == [["2025-01-01", 2.0]]
+    assert all(isinstance(hours, float) for _, hours in ops[0]["records"] + ops[0]["payments"])
+
+
+def test_reimport_skips_existing_entries(tmp_path):
+    path = write_csv(tmp_path / "in.csv", ["张三,2025-01-01,2,record", "张三,2025-01-01,2,record",
+                                           "李四,2025-01-02,1.5,record", "张三,2025-01-05,1,payment"])
+    students = {"张三": new_student(["数学"], [("2025-01-01", 2.0, "数学")])}
+    ops = import_ops(read_long(path), students)
+    # 同日同时长的两条记录中已有一条，只导入另一条
+    assert [op["student"] for op in ops] == ["张三", "李四"]
+    assert ops[0]["records"] == [["2025-01-01", 2.0]]
+    assert imported_rows(ops) == 3
+    for op in ops:
+        apply_op(students, op)
+    assert import_ops(read_long(path), students) == []
+
+
+def test_payments_cannot_exceed_taught_hours(tmp_path):
+    path = write_csv(tmp_path / "in.csv", ["张三,2025-01-01,1,record", "张三,2025-01-02,2,payment"])
+    with pytest.raises(LedgerError, match="张三"):
+        import_ops(read_long(path))
+    # 现有的上课时长也计入
+    students = {"张三": new_student(["数学"], [("2024-12-01", 1.0)])}
+    assert len(import_ops(read_long(path), students)) == 1
+
+
+def test_ledger_import_round_trip(tmp_path):
+    store = JournalStore(str(tmp_path / "data.txt"), str(tmp_path / "data.journal"))
+    with Ledger(store) as ledger:
+        ledger.add_student("张三", "数学")
+        ledger.add_record("张三", "2025-01-01", 1.5)
+        exported = str(tmp_path / "out.csv")
+        export_long(ledger.students, exported)
+        assert ledger.import_file(exported) == (0, 0, 1)
+        assert len(ledger.students["张三"]["records"]) == 1
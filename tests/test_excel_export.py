@@ -0,0 +1,101 @@
+"""Excel 导出：增量缓存只重建有变化的工作表，结果与完整导出一致"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+from excel_export import export_students  # noqa: E402
+from record_store import new_student  # noqa: E402
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+
+    def read():
+        snap = metrics.snapshot()["counters"]
+        metrics.reset()
+        return snap.get("export.sheets", 0), snap.get("export.cached_sheets", 0)
+    metrics.reset()
+    yield read
+    metrics.reset()
+
+
+def sample_students():
+    return {
+        "张三": new_student(["数学"], [("2025-01-01", 2.0), ("2025-01-03", 1.5, "数学")], [("2025-01-05", 1.0)]),
+        "李四": new_student(["英语", "语文"], [("2025-01-02", 1 / 3)]),
+        "王五": new_student(["物理"]),
+    }
+
+
+def workbook_values(path):
+    """各工作表的单元格值与表头样式；总览表最后一行的导出时间不参与比较"""
+    wb = openpyxl.load_workbook(path)
+    sheets = {}
+    for ws in wb.worksheets:
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        if ws.title == "总览":
+            assert rows[-1][0] == "记录时间"
+            rows = rows[:-1]
+        bold = [cell.font.bold for cell in ws[1]] if ws.max_row else []
+        sheets[ws.title] = (rows, bold)
+    return wb.sheetnames, sheets
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cached_export_rebuilds_only_changed_sheets(tmp_path, counters, workers):
+    cache_dir = str(tmp_path / "cache")
+    students = sample_students()
+    export_students(students, str(tmp_path / "first.xlsx"), workers=workers, cache_dir=cache_dir)
+    assert counters() == (6, 0)
+
+    export_students(students, str(tmp_path / "same.xlsx"), workers=workers, cache_dir=cache_dir)
+    assert counters() == (0, 6)
+
+    students["张三"]["records"].add(("2025-01-04", 0.5))
+    # 只改科目不影响工作表内容，只更新总览表
+    students["李四"]["subjects"] = ["英语"]
+    cached = str(tmp_path / "cached.xlsx")
+    export_students(students, cached, workers=workers, cache_dir=cache_dir)
+    assert counters() == (1, 5)
+
+    full = str(tmp_path / "full.xlsx")
+    export_students(students, full, workers=workers, cache_dir="")
+    assert counters() == (6, 0)
+    assert workbook_values(cached) == workbook_values(full)
+    _, sheets = workbook_values(cached)
+    assert sheets["总览"][0][1:] == [["张三", "数学", 4.0, 1.0, 3.0], ["李四", "英语", 0.333333333, 0, 0.333333333],
+                                    ["王五", "物理", 0, 0, 0]]
+    assert sheets["张三_上课记录"][0][2] == ["2025-01-03", 1.5, 3.5]
+    assert sheets["张三_上课记录"][1] == [True, True, True]
+
+    # 缓存目录只保留本次导出用到的工作表
+    with open(os.path.join(cache_dir, "manifest.json"), encoding="utf-8") as f:
+        used = json.load(f)["sheets"]
+    assert sorted(name[:-4] for name in os.listdir(cache_dir) if name.endswith(".xml")) == used
+
+
+def test_stale_cache_version_rebuilds_everything(tmp_path, counters):
+    cache_dir = str(tmp_path / "cache")
+    export_students(sample_students(), str(tmp_path / "first.xlsx"), cache_dir=cache_dir)
+    counters()
+    manifest = os.path.join(cache_dir, "manifest.json")
+    with open(manifest, encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"]["format"] = -1
+    with open(manifest, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    export_students(sample_students(), str(tmp_path / "second.xlsx"), cache_dir=cache_dir)
+    assert counters() == (6, 0)
+    # 缓存文件丢失时只重新生成该工作表
+    os.remove(os.path.join(cache_dir, data["sheets"][0] + ".xml"))
+    export_students(sample_students(), str(tmp_path / "third.xlsx"), cache_dir=cache_dir)
+    assert counters() == (1, 5)
+    assert workbook_values(str(tmp_path / "third.xlsx")) == workbook_values(str(tmp_path / "first.xlsx"))
@@ -0,0 +1,175 @@
+"""JournalStore 的快照校验、历史版本回退与日志修复"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_store import JournalStore  # noqa: E402
+
+
+def open_store(tmp_path, binary=False, compact_threshold=1000):
+    snapshot = tmp_path / ("data.bin" if binary else "data.txt")
+    return JournalStore(str(snapshot), str(tmp_path / "data.journal"), compact_threshold)
+
+
+def add_records(store, start, count, student="张三"):
+    for day in range(start, start + count):
+        store.append({"op": "add_record", "student": student, "date": f"2025-01-{day:02d}", "duration": 1.0})
+        store.wait()
+
+
+def journal_lines(tmp_path):
+    with open(tmp_path / "data.journal", "rb") as f:
+        return f.readlines()
+
+
+def write_journal(tmp_path, lines):
+    with open(tmp_path / "data.journal", "wb") as f:
+        f.write(b"".join(lines))
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_corrupt_primary_falls_back_without_losing_records(tmp_path, binary):
+    store = open_store(tmp_path, binary, compact_threshold=5)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    # 两次合并快照: 当前快照和 .1 都包含已从日志删除的条目
+    add_records(store, 1, 10)
+    store.close()
+    snapshot = tmp_path / ("data.bin" if binary else "data.txt")
+    assert os.path.exists(f"{snapshot}.1")
+
+    with open(snapshot, "r+b") as f:
+        f.seek(40)
+        f.write(b"XXXX")
+
+    store = open_store(tmp_path, binary, compact_threshold=5)
+    students = store.load()
+    assert store.recovered_from == f"{snapshot}.1"
+    store.close()
+    assert [r[0] for r in students["张三"]["records"]] == [f"2025-01-{day:02d}" for day in range(1, 11)]
+
+
+def test_fallback_after_more_compactions(tmp_path):
+    store = open_store(tmp_path, compact_threshold=5)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    add_records(store, 1, 20)
+    store.close()
+
+    with open(tmp_path / "data.txt", "r+b") as f:
+        f.seek(40)
+        f.write(b"XXXX")
+    store = open_store(tmp_path, compact_threshold=5)
+    students = store.load()
+    store.close()
+    assert len(students["张三"]["records"]) == 20
+
+
+def test_torn_journal_tail_is_trimmed(tmp_path):
+    store = open_store(tmp_path)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    add_records(store, 1, 3)
+    store.close()
+    write_journal(tmp_path, journal_lines(tmp_path) + [b'{"op": "add_record", "stu'])
+
+    store = open_store(tmp_path)
+    students = store.load()
+    assert len(students["张三"]["records"]) == 3
+    assert store.journal_errors == []
+    assert len(journal_lines(tmp_path)) == 4
+    # 之后追加的条目不会接在残缺行后面
+    add_records(store, 4, 1)
+    store.close()
+
+    store = open_store(tmp_path)
+    assert len(store.load()["张三"]["records"]) == 4
+    store.close()
+
+
+def test_corrupt_middle_line_is_skipped_and_reported(tmp_path):
+    store = open_store(tmp_path)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    add_records(store, 1, 5)
+    store.close()
+    lines = journal_lines(tmp_path)
+    lines[2] = b'{"op": "add_rec\xff\n'
+    write_journal(tmp_path, lines)
+
+    store = open_store(tmp_path)
+    students = store.load()
+    # 只跳过损坏的第 3 行（1 月 2 日），其后的条目都保留
+    assert store.journal_errors == [3]
+    assert [r[0] for r in students["张三"]["records"]] == ["2025-01-01", "2025-01-03", "2025-01-04", "2025-01-05"]
+    assert len(journal_lines(tmp_path)) == 6
+
+    # 合并快照时损坏行移到 .corrupt 文件
+    store.save_snapshot(students)
+    store.close()
+    with open(tmp_path / "data.journal.corrupt", "rb") as f:
+        assert f.read() == lines[2]
+
+    store = open_store(tmp_path)
+    assert len(store.load()["张三"]["records"]) == 4
+    assert store.journal_errors == []
+    store.close()
+
+
+def test_failed_compaction_is_recorded_and_backs_off(tmp_path, monkeypatch):
+    store = open_store(tmp_path, compact_threshold=5)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    attempts = []
+    write_file = store._write_file
+
+    def failing_write(path, students, seq):
+        attempts.append(seq)
+        raise OSError("磁盘已满")
+    monkeypatch.setattr(store, "_write_file", failing_write)
+
+    add_records(store, 1, 8)
+    assert isinstance(store.compact_error, OSError)
+    # 失败后不会在每次追加时都重试，等日志再增加一个阈值的条目
+    assert len(attempts) == 1
+    assert not os.path.exists(tmp_path / "data.txt")
+    store.close()
+
+    reopened = open_store(tmp_path, compact_threshold=1000)
+    assert len(reopened.load()["张三"]["records"]) == 8
+    reopened.close()
+
+    add_records(store, 9, 5)
+    assert len(attempts) == 2
+    monkeypatch.setattr(store, "_write_file", write_file)
+    add_records(store, 14, 5)
+    assert store.compact_error is None
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert len(reopened.load()["张三"]["records"]) == 18
+    assert len(journal_lines(tmp_path)) < 18
+    reopened.close()
+
+
+def test_entries_without_seq_are_treated_as_corrupt(tmp_path):
+    store = open_store(tmp_path)
+    store.load()
+    store.append({"op": "add_student", "student": "张三", "subjects": ["数学"]})
+    add_records(store, 1, 2)
+    store.close()
+    lines = journal_lines(tmp_path)
+    write_journal(tmp_path, lines[:2] + [b'{"op": "add_record", "student": "\xe5\xbc\xa0\xe4\xb8\x89"}\n',
+                                         b"null\n", b'{"seq": "4"}\n'] + lines[2:])
+
+    store = open_store(tmp_path)
+    students = store.load()
+    assert store.journal_errors == [3, 4, 5]
+    assert len(students["张三"]["records"]) == 2
+    store.save_snapshot(students)
+    store.close()
+    with open(tmp_path / "data.journal.corrupt", "rb") as f:
+        assert len(f.readlines()) == 3
@@ -0,0 +1,143 @@
+"""Ledger 的业务规则校验与 ledger.py 命令行"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_store import JournalStore  # noqa: E402
+from ledger import Ledger, LedgerError, main  # noqa: E402
+
+
+def open_ledger(tmp_path):
+    return Ledger(JournalStore(str(tmp_path / "tutoring_data.txt"), str(tmp_path / "tutoring_data.journal")))
+
+
+def run(capsys, *argv):
+    code = main(list(argv))
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open_ledger(tmp_path) as ledger:
+        ledger.add_student("张三", "数学,英语")
+        ledger.add_student("李四")
+        ledger.add_record("张三", "2025-01-02", 2)
+        ledger.add_record("张三", "2025-01-01", 1.5)
+        ledger.add_payment("张三", "2025-01-03", 1)
+    return tmp_path
+
+
+def test_edits_are_persisted(data_dir):
+    with open_ledger(data_dir) as ledger:
+        assert list(ledger.students) == ["张三", "李四"]
+        assert ledger.students["李四"]["subjects"] == ["未设置"]
+        assert ledger.totals("张三") == (3.5, 1.0, 2.5)
+        ledger.modify_record("张三", 0, "2025-01-05", 0.5)
+        ledger.delete_records("张三", [0])
+        ledger.set_subjects("李四", "物理")
+        ledger.move_student("李四", "张三")
+    with open_ledger(data_dir) as ledger:
+        assert [r[:2] for r in ledger.students["张三"]["records"]] == [("2025-01-05", 0.5)]
+        assert ledger.balances() == [("李四", ["物理"], 0, 0, 0), ("张三", ["数学", "英语"], 0.5, 1.0, -0.5)]
+
+
+def test_rule_violations_leave_data_unchanged(data_dir):
+    with open_ledger(data_dir) as ledger:
+        version = ledger.students["张三"]["records"].version
+        for call, message in [
+            (lambda: ledger.add_student(" ", "数学"), "请输入学生姓名"),
+            (lambda: ledger.add_student(" 张三 "), "该学生已存在"),
+            (lambda: ledger.add_record("王五", "2025-01-01", 1), "学生不存在: 王五"),
+            (lambda: ledger.add_record("张三", "2025-1-1", 1), "日期格式不正确"),
+            (lambda: ledger.add_record("张三", "2025-01-01", "abc"), "时长不是数字"),
+            (lambda: ledger.add_record("张三", "2025-01-01", float("inf")), "时长必须大于 0"),
+            (lambda: ledger.modify_record("张三", 2, "2025-01-01", 1), "没有第 3 条上课记录"),
+            (lambda: ledger.modify_record("张三", 0, "2025-01-01", 0), "时长必须大于 0"),
+            # 一条行号无效时整批都不删除
+            (lambda: ledger.delete_records("张三", [0, 5]), "没有第 6 条上课记录"),
+            (lambda: ledger.add_payment("张三", "2025-01-04", 2.6), "结算课时不能超过总上课时长"),
+            (lambda: ledger.set_subjects("王五", "数学"), "学生不存在"),
+        ]:
+            with pytest.raises(LedgerError, match=message):
+                call()
+        assert ledger.students["张三"]["records"].version == version
+        assert ledger.totals("张三") == (3.5, 1.0, 2.5)
+        # 结算到刚好等于上课时长是允许的
+        ledger.add_payment("张三", "2025-01-04", 2.5)
+    with open_ledger(data_dir) as ledger:
+        assert ledger.totals("张三") == (3.5, 3.5, 0)
+
+
+def test_balance_command(data_dir, capsys):
+    code, out, _ = run(capsys, "balance")
+    assert code == 0
+    assert out.splitlines() == ["张三\t数学,英语\t上课 3.5\t结算 1\t剩余 2.5", "李四\t未设置\t上课 0\t结算 0\t剩余 0",
+                                "共 2 名学生，剩余未结算 2.5 小时"]
+    code, out, _ = run(capsys, "balance", "--csv")
+    assert out.splitlines() == ["学生姓名,补习科目,总上课时长(小时),已结算时长(小时),剩余时长(小时)",
+                                '张三,"数学,英语",3.5,1.0,2.5', "李四,未设置,0.0,0.0,0.0"]
+
+
+def test_check_command(data_dir, capsys):
+    assert run(capsys, "check") == (0, "检查了 2 名学生，发现 0 个问题\n", "")
+    # 绕过 Ledger 的校验直接写入存储
+    store = JournalStore(str(data_dir / "tutoring_data.txt"), str(data_dir / "tutoring_data.journal"))
+    store.load()
+    store.append({"op": "add_payment", "student": "李四", "date": "2025-01-01", "hours": 1.0})
+    store.close()
+    code, out, _ = run(capsys, "check")
+    assert code == 1
+    assert out.splitlines() == ["李四: 已结算 1 小时，超过总上课时长 0 小时", "检查了 2 名学生，发现 1 个问题"]
+
+
+def test_schedule_and_sessions_commands(data_dir, capsys):
+    code, out, _ = run(capsys, "schedule", "张三,李四", "2025-01-06", "2025-01-19", "一三", "18:00-19:30",
+                       "--holidays", "2025-01-08~2025-01-13")
+    assert (code, out) == (0, "已为 2 名学生添加 4 条上课记录\n")
+    (data_dir / "sessions.txt").write_text("李四,2025-01-20,1\n李四 2025-01-21 2\n", encoding="utf-8")
+    assert run(capsys, "sessions", "sessions.txt")[:2] == (0, "已为 1 名学生添加 2 条上课记录\n")
+    with open_ledger(data_dir) as ledger:
+        assert [r[:2] for r in ledger.students["李四"]["records"]] == [
+            ("2025-01-06", 1.5), ("2025-01-15", 1.5), ("2025-01-20", 1.0), ("2025-01-21", 2.0)]
+
+    # 校验失败时不写入任何记录
+    for argv, message in [
+        (("schedule", "张三,王五", "2025-01-06", "2025-01-19", "1", "2"), "学生不存在: 王五"),
+        (("schedule", "张三", "2025-01-06", "2025-01-19", "8", "2"), "星期应为 1~7"),
+        (("schedule", "张三", "2025-01-19", "2025-01-06", "1", "2"), "结束日期不能早于开始日期"),
+        (("schedule", "张三", "2025-01-06", "2025-01-19", "1", "22:00-01:00"), "结束时间应晚于开始时间"),
+        (("schedule", "张三", "2025-01-06", "2025-01-19", "1", "2", "--holidays", "2025-01-09~2025-01-08"),
+         "节假日区间"),
+        (("sessions", "missing.txt"), "missing.txt"),
+    ]:
+        code, _, err = run(capsys, *argv)
+        assert code == 1 and err.startswith("失败: ") and message in err
+    with open_ledger(data_dir) as ledger:
+        assert len(ledger.students["张三"]["records"]) == 4
+
+
+def test_import_and_export_commands(data_dir, capsys):
+    assert run(capsys, "export", "out.csv")[:2] == (0, "已导出到 out.csv\n")
+    text = (data_dir / "out.csv").read_text(encoding="utf-8")
+    assert text.count("张三") == 3
+    (data_dir / "in.csv").write_text(text + "李四,2025-02-01,2.0,record\n", encoding="utf-8")
+    assert run(capsys, "import", "in.csv")[:2] == (0, "已从 in.csv 导入 1 名学生的 1 行记录，跳过 3 行已存在的记录\n")
+    assert run(capsys, "import", "in.csv")[:2] == (0, "已从 in.csv 导入 0 名学生的 0 行记录，跳过 4 行已存在的记录\n")
+
+
+def test_sqlite_backend_and_load_failure(data_dir, capsys):
+    # 首次使用 SQLite 后端时从文本快照和日志迁移
+    assert run(capsys, "--backend", "sqlite", "balance", "--csv")[1].splitlines()[1] == '张三,"数学,英语",3.5,1.0,2.5'
+    assert os.path.exists(data_dir / "tutoring_data.db")
+    with open_ledger(data_dir) as ledger:
+        ledger.store.save_snapshot(ledger.students)
+    with open(data_dir / "tutoring_data.txt", "r+b") as f:
+        f.seek(40)
+        f.write(b"XXXX")
+    code, _, err = run(capsys, "balance")
+    assert code == 1 and err.startswith("加载数据失败: ")
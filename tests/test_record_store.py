@@ -0,0 +1,134 @@
+"""EntryList / CompactEntryList 的合计、前缀和、有序插入与紧凑存储"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import record_store  # noqa: E402
+from journal_store import JournalStore, apply_op  # noqa: E402
+from record_store import CompactEntryList, new_student  # noqa: E402
+
+# 20 分钟、7.5 分钟等不是 0.01 小时整数倍的时长
+INEXACT = [("2025-01-01", 0.125, "数学"), ("2025-01-02", 1 / 3), ("2025-01-03", 1.5, "英语")]
+
+
+@pytest.fixture
+def compact(monkeypatch):
+    monkeypatch.setattr(record_store, "COMPACT_RECORDS", True)
+
+
+def test_compact_keeps_inexact_durations():
+    entries = CompactEntryList(INEXACT[2:])
+    assert entries.exact
+    entries.add(INEXACT[0])
+    entries.add(INEXACT[1])
+    assert not entries.exact
+    assert list(entries) == sorted(INEXACT)
+    assert entries.total == round(0.125 + 1 / 3 + 1.5, 9)
+    assert entries.cumulative(1) == pytest.approx(0.125 + 1 / 3)
+    # 改回都是定点值后重建时恢复定点列
+    entries[:] = [("2025-01-01", 2.0)]
+    assert entries.exact and entries.total == 2.0
+
+
+@pytest.mark.parametrize("snapshot", ["data.txt", "data.bin"])
+def test_compact_round_trip_keeps_exact_durations(tmp_path, compact, snapshot):
+    store = JournalStore(str(tmp_path / snapshot), str(tmp_path / "data.journal"))
+    store.load()
+    store.save_snapshot({"张三": new_student(["数学"], INEXACT, [("2025-01-04", 0.125)])})
+    # 按原始时长匹配的修改、删除在重放时仍能找到对应记录
+    store.append({"op": "modify_record", "student": "张三", "index": 0, "old_date": "2025-01-01",
+                  "old_duration": 0.125, "date": "2025-01-05", "duration": 0.25})
+    store.append({"op": "delete_record", "student": "张三", "index": 0, "date": "2025-01-02",
+                  "duration": 1 / 3})
+    store.close()
+
+    store = JournalStore(str(tmp_path / snapshot), str(tmp_path / "data.journal"))
+    data = store.load()["张三"]
+    # 文本快照中没有科目的记录读回时科目为“未指定”，这里只比较日期和时长
+    assert [r[:2] for r in data["records"]] == [("2025-01-03", 1.5), ("2025-01-05", 0.25)]
+    assert list(data["payments"]) == [("2025-01-04", 0.125)]
+    store.save_snapshot({"李四": new_student(["数学"], INEXACT)})
+    store.close()
+
+    store = JournalStore(str(tmp_path / snapshot), str(tmp_path / "data.journal"))
+    assert [r[:2] for r in store.load()["李四"]["records"]] == [r[:2] for r in INEXACT]
+    store.close()
+
+
+def test_compact_replay_matches_exact_duration(compact):
+    students = {"张三": new_student(["数学"], INEXACT)}
+    apply_op(students, {"op": "delete_record", "student": "张三", "date": "2025-01-02", "duration": 1 / 3})
+    assert [r[0] for r in students["张三"]["records"]] == ["2025-01-01", "2025-01-03"]
+
+
+@pytest.mark.parametrize("cls", [record_store.EntryList, CompactEntryList])
+def test_totals_follow_every_edit(cls):
+    entries = cls([("2025-01-01", 1.0), ("2025-01-03", 2.0)])
+    entries.add(("2025-01-02", 0.5))
+    assert entries.total == 3.5
+    entries.pop(0)
+    assert entries.total == 2.5
+    assert entries.replace(0, ("2025-01-04", 1.5)) == 1
+    assert entries.total == 3.5
+    entries[0] = ("2025-01-03", 3.0)
+    entries.append(("2025-01-05", 0.25))
+    entries.extend([("2025-01-06", 0.75)])
+    assert entries.total == 5.5
+    del entries[0]
+    assert entries.total == 2.5
+    entries.clear()
+    assert entries.total == 0
+    entries.verify()
+
+
+@pytest.mark.parametrize("cls", [record_store.EntryList, CompactEntryList])
+def test_prefix_sums_invalidated_by_in_place_edit(cls):
+    entries = cls([(f"2025-01-{day:02d}", 1.0) for day in range(1, 11)])
+    assert entries.cumulative(-1) == 10.0
+    assert entries.hours_between("2025-01-03", "2025-01-05") == 3.0
+    version = entries.version
+    entries[4] = ("2025-01-05", 3.0)
+    assert entries.version != version
+    assert entries.cumulative(3) == 4.0
+    assert entries.cumulative(4) == 7.0
+    assert entries.cumulative(9) == 12.0
+    assert entries.hours_between("2025-01-03", "2025-01-05") == 5.0
+    entries.pop(0)
+    assert entries.cumulative(0) == 1.0
+    assert entries.hours_between("2025-01-01", "2025-01-31") == 11.0
+    entries.verify()
+
+
+@pytest.mark.parametrize("cls", [record_store.EntryList, CompactEntryList])
+def test_same_date_inserts_after_existing_entries(cls):
+    entries = cls([("2025-01-01", 1.0), ("2025-01-02", 1.0, "数学"), ("2025-01-03", 1.0)])
+    assert entries.add(("2025-01-02", 2.0)) == 2
+    assert entries.add(("2025-01-02", 3.0)) == 3
+    assert entries.add(("2024-12-31", 0.5)) == 0
+    assert [e[1] for e in entries if e[0] == "2025-01-02"] == [1.0, 2.0, 3.0]
+    # 批量并入与逐条 add 的顺序一致
+    merged = cls([("2025-01-01", 1.0), ("2025-01-02", 1.0, "数学"), ("2025-01-03", 1.0)])
+    merged.merge([("2025-01-02", 2.0), ("2025-01-02", 3.0), ("2024-12-31", 0.5)])
+    assert list(merged) == list(entries)
+
+
+def test_compact_matches_entry_list():
+    operations = [
+        ("add", ("2025-01-05", 1.5, "数学")), ("add", ("2025-01-01", 2.0)), ("add", ("2025-01-05", 0.5)),
+        ("replace", 1, ("2025-01-07", 1.0, "英语")), ("pop", 0), ("add", ("2025-01-02", 1 / 3)),
+        ("merge", [("2025-01-03", 1.0), ("2025-01-02", 2.0)]), ("replace", 0, ("2025-01-02", 0.75)),
+    ]
+    plain, compact_list = record_store.EntryList(), CompactEntryList()
+    for entries in (plain, compact_list):
+        for name, *args in operations:
+            getattr(entries, name)(*args)
+    assert list(compact_list) == list(plain)
+    assert compact_list == plain
+    assert compact_list.total == plain.total
+    assert [compact_list.cumulative(i) for i in range(len(plain))] == \
+        pytest.approx([plain.cumulative(i) for i in range(len(plain))])
+    assert compact_list.hours_between("2025-01-02", "2025-01-05") == pytest.approx(
+        plain.hours_between("2025-01-02", "2025-01-05"))
@@ -0,0 +1,98 @@
+"""批量录入：星期与节假日解析、周期排课、时间段换算和粘贴列表"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import LedgerError  # noqa: E402
+from record_store import new_student  # noqa: E402
+from session_entry import (parse_duration, parse_holidays, parse_session_lines, parse_weekdays,  # noqa: E402
+                           recurring_dates, recurring_sessions, session_ops, span_hours)
+
+
+def test_parse_weekdays():
+    assert parse_weekdays("1,3,5") == [0, 2, 4]
+    assert parse_weekdays("周三，周一") == [0, 2]
+    assert parse_weekdays("一三五 星期日") == [0, 2, 4, 6]
+    assert parse_weekdays("7、7") == [6]
+
+
+@pytest.mark.parametrize("text", ["", " , ", "0", "8", "周", "周八", "mon"])
+def test_invalid_weekdays(text):
+    with pytest.raises(LedgerError):
+        parse_weekdays(text)
+
+
+def test_parse_holidays():
+    assert parse_holidays("") == set()
+    assert parse_holidays("2025-01-01，2025-01-30~2025-02-02\n2025-01-01") == {
+        "2025-01-01", "2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02"}
+
+
+@pytest.mark.parametrize("text", ["2025/01/01", "2025-02-30", "2025-01-01~", "2025-01-05~2025-01-01"])
+def test_invalid_holidays(text):
+    with pytest.raises(LedgerError):
+        parse_holidays(text)
+
+
+def test_recurring_dates_skip_holidays():
+    # 2025-01-27 为周一，节假日区间跨过月末
+    holidays = parse_holidays("2025-01-29~2025-02-04")
+    assert recurring_dates("2025-01-27", "2025-02-12", [0, 2], holidays) == [
+        "2025-01-27", "2025-02-05", "2025-02-10", "2025-02-12"]
+    assert recurring_dates("2025-01-29", "2025-02-04", [0, 2], holidays) == []
+    assert recurring_dates("2025-01-27", "2025-01-27", [0]) == ["2025-01-27"]
+    with pytest.raises(LedgerError, match="结束日期"):
+        recurring_dates("2025-02-01", "2025-01-01", [0])
+    with pytest.raises(LedgerError, match="日期格式"):
+        recurring_dates("2025-01-01", "2025-13-01", [0])
+
+
+def test_recurring_sessions():
+    assert recurring_sessions(["张三", "李四"], "2025-01-06", "2025-01-12", [5], "9:00-10:30") == [
+        ("张三", "2025-01-11", 1.5), ("李四", "2025-01-11", 1.5)]
+
+
+@pytest.mark.parametrize("text, hours", [("18:00-20:00", 2.0), ("8:00 ~ 9:20", 1.333333333),
+                                         ("23:00-24:00", 1.0), ("00:00-00:15", 0.25)])
+def test_span_hours(text, hours):
+    assert span_hours(text) == hours
+
+
+@pytest.mark.parametrize("text", ["22:00-00:30", "20:00-18:00", "18:00-18:00", "20:00-24:30", "24:00-24:00",
+                                  "18:60-19:00", "18:00", "18-20"])
+def test_invalid_span(text):
+    # 跨过午夜、结束早于开始的时间段都不接受
+    with pytest.raises(LedgerError, match="时间段"):
+        span_hours(text)
+
+
+def test_parse_duration():
+    assert parse_duration(" 1.5 ") == 1.5
+    assert parse_duration("18:30-20:00") == 1.5
+    for text in ["0", "-1", "abc", "nan"]:
+        with pytest.raises(LedgerError):
+            parse_duration(text)
+
+
+def test_parse_session_lines():
+    text = "# 姓名,日期,时长\n张三,2025-01-02,2\n\n李四\t2025-01-03\t18:00-19:30\n张三 2025-01-01 1\n"
+    assert parse_session_lines(text) == [("张三", "2025-01-02", 2.0), ("李四", "2025-01-03", 1.5),
+                                         ("张三", "2025-01-01", 1.0)]
+    for text, message in [("张三,2025-01-02", "第 1 行"), ("\n张三,2025-01-32,2", "第 2 行: 日期"),
+                          ("张三,2025-01-02,0", "第 1 行: 时长"), ("张三,2025-01-02,20:00-19:00", "第 1 行: 时间段")]:
+        with pytest.raises(LedgerError, match=message):
+            parse_session_lines(text)
+
+
+def test_session_ops_group_and_sort():
+    students = {"张三": new_student(["数学"]), "李四": new_student(["英语"])}
+    sessions = [("李四", "2025-01-03", 1.0), ("张三", "2025-01-02", 2.0), ("李四", "2025-01-01", 1.5)]
+    assert session_ops(students, sessions) == [
+        {"op": "import_entries", "student": "李四", "records": [["2025-01-01", 1.5], ["2025-01-03", 1.0]],
+         "payments": []},
+        {"op": "import_entries", "student": "张三", "records": [["2025-01-02", 2.0]], "payments": []}]
+    with pytest.raises(LedgerError, match="学生不存在: 王五"):
+        session_ops(students, sessions + [("王五", "2025-01-01", 1.0)])
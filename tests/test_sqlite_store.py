@@ -0,0 +1,116 @@
+"""SQLiteStore：从文本快照和日志迁移、增量操作与 JournalStore 结果一致、位置重新编号"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite_store  # noqa: E402
+from journal_store import JournalStore, apply_op  # noqa: E402
+from record_store import new_student  # noqa: E402
+from sqlite_store import SQLiteStore, open_sqlite_store  # noqa: E402
+
+
+def normalized(students):
+    """比较用: 顺序、科目、上课记录的 (日期, 时长)、结算记录"""
+    return [(name, list(data["subjects"]), [tuple(r[:2]) for r in data["records"]],
+             [tuple(p) for p in data["payments"]]) for name, data in students.items()]
+
+
+OPS = [
+    {"op": "add_student", "student": "张三", "subjects": ["数学"]},
+    {"op": "add_student", "student": "李四", "subjects": ["英语"]},
+    {"op": "add_student", "student": "王五", "subjects": ["物理"]},
+    {"op": "set_subjects", "student": "李四", "subjects": ["英语", "语文"]},
+    {"op": "add_record", "student": "张三", "date": "2025-01-02", "duration": 2.0},
+    {"op": "add_record", "student": "张三", "date": "2025-01-01", "duration": 1.5},
+    {"op": "add_record", "student": "张三", "date": "2025-01-03", "duration": 1.0},
+    {"op": "modify_record", "student": "张三", "index": 1, "old_date": "2025-01-02", "old_duration": 2.0,
+     "date": "2025-01-05", "duration": 2.5},
+    {"op": "delete_record", "student": "张三", "index": 0, "date": "2025-01-01", "duration": 1.5},
+    {"op": "add_payment", "student": "张三", "date": "2025-01-06", "hours": 2.0},
+    {"op": "import_entries", "student": "李四", "records": [["2025-01-04", 1.0], ["2025-01-08", 1 / 3]],
+     "payments": [["2025-01-09", 1.0]]},
+    {"op": "import_entries", "student": "赵六", "records": [["2025-02-01", 2.0]], "payments": []},
+    {"op": "move_student", "student": "赵六", "before": "张三"},
+    {"op": "move_student", "student": "张三", "before": None},
+    {"op": "reorder", "order": ["王五", "赵六", "李四", "张三"]},
+    {"op": "move_student", "student": "李四", "before": "赵六"},
+]
+
+
+def test_each_op_matches_journal_replay(tmp_path):
+    store = SQLiteStore(str(tmp_path / "data.db"))
+    expected = {}
+    for op in OPS:
+        apply_op(expected, op)
+        store.append(op)
+        assert normalized(store.load()) == normalized(expected), op
+    assert store.fetch_records("张三", "2025-01-04") == [("2025-01-05", 2.5)]
+    store.close()
+
+
+def test_migrates_snapshot_and_journal(tmp_path):
+    text, journal, db = (str(tmp_path / name) for name in ("data.txt", "data.journal", "data.db"))
+    source = JournalStore(text, journal)
+    source.load()
+    source.save_snapshot({"张三": new_student(["数学"], [("2025-01-01", 1.0)])})
+    source.append(*OPS[1:])
+    expected = source.load()
+    source.close()
+
+    store = open_sqlite_store(db, text, journal)
+    assert normalized(store.load()) == normalized(expected)
+    # 数据库已有数据时不再迁移
+    store.append({"op": "add_record", "student": "王五", "date": "2025-03-01", "duration": 1.0})
+    store.close()
+    store = open_sqlite_store(db, text, journal)
+    assert len(store.load()["王五"]["records"]) == 1
+    store.close()
+
+
+def test_migrates_journal_without_snapshot(tmp_path):
+    text, journal, db = (str(tmp_path / name) for name in ("data.txt", "data.journal", "data.db"))
+    source = JournalStore(text, journal)
+    source.load()
+    source.append(*OPS)
+    expected = source.load()
+    source.close()
+    assert not os.path.exists(text)
+
+    store = open_sqlite_store(db, text, journal)
+    assert normalized(store.load()) == normalized(expected)
+    store.close()
+
+
+def test_positions_renumbered_when_gap_runs_out(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "data.db"))
+    expected = {}
+    for name in ["甲", "乙", "丙", "丁"]:
+        op = {"op": "add_student", "student": name, "subjects": ["数学"]}
+        apply_op(expected, op)
+        store.append(op)
+    renumbered = []
+    original = store._move_student
+
+    def move(name, before):
+        (count,) = store.conn.execute("SELECT COUNT(*) FROM students WHERE position != CAST(position AS INTEGER)"
+                                      ).fetchone()
+        renumbered.append(count)
+        return original(name, before)
+    monkeypatch.setattr(store, "_move_student", move)
+
+    # 交替把两个学生移到对方前面，每次都把与“甲”之间的间隔减半
+    moving, target = "丙", "乙"
+    for _ in range(40):
+        op = {"op": "move_student", "student": moving, "before": target}
+        apply_op(expected, op)
+        store.append(op)
+        moving, target = ("丁" if moving == "丙" else "丙"), moving
+        assert store.student_index() == list(expected)
+
+    positions = [p for (p,) in store.conn.execute("SELECT position FROM students ORDER BY position")]
+    assert len(set(positions)) == 4
+    assert min(b - a for a, b in zip(positions, positions[1:])) >= sqlite_store.MIN_POSITION_GAP
+    # 间隔用尽后重新编号：之后某次移动前所有位置都是整数
+    assert 0 in renumbered[2:]
+    store.close()
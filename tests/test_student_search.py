@@ -0,0 +1,91 @@
+"""StudentSearchIndex：拼音首字母、继续输入与删除字符、名单变化后的一致性"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import student_search  # noqa: E402
+from student_search import StudentSearchIndex, gb2312_initial, search_key  # noqa: E402
+
+NAMES = ["张三", "李四", "王五", "张思思", "欧阳芳", "Tom", "亓官", "赵小三"]
+
+
+@pytest.fixture(autouse=True)
+def without_pypinyin(monkeypatch):
+    # 固定使用 GB2312 首字母，结果不取决于是否装有 pypinyin
+    monkeypatch.setattr(student_search, "_pinyin", False)
+
+
+def naive(names, query):
+    query = query.strip().lower()
+    return [row for row, name in enumerate(names) if query in search_key(name)]
+
+
+@pytest.mark.parametrize("char, initial", [("啊", "a"), ("芭", "b"), ("匝", "z"), ("座", "z"), ("张", "z"),
+                                           ("欧", "o"), ("阳", "y"), ("亓", "亓"), ("A", "a"), ("é", "é")])
+def test_gb2312_initial(char, initial):
+    # 一级汉字首尾及区间边界；二级汉字和非汉字保持原样
+    assert gb2312_initial(char) == initial
+
+
+def test_search_key():
+    assert search_key("张三") == "张三\tzs"
+    assert search_key("Tom") == "tom\ttom"
+
+
+def test_queries_match_naive_filter():
+    index = StudentSearchIndex()
+    for query in ["", " ", "张", "zs", "ZS ", "s", "三", "oyf", "tom", "亓", "xyz", "\t", "zss"]:
+        assert index.search(NAMES, query) == naive(NAMES, query), query
+
+
+def test_narrowing_and_widening():
+    index = StudentSearchIndex()
+    # 继续输入时结果只会变少，删除字符后恢复为更宽的结果
+    for query in ["z", "zs", "zss", "zs", "z", "zx", "zxs", "zx", "", "s", "sx", "s"]:
+        assert index.search(NAMES, query) == naive(NAMES, query), query
+    assert index.search(NAMES, "zs") == [0, 3]
+    assert index.search(NAMES, "z") == [0, 3, 7]
+
+
+def test_rename_and_remove():
+    index = StudentSearchIndex()
+    names = list(NAMES)
+    assert index.search(names, "zs") == [0, 3]
+    # 传入新的名单对象时自动重建
+    renamed = ["陈三" if name == "张三" else name for name in names]
+    assert index.search(renamed, "zs") == [3]
+    assert index.search(renamed, "cs") == [0]
+    assert index.search(renamed, "张") == [3]
+    # 原地修改名单后调用 invalidate
+    del renamed[3]
+    index.invalidate()
+    assert index.search(renamed, "zs") == []
+    assert index.search(renamed, "zxs") == [6]
+    renamed.insert(0, "张思思")
+    index.invalidate()
+    assert index.search(renamed, "zs") == [0]
+    assert index.search(renamed, "zss") == [0]
+    assert index.search(renamed, "s") == naive(renamed, "s")
+
+
+def test_list_model_keeps_index_in_sync():
+    from PyQt5.QtCore import QModelIndex
+    from table_models import StudentListModel
+
+    model = StudentListModel()
+    model.set_students(["张三", "李四", "张思思"])
+    model.set_filter("zs")
+    assert model.rowCount() == 2
+    # 过滤状态下添加的学生命中时立即可见
+    model.append_student("赵生")
+    assert [model.name(row) for row in range(model.rowCount())] == ["张三", "张思思", "赵生"]
+    model.set_filter("")
+    assert model.moveRows(QModelIndex(), 3, 1, QModelIndex(), 0)
+    model.set_filter("zs")
+    assert [model.name(row) for row in range(model.rowCount())] == ["赵生", "张三", "张思思"]
+    assert model.row_of("李四") == -1
+    model.set_students(["李四", "张三"])
+    assert [model.name(row) for row in range(model.rowCount())] == ["张三"]
@@ -1,26 +1,90 @@
+import time
+_STARTUP_T0 = time.perf_counter()  # 启动计时起点，需在其他导入之前
+
 import sys
 import os
-import datetime
-import pandas as pd
+import json
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QListWidget, QLineEdit, QPushButton, 
                             QLabel, QDateEdit, QDoubleSpinBox, QTabWidget, 
-                            QTableWidget, QTableWidgetItem, QMessageBox, 
-                            QGroupBox, QFormLayout, QHeaderView, QDialog)
-from PyQt5.QtCore import Qt, QDate
-from PyQt5.QtGui import QFont
+                            QListView, QTableView, QAbstractItemView, QMessageBox, 
+                            QGroupBox, QFormLayout, QHeaderView, QDialog,
+                            QFileDialog, QCheckBox, QTimeEdit, QPlainTextEdit,
+                            QListWidgetItem, QShortcut)
+from PyQt5.QtCore import Qt, QDate, QTime, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QFontDatabase, QKeySequence
+
+import metrics
+
+from journal_store import apply_op
+from ledger import LedgerError, check_new_student, check_payment, open_store, parse_subjects
+from student_cache import LazyStudents, CACHE_CAPACITY
+from record_store import new_student, student_totals
+from table_models import EntryTableModel, StudentListModel
+from action_log import ActionLogger
+from background_writer import BackgroundWriter
+from excel_export import default_filename, export_students
+from bulk_io import export_long, import_ops, imported_rows, read_long
+from session_entry import (WEEKDAY_NAMES, parse_holidays, parse_session_lines, recurring_sessions,
+                           session_ops)
+
+# 惰性加载: 启动时只读取学生名单，选中学生时再读取其记录，并用 LRU 缓存
+LAZY_LOADING = os.environ.get("TUTORING_LAZY") == "1"
+# 自动保存的防抖间隔：最后一次修改后等待这么久再统一写入
+AUTOSAVE_DELAY_MS = 500
+# 启动性能分析: 输出导入、init_ui、load_data、首次绘制各阶段耗时
+PROFILE_STARTUP = os.environ.get("TUTORING_PROFILE_STARTUP") == "1" or "--profile-startup" in sys.argv
+# 启动完成（首次绘制）后立即退出，供启动耗时基准测试使用
+EXIT_AFTER_STARTUP = "--exit-after-startup" in sys.argv
+
+_IMPORT_TIME = time.perf_counter() - _STARTUP_T0
+
+class WriterSignals(QObject):
+    """把后台写入线程的结果转发到 GUI 线程"""
+    finished = pyqtSignal(str, object)  # 任务类型, 结果
+    failed = pyqtSignal(str, object)    # 任务类型, 异常
+    export_progress = pyqtSignal(str, int)  # 已写完的工作表名, 已完成工作表数
 
-# 确保中文显示正常
-import matplotlib
-matplotlib.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]
 
 class TutoringRecorder(QMainWindow):
     def __init__(self):
         super().__init__()
         self.students = {}  # 存储学生数据 {name: {records: [], payments: []}}
+        self.current_student = None  # 当前选中的学生（搜索过滤后可能不在可见行中）
         self.log_file = "tutoring_log.txt"
+        self.logger = ActionLogger(self.log_file)
+        self.startup_timings = {"imports": _IMPORT_TIME}
+        self._startup_ready = None  # load_data 完成的时间，首次绘制后清空
+        # 存储后端和快照格式由 TUTORING_BACKEND / TUTORING_SNAPSHOT_FORMAT 决定（见 ledger.py）
+        self.store = open_store()
+        # 保存和导出都交给后台线程，完成或失败时通过信号回到 GUI 线程
+        self.writer_signals = WriterSignals()
+        self.writer_signals.finished.connect(self.on_write_finished)
+        self.writer_signals.failed.connect(self.on_write_failed)
+        self.writer_signals.export_progress.connect(self.on_export_progress)
+        self._export_sheets = 0
+        self.writer = BackgroundWriter(self.store, self.writer_signals.finished.emit,
+                                       self.writer_signals.failed.emit)
+        # 防抖自动保存：一段时间内的多次修改合并为一次写入
+        self._pending_ops = []
+        self.save_counters = {"requested": 0, "submitted": 0}
+        self._compact_error = None  # 已提示过的后台合并快照错误
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.autosave_timer.timeout.connect(self.flush_saves)
+        # 性能统计：设置 TUTORING_METRICS_FILE 时定期写出；诊断面板（Ctrl+Shift+D）不出现在界面上
+        self.metrics_dumper = metrics.start_dump()
+        self._diagnostics = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_diagnostics)
+        t0 = time.perf_counter()
         self.init_ui()
+        t1 = time.perf_counter()
         self.load_data()
+        t2 = time.perf_counter()
+        self.startup_timings["init_ui"] = t1 - t0
+        self.startup_timings["load_data"] = t2 - t1
+        self._startup_ready = t2
 
     def init_ui(self):
         # 设置窗口基本属性
@@ -62,30 +126,40 @@ class TutoringRecorder(QMainWindow):
         add_student_layout.addWidget(add_student_btn)
         add_student_group.setLayout(add_student_layout)
         
-        # 学生列表
-        self.student_list = QListWidget()
+        # 搜索框：按姓名前缀 / 子串 / 拼音首字母过滤学生列表
+        self.student_search_input = QLineEdit()
+        self.student_search_input.setPlaceholderText("搜索姓名或拼音首字母")
+        self.student_search_input.setClearButtonEnabled(True)
+        self.student_search_input.textChanged.connect(self.filter_students)
+        self.student_search_input.returnPressed.connect(self.select_first_match)
+        
+        # 学生列表：以 StudentListModel 为数据源，视图只绘制可见行
+        self.student_model = StudentListModel(self)
+        self.student_list = QListView()
+        self.student_list.setModel(self.student_model)
+        self.student_list.setUniformItemSizes(True)
         self.student_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #e0e0e0;
                 border-radius: 3px;
                 padding: 5px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
                 border-bottom: 1px solid #f0f0f0;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #e3f2fd;
                 color: #0d47a1;
             }
         """)
-        self.student_list.itemClicked.connect(self.on_student_selected)
+        self.student_list.clicked.connect(self.on_student_clicked)
         
-        # 启用学生列表的拖拽排序功能
-        self.student_list.setDragDropMode(QListWidget.InternalMove)
+        # 启用学生列表的拖拽排序功能（过滤时模型不允许拖拽）
+        self.student_list.setDragDropMode(QListView.InternalMove)
         self.student_list.setDefaultDropAction(Qt.MoveAction)
-        self.student_list.setSelectionMode(QListWidget.SingleSelection)
-        self.student_list.model().rowsMoved.connect(self.on_students_reordered)
+        self.student_list.setSelectionMode(QListView.SingleSelection)
+        self.student_model.rowsMoved.connect(self.on_students_reordered)
         
         # 导出按钮
         export_btn = QPushButton("导出Excel")
@@ -104,10 +178,23 @@ class TutoringRecorder(QMainWindow):
         """)
         export_btn.clicked.connect(self.export_to_excel)
         
+        # 长表格式（CSV / Parquet）批量导出与导入
+        bulk_layout = QHBoxLayout()
+        export_long_btn = QPushButton("导出CSV/Parquet")
+        export_long_btn.setStyleSheet(export_btn.styleSheet())
+        export_long_btn.clicked.connect(self.export_long_format)
+        import_long_btn = QPushButton("导入CSV/Parquet")
+        import_long_btn.setStyleSheet(export_btn.styleSheet())
+        import_long_btn.clicked.connect(self.import_long_format)
+        bulk_layout.addWidget(export_long_btn)
+        bulk_layout.addWidget(import_long_btn)
+        
         left_layout.addWidget(add_student_group)
         left_layout.addWidget(QLabel("学生列表:"))
+        left_layout.addWidget(self.student_search_input)
         left_layout.addWidget(self.student_list)
         left_layout.addWidget(export_btn)
+        left_layout.addLayout(bulk_layout)
         
         # 右侧操作区域
         right_panel = QWidget()
@@ -157,23 +244,42 @@ class TutoringRecorder(QMainWindow):
         
         self.show()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._startup_ready is not None:
+            # 首次绘制完成，记录启动各阶段耗时
+            self.startup_timings["first_paint"] = time.perf_counter() - self._startup_ready
+            self.startup_timings["total"] = time.perf_counter() - _STARTUP_T0
+            self._startup_ready = None
+            QTimer.singleShot(0, self.report_startup)
+
+    def report_startup(self):
+        """输出启动各阶段耗时"""
+        timings = self.startup_timings
+        if PROFILE_STARTUP or EXIT_AFTER_STARTUP:
+            print("STARTUP_PROFILE " + json.dumps(timings), flush=True)
+        if PROFILE_STARTUP:
+            self.log_action("启动耗时: " + ", ".join(f"{k} {v * 1000:.1f}ms" for k, v in timings.items()))
+        if EXIT_AFTER_STARTUP:
+            self.close()
+
     def on_students_reordered(self, source_parent, source_start, source_end, dest_parent, dest_row):
-        """处理学生列表重新排序后的逻辑"""
-        # 创建新的学生顺序列表
-        new_order = []
-        for i in range(self.student_list.count()):
-            new_order.append(self.student_list.item(i).text())
-        
-        # 创建新的学生字典，按照新顺序
-        reordered_students = {}
-        for student in new_order:
-            reordered_students[student] = self.students[student]
-        
-        # 替换原来的学生字典
-        self.students = reordered_students
-        
-        # 保存重新排序后的数据
-        self.save_data()
+        """处理学生列表重新排序后的逻辑：只记录被移动的学生及其新的后一个学生，不遍历整个列表"""
+        count = source_end - source_start + 1
+        # dest_row 是移动前的行号，移到下方时要减去被移走的行数
+        first = dest_row if dest_row < source_start else dest_row - count
+        before = self.student_model.name(first + count)
+        
+        ops = []
+        for row in range(first, first + count):
+            student = self.student_model.name(row)
+            # 界面上的顺序以学生列表为准；惰性模式下同步更新顺序索引，普通模式的字典只按姓名查找
+            if isinstance(self.students, LazyStudents):
+                self.students.move(student, before)
+            ops.append({"op": "move_student", "student": student, "before": before})
+        
+        # 保存本次移动（增量，与学生总数无关）
+        self.save_data(*ops)
         self.log_action("学生列表顺序已调整")
 
     def init_attendance_tab(self):
@@ -251,6 +357,11 @@ class TutoringRecorder(QMainWindow):
         add_btn.clicked.connect(self.add_attendance)
         self.add_attendance_btn = add_btn  # 保存引用以便禁用/启用
         
+        # 批量添加：按周期排课或粘贴多名学生的记录列表
+        bulk_btn = QPushButton("批量添加上课记录")
+        bulk_btn.setStyleSheet(add_btn.styleSheet())
+        bulk_btn.clicked.connect(self.bulk_add_attendance)
+        
         # 当前选中的学生
         self.selected_student_label = QLabel("未选择学生")
         self.selected_student_label.setStyleSheet("color: #666666; font-style: italic;")
@@ -259,6 +370,7 @@ class TutoringRecorder(QMainWindow):
         layout.addWidget(self.selected_student_label)
         layout.addLayout(form_layout)
         layout.addWidget(add_btn)
+        layout.addWidget(bulk_btn)
         layout.addStretch()
         
         # 初始禁用按钮
@@ -269,12 +381,13 @@ class TutoringRecorder(QMainWindow):
         layout = QVBoxLayout(self.records_tab)
         
         # 表格
-        self.records_table = QTableWidget()
-        self.records_table.setColumnCount(3)
-        self.records_table.setHorizontalHeaderLabels(["日期", "时长(小时)", "累计时长(小时)"])
+        self.records_model = EntryTableModel(["日期", "时长(小时)", "累计时长(小时)"], cumulative=True, parent=self)
+        self.records_table = QTableView()
+        self.records_table.setModel(self.records_model)
+        self.records_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.records_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.records_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e0e0e0;
                 border-radius: 3px;
                 gridline-color: #f0f0f0;
@@ -286,7 +399,7 @@ class TutoringRecorder(QMainWindow):
             }
         """)
         # 连接选择信号
-        self.records_table.itemSelectionChanged.connect(self.on_record_selected)
+        self.records_table.selectionModel().selectionChanged.connect(self.on_record_selected)
         
         # 操作按钮布局
         button_layout = QHBoxLayout()
@@ -386,12 +499,12 @@ class TutoringRecorder(QMainWindow):
         self.add_payment_btn = add_payment_btn  # 保存引用以便禁用/启用
         
         # 结算记录表格
-        self.payments_table = QTableWidget()
-        self.payments_table.setColumnCount(2)
-        self.payments_table.setHorizontalHeaderLabels(["日期", "结算课时(小时)"])
+        self.payments_model = EntryTableModel(["日期", "结算课时(小时)"], parent=self)
+        self.payments_table = QTableView()
+        self.payments_table.setModel(self.payments_model)
         self.payments_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.payments_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e0e0e0;
                 border-radius: 3px;
                 gridline-color: #f0f0f0;
@@ -425,13 +538,10 @@ class TutoringRecorder(QMainWindow):
 
     def add_student(self):
         """添加学生"""
-        name = self.student_name_input.text().strip()
-        if not name:
-            QMessageBox.warning(self, "警告", "请输入学生姓名")
-            return
-        
-        if name in self.students:
-            QMessageBox.warning(self, "警告", "该学生已存在")
+        try:
+            name = check_new_student(self.students, self.student_name_input.text())
+        except LedgerError as e:
+            QMessageBox.warning(self, "警告", str(e))
             return
         
         # 创建设置补习科目的对话框
@@ -462,33 +572,50 @@ class TutoringRecorder(QMainWindow):
         # 显示对话框
         if dialog.exec_() == QDialog.Accepted:
             # 获取科目列表并处理
-            subjects_text = subjects_input.text().strip()
-            subjects = [s.strip() for s in subjects_text.split(",") if s.strip()]
-            if not subjects:
-                subjects = ["未设置"]
+            subjects = parse_subjects(subjects_input.text())
             
             # 添加到学生字典
-            self.students[name] = {
-                "records": [],  # 格式: [(date, duration, subject), ...]
-                "payments": [],  # 格式: [(date, hours), ...]
-                "subjects": subjects  # 学生补习的科目列表
-            }
+            self.students[name] = new_student(subjects)
             
             # 更新学生列表
-            self.student_list.addItem(name)
+            self.student_model.append_student(name)
             self.student_name_input.clear()
             
             # 保存数据
-            self.save_data()
+            self.save_data({"op": "add_student", "student": name, "subjects": subjects})
             
             # 记录日志
             self.log_action(f"添加了学生: {name}，补习科目: {', '.join(subjects)}")
 
-    def on_student_selected(self, item):
+    def filter_students(self, text):
+        """按搜索框内容过滤学生列表，当前学生仍可见时保持选中"""
+        self.student_model.set_filter(text)
+        row = self.student_model.row_of(self.current_student) if self.current_student else -1
+        if row >= 0:
+            self.student_list.setCurrentIndex(self.student_model.index(row))
+
+    def select_first_match(self):
+        """在搜索框中按回车时选中第一个匹配的学生"""
+        if self.student_model.rowCount() > 0:
+            index = self.student_model.index(0)
+            self.student_list.setCurrentIndex(index)
+            self.on_student_clicked(index)
+
+    def on_student_clicked(self, index):
+        """点击学生列表中的一行"""
+        student_name = self.student_model.name(index.row())
+        if student_name is not None:
+            self.on_student_selected(student_name)
+
+    def on_student_selected(self, student_name):
         """当选择学生时更新界面"""
-        student_name = item.text()
+        self.current_student = student_name
         self.selected_student_label.setText(f"当前学生: {student_name}")
         
+        # 界面将持有该学生的记录列表，惰性模式下不能被缓存淘汰
+        if isinstance(self.students, LazyStudents):
+            self.students.set_active(student_name)
+        
         # 显示学生的补习科目
         if student_name in self.students and "subjects" in self.students[student_name]:
             subjects = self.students[student_name]["subjects"]
@@ -513,101 +640,195 @@ class TutoringRecorder(QMainWindow):
 
     def add_attendance(self):
         """添加上课记录"""
-        current_item = self.student_list.currentItem()
-        if not current_item:
+        student_name = self.current_student
+        if not student_name:
             QMessageBox.warning(self, "警告", "请先选择学生")
             return
         
-        student_name = current_item.text()
         date = self.date_input.date().toString("yyyy-MM-dd")
         duration = self.duration_input.value()
         
-        # 移除科目字段，只保存日期和时长
-        self.students[student_name]["records"].append((date, duration))
-        # 按日期排序
-        self.students[student_name]["records"].sort(key=lambda x: x[0])
+        # 确保表格模型绑定该学生的记录，再按日期插入（移除科目字段，只保存日期和时长）
+        self.update_records_table(student_name)
+        self.records_model.add_entry((date, duration))
         
         # 更新表格
         self.update_records_table(student_name)
         
         # 保存数据
-        self.save_data()
+        self.save_data({"op": "add_record", "student": student_name, "date": date, "duration": duration})
         
         # 记录日志
         self.log_action(f"为 {student_name} 添加了 {duration} 小时的上课记录，日期: {date}")
         
         QMessageBox.information(self, "成功", f"已添加 {duration} 小时的上课记录")
 
-    def update_records_table(self, student_name):
-        """更新上课记录表格"""
-        records = self.students[student_name]["records"]
-        self.records_table.setRowCount(len(records))
+    def bulk_add_attendance(self):
+        """批量添加上课记录：按周期排课或粘贴列表，整批作为一次修改保存"""
+        if not self.students:
+            QMessageBox.warning(self, "警告", "请先添加学生")
+            return
         
-        # 确保表格有3列（移除科目列）
-        if self.records_table.columnCount() != 3:
-            self.records_table.setColumnCount(3)
-            self.records_table.setHorizontalHeaderLabels(["日期", "时长(小时)", "累计时长(小时)"])
+        dialog = QDialog(self)
+        dialog.setWindowTitle("批量添加上课记录")
+        dialog.resize(420, 480)
+        layout = QVBoxLayout(dialog)
+        tabs = QTabWidget()
+        layout.addWidget(tabs)
+        
+        # 按周期排课
+        schedule_tab = QWidget()
+        schedule_layout = QFormLayout(schedule_tab)
+        student_checks = QListWidget()
+        for name in self.student_model.names():
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if name == self.current_student else Qt.Unchecked)
+            student_checks.addItem(item)
+        start_input = QDateEdit(QDate.currentDate())
+        end_input = QDateEdit(QDate.currentDate().addMonths(3))
+        for date_edit in (start_input, end_input):
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setCalendarPopup(True)
+        weekday_layout = QHBoxLayout()
+        weekday_checks = []
+        for name in WEEKDAY_NAMES:
+            check = QCheckBox(name[1])
+            weekday_checks.append(check)
+            weekday_layout.addWidget(check)
+        weekday_checks[QDate.currentDate().dayOfWeek() - 1].setChecked(True)
+        time_layout = QHBoxLayout()
+        start_time = QTimeEdit(QTime(18, 0))
+        end_time = QTimeEdit(QTime(20, 0))
+        for time_edit in (start_time, end_time):
+            time_edit.setDisplayFormat("HH:mm")
+            time_layout.addWidget(time_edit)
+        holidays_input = QPlainTextEdit()
+        holidays_input.setPlaceholderText("跳过的日期，逗号或换行分隔\n例如：2024-10-01~2024-10-07")
+        holidays_input.setMaximumHeight(60)
+        schedule_layout.addRow("学生:", student_checks)
+        schedule_layout.addRow("开始日期:", start_input)
+        schedule_layout.addRow("结束日期:", end_input)
+        schedule_layout.addRow("星期:", weekday_layout)
+        schedule_layout.addRow("上课时间:", time_layout)
+        schedule_layout.addRow("节假日:", holidays_input)
+        tabs.addTab(schedule_tab, "按周期")
+        
+        # 粘贴列表
+        paste_tab = QWidget()
+        paste_layout = QVBoxLayout(paste_tab)
+        paste_layout.addWidget(QLabel("每行一条：姓名,日期,时长（时长可写成 18:00-20:00）"))
+        paste_input = QPlainTextEdit()
+        paste_input.setPlaceholderText("张三,2024-03-01,2\n李四,2024-03-01,18:00-19:30")
+        paste_layout.addWidget(paste_input)
+        load_btn = QPushButton("从文件读取")
+        
+        def load_file():
+            filename, _ = QFileDialog.getOpenFileName(dialog, "读取列表", "", "文本文件 (*.txt *.csv)")
+            if filename:
+                with open(filename, "r", encoding="utf-8-sig") as f:
+                    paste_input.setPlainText(f.read())
+        
+        load_btn.clicked.connect(load_file)
+        paste_layout.addWidget(load_btn)
+        tabs.addTab(paste_tab, "粘贴列表")
         
-        total = 0.0
-        cumulative = 0.0
+        button_layout = QHBoxLayout()
+        ok_btn = QPushButton("确定")
+        cancel_btn = QPushButton("取消")
+        button_layout.addWidget(ok_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+        ok_btn.clicked.connect(dialog.accept)
+        cancel_btn.clicked.connect(dialog.reject)
         
-        for row, record in enumerate(records):
-            # 处理不同格式的记录，兼容旧数据
-            if len(record) == 2:
-                date, duration = record
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        try:
+            if tabs.currentIndex() == 0:
+                students = [student_checks.item(i).text() for i in range(student_checks.count())
+                            if student_checks.item(i).checkState() == Qt.Checked]
+                if not students:
+                    raise LedgerError("请至少选择一名学生")
+                weekdays = [i for i, check in enumerate(weekday_checks) if check.isChecked()]
+                if not weekdays:
+                    raise LedgerError("请至少选择一个星期")
+                span = f"{start_time.time().toString('HH:mm')}-{end_time.time().toString('HH:mm')}"
+                sessions = recurring_sessions(students, start_input.date().toString("yyyy-MM-dd"),
+                                              end_input.date().toString("yyyy-MM-dd"), weekdays, span,
+                                              parse_holidays(holidays_input.toPlainText()))
             else:
-                date, duration = record[0], record[1]  # 忽略科目字段
-                
-            total += duration
-            cumulative += duration
-            
-            date_item = QTableWidgetItem(date)
-            date_item.setTextAlignment(Qt.AlignCenter)
-            
-            duration_item = QTableWidgetItem(str(duration))
-            duration_item.setTextAlignment(Qt.AlignCenter)
-            
-            cumulative_item = QTableWidgetItem(f"{cumulative:.1f}")
-            cumulative_item.setTextAlignment(Qt.AlignCenter)
-            
-            self.records_table.setItem(row, 0, date_item)
-            self.records_table.setItem(row, 1, duration_item)
-            self.records_table.setItem(row, 2, cumulative_item)
+                sessions = parse_session_lines(paste_input.toPlainText())
+            ops = session_ops(self.students, sessions)
+        except LedgerError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        if not sessions:
+            QMessageBox.warning(self, "警告", "没有需要添加的上课记录")
+            return
         
-        self.total_duration_label.setText(f"总时长: {total:.1f} 小时")
+        confirm = QMessageBox.question(self, "确认添加",
+                                       f"将为 {len(ops)} 名学生添加 {len(sessions)} 条上课记录，确定吗？",
+                                       QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if confirm == QMessageBox.Yes:
+            self.apply_sessions(ops, len(sessions))
+
+    def apply_sessions(self, ops, count):
+        """把批量生成的记录一次合并进各学生的记录，作为一次修改保存并记录一条日志"""
+        self.apply_batch(ops)
+        self.save_data(*ops, pinned=True)
+        
+        # 当前学生的记录被合并，重置表格模型
+        student_name = self.current_student
+        if student_name and any(op["student"] == student_name for op in ops):
+            self.records_model.set_entries(self.students[student_name]["records"])
+            self.update_records_table(student_name)
+        
+        self.log_action(f"批量添加了 {len(ops)} 名学生的 {count} 条上课记录: "
+                        f"{', '.join(op['student'] for op in ops)}")
+        QMessageBox.information(self, "成功", f"已为 {len(ops)} 名学生添加 {count} 条上课记录")
+
+    def update_records_table(self, student_name):
+        """更新上课记录表格"""
+        records = self.students[student_name]["records"]
+        
+        # 只在切换学生时重置模型，增删改由模型发出逐行信号
+        if self.records_model.entries is not records:
+            with metrics.timer("table.refresh"):
+                self.records_model.set_entries(records)
+            metrics.count("table.rows", len(records))
+        
+        self.total_duration_label.setText(f"总时长: {records.total:.1f} 小时")
         
         # 更新剩余时长
         self.update_remaining_hours(student_name)
 
     def add_payment(self):
         """添加结算记录"""
-        current_item = self.student_list.currentItem()
-        if not current_item:
+        student_name = self.current_student
+        if not student_name:
             QMessageBox.warning(self, "警告", "请先选择学生")
             return
         
-        student_name = current_item.text()
         date = self.payment_date_input.date().toString("yyyy-MM-dd")
         hours = self.payment_hours_input.value()
         
         # 检查总时长
-        total_duration = sum(d[1] for d in self.students[student_name]["records"])
-        total_paid = sum(p[1] for p in self.students[student_name]["payments"])
-        
-        if total_paid + hours > total_duration:
-            QMessageBox.warning(self, "警告", "结算课时不能超过总上课时长")
+        try:
+            check_payment(self.students[student_name], hours)
+        except LedgerError as e:
+            QMessageBox.warning(self, "警告", str(e))
             return
         
-        # 添加结算记录
-        self.students[student_name]["payments"].append((date, hours))
-        # 按日期排序
-        self.students[student_name]["payments"].sort(key=lambda x: x[0])
+        # 确保表格模型绑定该学生的结算记录，再按日期插入
+        self.update_payments_table(student_name)
+        self.payments_model.add_entry((date, hours))
         
         # 更新表格
         self.update_payments_table(student_name)
         
         # 保存数据
-        self.save_data()
+        self.save_data({"op": "add_payment", "student": student_name, "date": date, "hours": hours})
         
         # 记录日志
         self.log_action(f"为 {student_name} 添加了 {hours} 小时的结算记录，日期: {date}")
@@ -617,32 +838,21 @@ class TutoringRecorder(QMainWindow):
     def update_payments_table(self, student_name):
         """更新结算记录表格"""
         payments = self.students[student_name]["payments"]
-        self.payments_table.setRowCount(len(payments))
         
-        total_paid = 0.0
+        # 只在切换学生时重置模型，新增由模型发出逐行信号
+        if self.payments_model.entries is not payments:
+            with metrics.timer("table.refresh"):
+                self.payments_model.set_entries(payments)
+            metrics.count("table.rows", len(payments))
         
-        for row, (date, hours) in enumerate(payments):
-            total_paid += hours
-            
-            date_item = QTableWidgetItem(date)
-            date_item.setTextAlignment(Qt.AlignCenter)
-            
-            hours_item = QTableWidgetItem(str(hours))
-            hours_item.setTextAlignment(Qt.AlignCenter)
-            
-            self.payments_table.setItem(row, 0, date_item)
-            self.payments_table.setItem(row, 1, hours_item)
-        
-        self.total_paid_label.setText(f"已结算总时长: {total_paid:.1f} 小时")
+        self.total_paid_label.setText(f"已结算总时长: {payments.total:.1f} 小时")
         
         # 更新剩余时长
         self.update_remaining_hours(student_name)
 
     def update_remaining_hours(self, student_name):
         """更新剩余未结算时长"""
-        total_duration = sum(d[1] for d in self.students[student_name]["records"])
-        total_paid = sum(p[1] for p in self.students[student_name]["payments"])
-        remaining = total_duration - total_paid
+        _, _, remaining = student_totals(self.students[student_name])
         
         self.remaining_label.setText(f"剩余未结算时长: {remaining:.1f} 小时")
     
@@ -661,18 +871,17 @@ class TutoringRecorder(QMainWindow):
     
     def modify_record(self):
         """修改选中的上课记录"""
-        selected_items = self.records_table.selectedItems()
-        if not selected_items:
+        selected_indexes = self.records_table.selectionModel().selectedRows()
+        if not selected_indexes:
             return
             
         # 获取选中的行
-        selected_row = selected_items[0].row()
-        current_item = self.student_list.currentItem()
+        selected_row = selected_indexes[0].row()
+        student_name = self.current_student
         
-        if not current_item:
+        if not student_name:
             return
             
-        student_name = current_item.text()
         records = self.students[student_name]["records"]
         
         # 获取当前记录信息，处理不同格式的记录
@@ -727,16 +936,16 @@ class TutoringRecorder(QMainWindow):
             new_date = date_input.date().toString("yyyy-MM-dd")
             new_duration = duration_input.value()
             
-            # 更新记录（只保存日期和时长）
-            records[selected_row] = (new_date, new_duration)
-            # 按日期排序
-            records.sort(key=lambda x: x[0])
+            # 更新记录（只保存日期和时长），日期变化时移动到新位置
+            self.records_model.replace_entry(selected_row, (new_date, new_duration))
             
             # 更新表格
             self.update_records_table(student_name)
             
             # 保存数据
-            self.save_data()
+            self.save_data({"op": "modify_record", "student": student_name, "index": selected_row,
+                            "old_date": current_date, "old_duration": current_duration,
+                            "date": new_date, "duration": new_duration})
             
             # 记录日志
             self.log_action(f"修改了 {student_name} 的上课记录，日期: {new_date}，时长: {new_duration} 小时")
@@ -745,15 +954,14 @@ class TutoringRecorder(QMainWindow):
     
     def delete_record(self):
         """删除选中的上课记录"""
-        selected_rows = sorted(set(item.row() for item in self.records_table.selectedItems()), reverse=True)
+        selected_rows = sorted(set(index.row() for index in self.records_table.selectionModel().selectedRows()), reverse=True)
         if not selected_rows:
             return
             
-        current_item = self.student_list.currentItem()
-        if not current_item:
+        student_name = self.current_student
+        if not student_name:
             return
             
-        student_name = current_item.text()
         records = self.students[student_name]["records"]
         
         # 确认删除
@@ -768,29 +976,28 @@ class TutoringRecorder(QMainWindow):
         
         if confirm == QMessageBox.Yes:
             # 删除记录
+            ops = []
             for row in selected_rows:
-                date, duration = records.pop(row)
+                date, duration = self.records_model.remove_entry(row)[:2]
+                ops.append({"op": "delete_record", "student": student_name, "index": row,
+                            "date": date, "duration": duration})
                 self.log_action(f"删除了 {student_name} 的上课记录，日期: {date}，时长: {duration} 小时")
             
-            # 按日期排序
-            records.sort(key=lambda x: x[0])
-            
             # 更新表格
             self.update_records_table(student_name)
             
             # 保存数据
-            self.save_data()
+            self.save_data(*ops)
             
             QMessageBox.information(self, "成功", f"已成功删除 {len(selected_rows)} 条上课记录")
 
     def modify_student_subjects(self):
         """修改学生的补习科目"""
-        current_item = self.student_list.currentItem()
-        if not current_item:
+        student_name = self.current_student
+        if not student_name:
             QMessageBox.warning(self, "警告", "请先选择学生")
             return
         
-        student_name = current_item.text()
         
         # 创建设置补习科目的对话框
         dialog = QDialog(self)
@@ -824,10 +1031,7 @@ class TutoringRecorder(QMainWindow):
         # 显示对话框
         if dialog.exec_() == QDialog.Accepted:
             # 获取科目列表并处理
-            subjects_text = subjects_input.text().strip()
-            subjects = [s.strip() for s in subjects_text.split(",") if s.strip()]
-            if not subjects:
-                subjects = ["未设置"]
+            subjects = parse_subjects(subjects_input.text())
             
             # 更新学生的补习科目
             self.students[student_name]["subjects"] = subjects
@@ -836,7 +1040,7 @@ class TutoringRecorder(QMainWindow):
             self.subjects_display_label.setText(", ".join(subjects))
             
             # 保存数据
-            self.save_data()
+            self.save_data({"op": "set_subjects", "student": student_name, "subjects": subjects})
             
             # 记录日志
             self.log_action(f"修改了学生 {student_name} 的补习科目: {', '.join(subjects)}")
@@ -844,190 +1048,254 @@ class TutoringRecorder(QMainWindow):
             QMessageBox.information(self, "成功", "已成功修改学生补习科目")
 
     def log_action(self, message):
-        """记录操作日志"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(log_entry)
+        """记录操作日志（缓冲写入，由 ActionLogger 批量落盘）"""
+        self.logger.log(message)
 
-    def save_data(self):
-        """保存数据到文件"""
-        try:
-            # 这里使用简单的文本格式保存，实际应用中可以考虑使用JSON或数据库
-            with open("tutoring_data.txt", "w", encoding="utf-8") as f:
-                for student, data in self.students.items():
-                    f.write(f"STUDENT:{student}\n")
-                    
-                    # 保存补习科目
-                    if "subjects" in data:
-                        f.write(f"SUBJECTS:{','.join(data['subjects'])}\n")
-                    
-                    # 保存上课记录
-                    for record in data["records"]:
-                        # 处理不同格式的记录
-                        if len(record) == 2:
-                            date, duration = record
-                            f.write(f"RECORD:{date},{duration}\n")
-                        else:
-                            date, duration, subject = record
-                            f.write(f"RECORD:{date},{duration},{subject}\n")
-                    
-                    # 保存结算记录
-                    for date, hours in data["payments"]:
-                        f.write(f"PAYMENT:{date},{hours}\n")
-                
-                self.log_action("数据已保存")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存数据失败: {str(e)}")
-            self.log_action(f"保存数据失败: {str(e)}")
+    def pin_students(self, ops):
+        """惰性加载时钉住 ops 涉及的学生，直到写入完成（每条操作对应写入后的一次 mark_clean）"""
+        if isinstance(self.students, LazyStudents):
+            for op in ops:
+                if "student" in op:
+                    self.students.mark_dirty(op["student"])
+
+    def apply_batch(self, ops):
+        """逐条先钉住再应用一批操作：批量涉及的学生多于缓存容量时，先改的学生不会在保存前被淘汰"""
+        for op in ops:
+            self.pin_students([op])
+            apply_op(self.students, op)
+
+    def save_data(self, *ops, pinned=False):
+        """保存数据：记录本次修改的增量，防抖计时结束后统一写入；pinned 表示已由 apply_batch 钉住"""
+        self.save_counters["requested"] += 1
+        metrics.count("save.requested")
+        if not pinned:
+            # 写入完成前钉住相关学生，避免未保存的修改被缓存淘汰
+            self.pin_students(ops)
+        self._pending_ops.extend(ops)
+        self.autosave_timer.start()
+
+    def flush_saves(self):
+        """立即把积累的修改作为一批交给后台写入线程"""
+        self.autosave_timer.stop()
+        if not self._pending_ops:
+            return
+        ops = self._pending_ops
+        self._pending_ops = []
+        
+        # 连续多次移动同一个学生时只需保留最后一次（其他学生的相对顺序不变）
+        coalesced = []
+        for op in ops:
+            if (op["op"] == "move_student" and coalesced and coalesced[-1]["op"] == "move_student"
+                    and coalesced[-1]["student"] == op["student"]):
+                dropped = coalesced.pop()
+                if isinstance(self.students, LazyStudents):
+                    # 被合并掉的操作不会再有写入完成的通知，在这里取消它的钉住
+                    self.students.mark_clean(dropped["student"])
+            coalesced.append(op)
+        ops = coalesced
+        
+        self.save_counters["submitted"] += 1
+        metrics.count("save.batches")
+        self.writer.submit_save(ops)
+
+    def save_stats(self):
+        """保存请求次数、提交给后台的批次数与实际写入次数"""
+        return dict(self.save_counters, performed=self.writer.saves_performed)
+
+    def on_write_finished(self, kind, result):
+        """后台任务完成"""
+        if kind == "save":
+            if isinstance(self.students, LazyStudents):
+                for op in result:
+                    if "student" in op:
+                        self.students.mark_clean(op["student"])
+            self.log_action("数据已保存")
+            # 后台合并快照失败不影响已写入日志的数据，每个错误只提示一次
+            error = getattr(self.store, "compact_error", None)
+            if error is not None and error is not self._compact_error:
+                self._compact_error = error
+                self.statusBar().showMessage(f"合并快照失败，数据仍保存在增量日志中: {error}")
+                self.log_action(f"合并快照失败: {error}")
+        elif kind == "export":
+            self.statusBar().clearMessage()
+            self.log_action(f"数据已导出到 {result}")
+            QMessageBox.information(self, "成功", f"数据已成功导出到 {result}")
+
+    def on_write_failed(self, kind, error):
+        """后台任务失败"""
+        if kind == "save":
+            QMessageBox.critical(self, "错误", f"保存数据失败: {str(error)}")
+            self.log_action(f"保存数据失败: {str(error)}")
+        elif kind == "export":
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "错误", f"导出Excel失败: {str(error)}")
+            self.log_action(f"导出Excel失败: {str(error)}")
 
     def load_data(self):
-        """从文件加载数据"""
+        """从快照和增量日志加载数据"""
         try:
-            if not os.path.exists("tutoring_data.txt"):
-                return
-                
-            current_student = None
-            
-            with open("tutoring_data.txt", "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    parts = line.split(":", 1)
-                    if len(parts) != 2:
-                        continue
-                        
-                    type_, content = parts
-                    
-                    if type_ == "STUDENT":
-                        current_student = content
-                        if current_student not in self.students:
-                            self.students[current_student] = {"records": [], "payments": []}
-                            self.student_list.addItem(current_student)
-                    elif type_ == "SUBJECTS" and current_student:
-                        # 加载学生补习科目
-                        subjects = [s.strip() for s in content.split(",") if s.strip()]
-                        if subjects:
-                            self.students[current_student]["subjects"] = subjects
-                    elif type_ == "RECORD" and current_student:
-                        record_parts = content.split(",")
-                        if len(record_parts) == 2:
-                            # 旧格式的记录 (date, duration)
-                            date, duration = record_parts
-                            try:
-                                # 转换为新格式并添加默认科目
-                                self.students[current_student]["records"].append((date, float(duration), "未指定"))
-                            except ValueError:
-                                pass
-                        elif len(record_parts) >= 3:
-                            # 新格式的记录 (date, duration, subject)
-                            date, duration, subject = record_parts[:3]
-                            try:
-                                self.students[current_student]["records"].append((date, float(duration), subject.strip()))
-                            except ValueError:
-                                pass
-                    elif type_ == "PAYMENT" and current_student:
-                        payment_parts = content.split(",")
-                        if len(payment_parts) == 2:
-                            date, hours = payment_parts
-                            try:
-                                self.students[current_student]["payments"].append((date, float(hours)))
-                            except ValueError:
-                                pass
-            
-            # 确保所有学生都有subjects字段
-            for student in self.students:
-                if "subjects" not in self.students[student]:
-                    self.students[student]["subjects"] = ["未设置"]
-                    
-                # 对记录进行排序
-                self.students[student]["records"].sort(key=lambda x: x[0])
-                self.students[student]["payments"].sort(key=lambda x: x[0])
+            with metrics.timer("load_data"):
+                if LAZY_LOADING:
+                    cache_size = int(os.environ.get("TUTORING_CACHE_SIZE", CACHE_CAPACITY))
+                    self.students = LazyStudents(self.store, cache_size)
+                else:
+                    self.students = self.store.load()
+                self.student_model.set_students(self.students)
+            metrics.count("load.students", len(self.students))
                 
             self.log_action("数据已加载")
+            recovered_from = getattr(self.store, "recovered_from", None)
+            if recovered_from:
+                QMessageBox.warning(self, "警告", f"数据文件校验失败，已从历史版本 {recovered_from} 恢复")
+                self.log_action(f"数据文件校验失败，已从历史版本 {recovered_from} 恢复")
+            journal_errors = getattr(self.store, "journal_errors", None)
+            if journal_errors:
+                lines = ", ".join(str(number) for number in journal_errors)
+                QMessageBox.warning(self, "警告", f"增量日志第 {lines} 行已损坏，加载时已跳过这些修改")
+                self.log_action(f"增量日志第 {lines} 行已损坏，加载时已跳过")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"加载数据失败: {str(e)}")
             self.log_action(f"加载数据失败: {str(e)}")
 
+    def closeEvent(self, event):
+        """关闭窗口前写完队列中的保存任务，等待后台压缩完成，并写入剩余日志"""
+        self.flush_saves()
+        self.writer.close()
+        self.store.close()
+        stats = self.save_stats()
+        self.log_action(f"保存请求 {stats['requested']} 次，实际写入 {stats['performed']} 次")
+        self.logger.close()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
+        super().closeEvent(event)
+
+    def show_diagnostics(self):
+        """隐藏的诊断面板（Ctrl+Shift+D）：显示性能统计、保存次数和启动耗时，每秒刷新"""
+        if self._diagnostics is not None:
+            self._diagnostics.show()
+            self._diagnostics.raise_()
+            return
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("诊断信息")
+        dialog.resize(760, 480)
+        layout = QVBoxLayout(dialog)
+        text = QPlainTextEdit()
+        text.setReadOnly(True)
+        text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(text)
+        
+        def refresh():
+            stats = self.save_stats()
+            startup = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in self.startup_timings.items())
+            text.setPlainText(f"{metrics.format_report()}\n\n"
+                              f"保存: 请求 {stats['requested']} 次，提交 {stats['submitted']} 批，"
+                              f"写入 {stats['performed']} 次\n启动: {startup}")
+        
+        def toggle():
+            metrics.enable(not metrics.ENABLED)
+            toggle_btn.setText("关闭统计" if metrics.ENABLED else "开启统计")
+            refresh()
+        
+        def reset():
+            metrics.reset()
+            refresh()
+        
+        button_layout = QHBoxLayout()
+        toggle_btn = QPushButton("关闭统计" if metrics.ENABLED else "开启统计")
+        toggle_btn.clicked.connect(toggle)
+        reset_btn = QPushButton("清零")
+        reset_btn.clicked.connect(reset)
+        copy_btn = QPushButton("复制JSON")
+        copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(
+            json.dumps(metrics.snapshot(), ensure_ascii=False, indent=2)))
+        for btn in (toggle_btn, reset_btn, copy_btn):
+            button_layout.addWidget(btn)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+        
+        timer = QTimer(dialog)
+        timer.setInterval(1000)
+        timer.timeout.connect(lambda: dialog.isVisible() and refresh())
+        timer.start()
+        refresh()
+        self._diagnostics = dialog
+        dialog.show()
+
     def export_to_excel(self):
-        """导出数据到Excel文件"""
+        """导出数据到Excel文件（在后台线程中进行）"""
         if not self.students:
             QMessageBox.warning(self, "警告", "没有学生数据可导出")
             return
-            
+        
+        # 导出任务排在之前提交的保存之后执行，逐个学生从存储中流式读取已落盘的数据
+        self.flush_saves()
+        filename = default_filename()
+        self._export_sheets = 2 * len(self.students) + 1
+        self.statusBar().showMessage("正在导出...")
+        self.writer.submit("export", lambda: export_students(
+            self.store.iter_students(), filename, self.writer_signals.export_progress.emit))
+
+    def export_long_format(self):
+        """导出长表格式的 CSV 或 Parquet 文件（在后台线程中进行）"""
+        if not self.students:
+            QMessageBox.warning(self, "警告", "没有学生数据可导出")
+            return
+        
+        filename, _ = QFileDialog.getSaveFileName(self, "导出数据", "补课时间记录.csv",
+                                                  "CSV 文件 (*.csv);;Parquet 文件 (*.parquet)")
+        if not filename:
+            return
+        
+        self.flush_saves()
+        self.statusBar().showMessage("正在导出...")
+        def export():
+            export_long(self.store.iter_students(), filename)
+            return filename
+        self.writer.submit("export", export)
+
+    def import_long_format(self):
+        """从长表格式的 CSV 或 Parquet 文件批量导入记录，作为一批修改保存"""
+        filename, _ = QFileDialog.getOpenFileName(self, "导入数据", "",
+                                                  "CSV / Parquet 文件 (*.csv *.parquet)")
+        if not filename:
+            return
+        
         try:
-            # 创建一个ExcelWriter对象
-            filename = f"补课时间记录{datetime.date.today().strftime('%Y%m%d')}.xlsx"
-            with pd.ExcelWriter(filename, engine="openpyxl") as writer:
-                # 总览表
-                overview_data = []
-                for student, data in self.students.items():
-                    total_duration = sum(d[1] for d in data["records"])
-                    total_paid = sum(p[1] for p in data["payments"])
-                    remaining = total_duration - total_paid
-                    
-                    # 获取补习科目
-                    subjects = data.get("subjects", ["未设置"])
-                    subjects_text = ", ".join(subjects)
-                    
-                    overview_data.append({
-                        "学生姓名": student,
-                        "补习科目": subjects_text,
-                        "总上课时长(小时)": total_duration,
-                        "已结算时长(小时)": total_paid,
-                        "剩余时长(小时)": remaining
-                    })
-                
-                overview_df = pd.DataFrame(overview_data)
-                # 添加导出时间信息
-                export_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                overview_df.loc[len(overview_df)] = {"学生姓名": "记录时间", "补习科目": "", "总上课时长(小时)": export_time}
-                overview_df.to_excel(writer, sheet_name="总览", index=False)
-            
-            # 每个学生的详细记录
-            for student, data in self.students.items():
-                    # 上课记录
-                    records_data = []
-                    cumulative = 0.0
-                    for record in data["records"]:
-                        # 处理不同格式的记录
-                        if len(record) == 2:
-                            date, duration = record
-                        else:
-                            date, duration = record[0], record[1]  # 忽略科目字段
-                           
-                        cumulative += duration
-                        records_data.append({
-                            "日期": date,
-                            "时长(小时)": duration,
-                            "累计时长(小时)": cumulative
-                        })
-                    
-                    records_df = pd.DataFrame(records_data)
-                    records_df.to_excel(writer, sheet_name=f"{student}_上课记录", index=False)
-                    
-                    # 结算记录
-                    payments_data = []
-                    cumulative_paid = 0.0
-                    for date, hours in data["payments"]:
-                        cumulative_paid += hours
-                        payments_data.append({
-                            "日期": date,
-                            "结算时长(小时)": hours,
-                            "累计结算(小时)": cumulative_paid
-                        })
-                    
-                    payments_df = pd.DataFrame(payments_data)
-                    payments_df.to_excel(writer, sheet_name=f"{student}_结算记录", index=False)
-            
-            self.log_action(f"数据已导出到 {filename}")
-            QMessageBox.information(self, "成功", f"数据已成功导出到 {filename}")
+            frame = read_long(filename)
         except Exception as e:
-            QMessageBox.critical(self, "错误", f"导出Excel失败: {str(e)}")
-            self.log_action(f"导出Excel失败: {str(e)}")
+            QMessageBox.critical(self, "错误", f"导入失败: {str(e)}")
+            self.log_action(f"导入 {filename} 失败: {str(e)}")
+            return
+        
+        try:
+            ops = import_ops(frame, self.students)
+        except LedgerError as e:
+            QMessageBox.warning(self, "警告", f"导入失败: {str(e)}")
+            self.log_action(f"导入 {filename} 失败: {str(e)}")
+            return
+        rows = imported_rows(ops)
+        skipped = f"，跳过 {len(frame) - rows} 条已存在的记录" if rows < len(frame) else ""
+        for op in ops:
+            if op["student"] not in self.students:
+                self.student_model.append_student(op["student"])
+        self.apply_batch(ops)
+        self.save_data(*ops, pinned=True)
+        
+        # 当前学生的记录被整体重排，重置表格模型
+        student_name = self.current_student
+        if student_name:
+            self.records_model.set_entries(self.students[student_name]["records"])
+            self.payments_model.set_entries(self.students[student_name]["payments"])
+            self.update_records_table(student_name)
+            self.update_payments_table(student_name)
+        
+        self.log_action(f"从 {filename} 导入了 {len(ops)} 名学生的 {rows} 条记录{skipped}")
+        QMessageBox.information(self, "成功", f"已导入 {len(ops)} 名学生的 {rows} 条记录{skipped}")
+
+    def on_export_progress(self, sheet, done):
+        """显示导出进度"""
+        self.statusBar().showMessage(f"正在导出: {sheet} ({done}/{self._export_sheets})")
 
 if __name__ == "__main__":
     # 确保中文显示正常